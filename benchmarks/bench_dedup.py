@@ -0,0 +1,121 @@
+"""Near-duplicate removal: pairwise SequenceMatcher vs MinHash/LSH.
+
+``SearchOptimizer.deduplicate`` used to compare every result with every
+kept one. The pairwise baseline only runs at the smaller size, where it
+still finishes in reasonable time; both sides report the kept count so
+the outputs can be compared.
+
+Run with ``python -m benchmarks.bench_dedup``.
+"""
+
+import random
+import time
+from difflib import SequenceMatcher
+
+from fastapi_zero.services.search_optimizer import (
+    SearchOptimizer,
+    SearchResult,
+)
+
+SIZES = (500, 2000, 5000)
+PAIRWISE_MAX = 500
+THRESHOLD = 0.85
+
+BRANDS = (
+    'Corsair',
+    'Gigabyte',
+    'Asus',
+    'MSI',
+    'Redragon',
+    'Pichau',
+    'NZXT',
+    'Cooler Master',
+    'Lian Li',
+    'Thermaltake',
+    'Rise Mode',
+    'Aerocool',
+)
+KINDS = (
+    'Gabinete Gamer',
+    'Gabinete Mid Tower',
+    'Gabinete Full Tower',
+    'Gabinete Mini ITX',
+    'Case Gamer',
+)
+FEATURES = (
+    'RGB',
+    'ARGB',
+    'Lateral de Vidro',
+    'Vidro Temperado',
+    'Preto',
+    'Branco',
+    'Sem Fans',
+    '3 Fans',
+    'ATX',
+    'Micro ATX',
+    'Frontal Mesh',
+)
+
+
+def build_results(count: int) -> list[SearchResult]:
+    rng = random.Random(7)
+    bases = [
+        ' '.join([
+            rng.choice(KINDS),
+            rng.choice(BRANDS),
+            f'X{rng.randint(100, 99_999)}',
+            *rng.sample(FEATURES, rng.randint(1, 4)),
+        ])
+        for _ in range(count * 2 // 3)
+    ]
+    titles = list(bases)
+    while len(titles) < count:
+        title = rng.choice(bases)
+        position = rng.randrange(len(title))
+        titles.append(
+            rng.choice([
+                title.upper(),
+                f'{title} - Original',
+                title[:position] + title[position + 1 :],
+            ])
+        )
+    rng.shuffle(titles)
+    return [
+        SearchResult(f'https://loja.example/p/{i}', title, 199.9, 'BRL')
+        for i, title in enumerate(titles)
+    ]
+
+
+def pairwise(results: list[SearchResult]) -> list[SearchResult]:
+    kept: list[SearchResult] = []
+    for current in results:
+        if not any(
+            SequenceMatcher(
+                None, existing.title.lower(), current.title.lower()
+            ).ratio()
+            >= THRESHOLD
+            for existing in kept
+        ):
+            kept.append(current)
+    return kept
+
+
+def timed(func, *args) -> tuple[float, int]:
+    started = time.perf_counter()
+    kept = func(*args)
+    return time.perf_counter() - started, len(kept)
+
+
+def main() -> None:
+    for count in SIZES:
+        results = build_results(count)
+        print(f'{count} results:')
+        if count <= PAIRWISE_MAX:
+            elapsed, kept = timed(pairwise, results)
+            print(f'  pairwise:   {elapsed:8.3f} s, {kept} kept')
+        elapsed, kept = timed(SearchOptimizer.deduplicate, results, THRESHOLD)
+        print(f'  minhash/lsh:{elapsed:8.3f} s, {kept} kept')
+
+
+if __name__ == '__main__':
+    main()
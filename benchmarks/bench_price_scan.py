@@ -0,0 +1,95 @@
+"""Price candidate scanning: one findall per pattern vs a single scan.
+
+Run with ``python -m benchmarks.bench_price_scan``.
+"""
+
+import json
+import random
+import timeit
+
+from selectolax.parser import HTMLParser
+
+from fastapi_zero.services.scraper import (
+    PRICE_PATTERNS,
+    scan_price_candidates,
+)
+
+PRODUCTS = 300
+ROUNDS = 20
+
+
+def build_page(products: int = PRODUCTS) -> str:
+    rng = random.Random(7)
+    styles = '\n'.join(
+        f'.c{i} {{ margin: {i % 13}px 0.{i % 9}em; width: {i * 1.5:.2f}%; }}'
+        for i in range(2000)
+    )
+    state = json.dumps([
+        {
+            'id': i,
+            'price': round(rng.uniform(10, 5000), 2),
+            'ts': 1_700_000_000 + i,
+            'dims': [i, i * 2, i * 3],
+        }
+        for i in range(800)
+    ])
+    cards = []
+    for i in range(products):
+        price = rng.uniform(10, 9000)
+        brl = f'{price:,.2f}'.translate(str.maketrans(',.', '.,'))
+        cards.append(
+            f'<div class="card c{i}">'
+            f'<a href="/produto/{i}">Placa de vídeo {i}, 8GB.</a>'
+            f'<span>R$ {brl}</span><s>R$&nbsp;{brl}</s>'
+            f'<small>ou 12x de R$ {price / 12:.2f} sem juros</small>'
+            f'<i>US$ {price / 5:,.2f}</i></div>'
+        )
+    return (
+        f'<html><head><style>{styles}</style>'
+        f'<script>var state = {state};</script></head>'
+        f'<body>{"".join(cards)}</body></html>'
+    )
+
+
+def per_pattern(text: str) -> list[str]:
+    candidates: list[str] = []
+    for pattern in PRICE_PATTERNS:
+        candidates.extend(pattern.findall(text))
+    return candidates
+
+
+def single_scan(text: str) -> list[str]:
+    return [match for _, match in scan_price_candidates(text)]
+
+
+def main() -> None:
+    html = build_page()
+    documents = {'raw html': html, 'body text': HTMLParser(html).text()}
+
+    for label, text in documents.items():
+        assert per_pattern(text) == single_scan(text)
+        print(f'{label}: {len(text) / 1024:.0f} KiB')
+        results = {}
+        for name, func in (
+            ('per pattern', per_pattern),
+            ('single scan', single_scan),
+        ):
+            best = min(
+                timeit.repeat(
+                    lambda func=func: func(text),
+                    number=ROUNDS,
+                    repeat=5,
+                )
+            )
+            results[name] = best / ROUNDS * 1000
+            mib_s = len(text) / 2**20 / (best / ROUNDS)
+            print(
+                f'  {name:>11}: {results[name]:.3f} ms/page '
+                f'({mib_s:.1f} MiB/s)'
+            )
+        ratio = results['per pattern'] / results['single scan']
+        print(f'  speedup: {ratio:.2f}x')
+
+
+if __name__ == '__main__':
+    main()
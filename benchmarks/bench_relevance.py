@@ -0,0 +1,51 @@
+"""Relevance scoring cost per title at 5k and 50k candidates.
+
+``filter_and_rank`` used to score titles one at a time with
+``SequenceMatcher(None, query, title).ratio()`` as the order-sensitive
+term; ``SearchOptimizer.score_titles`` scores the whole batch with a
+trigram Dice coefficient instead. The sequence baseline only runs at the
+smaller size.
+
+Run with ``python -m benchmarks.bench_relevance``.
+"""
+
+import re
+import time
+from difflib import SequenceMatcher
+
+from benchmarks.bench_dedup import build_results
+from fastapi_zero.services.search_optimizer import SearchOptimizer
+
+SIZES = (5000, 50_000)
+SEQUENCE_BASELINE_MAX = 5000
+QUERY = 'gabinete gamer corsair rgb'
+
+
+def sequence_scores(optimizer: SearchOptimizer, titles: list[str]) -> None:
+    for title in titles:
+        title_lower = title.lower()
+        words = set(re.findall(r'\w+', title_lower))
+        len(optimizer.meaningful_words & words)
+        SequenceMatcher(None, optimizer.query, title_lower).ratio()
+
+
+def main() -> None:
+    optimizer = SearchOptimizer(QUERY)
+    for count in SIZES:
+        titles = [result.title for result in build_results(count)]
+        print(f'{count} titles:')
+
+        if count <= SEQUENCE_BASELINE_MAX:
+            started = time.perf_counter()
+            sequence_scores(optimizer, titles)
+            elapsed = time.perf_counter() - started
+            print(f'  sequence ratio: {elapsed / count * 1e6:8.2f} us/title')
+
+        started = time.perf_counter()
+        optimizer.score_titles(titles)
+        elapsed = time.perf_counter() - started
+        print(f'  score_titles:   {elapsed / count * 1e6:8.2f} us/title')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,96 @@
+# ruff: noqa: PLC2701
+"""Per-page CPU of search page discovery: three parses vs a single one.
+
+Run with ``python -m benchmarks.bench_search_page``.
+"""
+
+import json
+import timeit
+
+from fastapi_zero.services.scraper import (
+    _compile_patterns,
+    _extract_pagination_links,
+    _extract_product_urls_from_html,
+    _extract_product_urls_from_next_data,
+    analyze_search_page,
+)
+
+BASE_URL = 'https://loja.example/busca?q=placa+de+video'
+PRODUCTS = 60
+ROUNDS = 200
+
+
+def build_page(products: int = PRODUCTS) -> str:
+    cards = '\n'.join(
+        f"""
+        <div class="card" data-sku="{i}">
+          <a href="/produto/{i}/placa-de-video-modelo-{i}">
+            <img src="/img/{i}.webp" alt="Placa de vídeo {i}">
+            <h2>Placa de Vídeo Modelo {i} 8GB GDDR6</h2>
+          </a>
+          <span class="price">R$ {1000 + i},99</span>
+          <a href="/carrinho?add={i}">Comprar</a>
+        </div>"""
+        for i in range(products)
+    )
+    pagination = '\n'.join(
+        f'<a href="/busca?q=placa+de+video&page={n}">{n}</a>'
+        for n in range(1, 11)
+    )
+    menu = '\n'.join(
+        f'<li><a href="/categoria/{n}">Categoria {n}</a></li>'
+        for n in range(150)
+    )
+    next_data = json.dumps({
+        'props': {
+            'pageProps': {
+                'products': [
+                    {'code': i, 'friendlyName': f'placa-de-video-{i}'}
+                    for i in range(products)
+                ]
+            }
+        }
+    })
+    return f"""<!doctype html>
+<html><head><title>Busca</title></head><body>
+<nav><ul>{menu}</ul></nav>
+<main>{cards}</main>
+<nav class="pagination">{pagination}</nav>
+<script id="__NEXT_DATA__" type="application/json">{next_data}</script>
+</body></html>"""
+
+
+def separate(html, include, exclude):
+    _extract_product_urls_from_html(html, BASE_URL, include, exclude)
+    _extract_product_urls_from_next_data(html, BASE_URL, include, exclude)
+    _extract_pagination_links(html, BASE_URL)
+
+
+def single(html, include, exclude):
+    analyze_search_page(html, BASE_URL, include, exclude)
+
+
+def main() -> None:
+    html = build_page()
+    include = _compile_patterns([r'/produto/'])
+    exclude = _compile_patterns([r'/carrinho'])
+
+    print(f'page size: {len(html) / 1024:.0f} KiB, {PRODUCTS} products')
+    results = {}
+    for name, func in (('three parses', separate), ('single parse', single)):
+        best = min(
+            timeit.repeat(
+                lambda func=func: func(html, include, exclude),
+                number=ROUNDS,
+                repeat=5,
+            )
+        )
+        results[name] = best / ROUNDS * 1000
+        print(f'{name:>13}: {results[name]:.3f} ms/page')
+
+    ratio = results['three parses'] / results['single parse']
+    print(f'speedup: {ratio:.2f}x')
+
+
+if __name__ == '__main__':
+    main()
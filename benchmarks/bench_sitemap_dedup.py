@@ -0,0 +1,94 @@
+# ruff: noqa: PLC2701
+"""Sitemap discovery cost per URL at 20k and 200k URLs.
+
+The URL de-duplication used to be a list membership test, quadratic in
+``max_urls``; with an insertion-ordered dict the time per URL should stay
+flat as the sitemap grows. The list baseline only runs at the smaller
+size, where it still finishes in reasonable time.
+
+Run with ``python -m benchmarks.bench_sitemap_dedup``.
+"""
+
+import asyncio
+import time
+
+import httpx
+
+from fastapi_zero.services.scraper import (
+    DiscoveryFilters,
+    _discover_from_sitemap,
+)
+
+SIZES = (20_000, 200_000)
+LIST_BASELINE_MAX = 20_000
+
+
+def build_sitemap(count: int) -> bytes:
+    entries = ''.join(
+        f'<url><loc>https://loja.example/produto/{i}</loc></url>'
+        for i in range(count)
+    )
+    return (
+        '<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">'
+        f'{entries}</urlset>'
+    ).encode()
+
+
+def list_dedup(urls: list[str]) -> list[str]:
+    discovered: list[str] = []
+    for url in urls:
+        if url not in discovered:
+            discovered.append(url)
+    return discovered
+
+
+def dict_dedup(urls: list[str]) -> list[str]:
+    discovered: dict[str, None] = {}
+    for url in urls:
+        if url not in discovered:
+            discovered[url] = None
+    return list(discovered)
+
+
+async def discover(body: bytes, count: int) -> list[str]:
+    def handler(request):
+        if request.url.path == '/sitemap.xml':
+            return httpx.Response(200, content=body)
+        return httpx.Response(404)
+
+    filters = DiscoveryFilters(include_regex=None, exclude_regex=None)
+    async with httpx.AsyncClient(
+        transport=httpx.MockTransport(handler)
+    ) as client:
+        return await _discover_from_sitemap(
+            client, 'https://loja.example', count, filters
+        )
+
+
+def timed(func, *args) -> float:
+    started = time.perf_counter()
+    func(*args)
+    return time.perf_counter() - started
+
+
+def main() -> None:
+    for count in SIZES:
+        urls = [f'https://loja.example/produto/{i}' for i in range(count)]
+        body = build_sitemap(count)
+        print(f'{count} URLs:')
+
+        if count <= LIST_BASELINE_MAX:
+            elapsed = timed(list_dedup, urls)
+            print(f'  list dedup: {elapsed / count * 1e6:8.2f} us/url')
+        elapsed = timed(dict_dedup, urls)
+        print(f'  dict dedup: {elapsed / count * 1e6:8.2f} us/url')
+
+        started = time.perf_counter()
+        found = asyncio.run(discover(body, count))
+        elapsed = time.perf_counter() - started
+        assert len(found) == count
+        print(f'  discovery:  {elapsed / count * 1e6:8.2f} us/url')
+
+
+if __name__ == '__main__':
+    main()
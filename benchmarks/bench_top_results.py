@@ -0,0 +1,56 @@
+"""``optimize_search_results`` with ``max_results=100`` on large inputs.
+
+The pipeline used to sort every scored result and de-duplicate the whole
+list before slicing; now results leave a heap in relevance order and
+de-duplication stops once ``max_results`` are kept. The full pipeline
+baseline only runs at the smaller size.
+
+Run with ``python -m benchmarks.bench_top_results``.
+"""
+
+import time
+
+from benchmarks.bench_dedup import build_results
+from fastapi_zero.services.search_optimizer import (
+    SearchOptimizer,
+    optimize_search_results,
+)
+
+SIZES = (2000, 50_000)
+FULL_BASELINE_MAX = 2000
+MAX_RESULTS = 100
+QUERY = 'gabinete gamer corsair rgb'
+
+
+def full_pipeline(results: list[tuple]) -> list:
+    optimizer = SearchOptimizer(QUERY)
+    ranked = optimizer.deduplicate(optimizer.filter_and_rank(results))
+    return ranked[:MAX_RESULTS]
+
+
+def main() -> None:
+    for count in SIZES:
+        results = [
+            (result.url, result.title, result.price, result.currency)
+            for result in build_results(count)
+        ]
+        print(f'{count} results:')
+
+        if count <= FULL_BASELINE_MAX:
+            started = time.perf_counter()
+            expected = full_pipeline(results)
+            elapsed = time.perf_counter() - started
+            print(f'  sort + full dedup: {elapsed:8.3f} s')
+
+        started = time.perf_counter()
+        optimized = optimize_search_results(
+            QUERY, results, max_results=MAX_RESULTS
+        )
+        elapsed = time.perf_counter() - started
+        print(f'  heap top-k:        {elapsed:8.3f} s')
+        if count <= FULL_BASELINE_MAX:
+            assert optimized == expected
+
+
+if __name__ == '__main__':
+    main()
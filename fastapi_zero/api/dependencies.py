@@ -0,0 +1,54 @@
+"""Request-scoped accessors for resources owned by the app lifespan."""
+
+from http import HTTPStatus
+
+import httpx
+from fastapi import HTTPException, Request
+
+from fastapi_zero.db.session import get_async_sessionmaker
+from fastapi_zero.services.jobs import JobManager, SessionFactory
+from fastapi_zero.services.parse_executor import ParseExecutor
+from fastapi_zero.services.throttle import AdaptiveHostLimiter
+from fastapi_zero.services.validators import ValidatorStore
+
+
+def get_http_client(request: Request) -> httpx.AsyncClient | None:
+    """Shared client from the lifespan registry, if the app started one."""
+    registry = getattr(request.app.state, 'http_clients', None)
+    if registry is None:
+        return None
+    return registry.get()
+
+
+def get_host_limiter(request: Request) -> AdaptiveHostLimiter | None:
+    """Process-wide adaptive per-host limiter, if the app started one."""
+    return getattr(request.app.state, 'host_limiter', None)
+
+
+def get_parse_executor(request: Request) -> ParseExecutor | None:
+    """Process-wide HTML parse pool, if one is configured."""
+    return getattr(request.app.state, 'parse_executor', None)
+
+
+def get_validator_store(request: Request) -> ValidatorStore | None:
+    """Persistent ETag/Last-Modified store, if conditional requests are on."""
+    return getattr(request.app.state, 'validator_store', None)
+
+
+def get_session_factory(request: Request) -> SessionFactory:
+    """Session factory for work that outlives the request's own session."""
+    factory = getattr(request.app.state, 'sessions', None)
+    if factory is None:
+        return get_async_sessionmaker()
+    return factory
+
+
+def get_job_manager(request: Request) -> JobManager:
+    """Background job queue started by the lifespan."""
+    manager = getattr(request.app.state, 'jobs', None)
+    if manager is None:
+        raise HTTPException(
+            status_code=HTTPStatus.SERVICE_UNAVAILABLE,
+            detail='Job queue is not running',
+        )
+    return manager
@@ -1,10 +1,10 @@
 from http import HTTPStatus
 
 from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy import func, select
+from sqlalchemy import select
 from sqlalchemy.orm import Session
 
-from fastapi_zero.db.models import Cart, CartItem, PriceRecord, Product
+from fastapi_zero.db.models import BestPrice, Cart, CartItem, Product
 from fastapi_zero.db.session import get_session
 from fastapi_zero.schemas import AddToCartRequest, CartItemPublic, CartResponse
 
@@ -64,43 +64,24 @@ def get_cart(session: Session = Depends(get_session)):
     if not cart:
         return CartResponse(id=0, items=[])
 
-    price_subquery = (
-        select(
-            PriceRecord.product_id,
-            func.min(PriceRecord.price).label('min_price'),
-        )
-        .group_by(PriceRecord.product_id)
-        .subquery()
-    )
-
     rows = session.execute(
-        select(CartItem, Product, PriceRecord)
+        select(CartItem, Product, BestPrice)
         .where(CartItem.cart_id == cart.id)
         .join(Product, CartItem.product_id == Product.id)
-        .join(
-            price_subquery,
-            Product.id == price_subquery.c.product_id,
-            isouter=True,
-        )
-        .join(
-            PriceRecord,
-            (PriceRecord.product_id == price_subquery.c.product_id)
-            & (PriceRecord.price == price_subquery.c.min_price),
-            isouter=True,
-        )
+        .join(BestPrice, Product.id == BestPrice.product_id, isouter=True)
     ).all()
 
     items = []
-    for item, product, price_record in rows:
+    for item, product, best in rows:
         items.append(
             CartItemPublic(
                 id=item.id,
                 product_id=item.product_id,
                 name=product.display_name,
                 quantity=item.quantity,
-                lowest_price=price_record.price if price_record else None,
-                currency=price_record.currency if price_record else None,
-                source_url=price_record.source_url if price_record else None,
+                lowest_price=best.price if best else None,
+                currency=best.currency if best else None,
+                source_url=best.source_url if best else None,
             )
         )
 
@@ -0,0 +1,66 @@
+from http import HTTPStatus
+
+from fastapi import APIRouter, Depends, HTTPException
+
+from fastapi_zero.api.dependencies import get_job_manager
+from fastapi_zero.schemas import (
+    CrawlRequest,
+    JobPublic,
+    ScrapeUrlsRequest,
+    SearchCrawlRequest,
+)
+from fastapi_zero.services.jobs import JobManager
+
+router = APIRouter(prefix='/jobs', tags=['jobs'])
+
+
+@router.post(
+    '/scrape', status_code=HTTPStatus.ACCEPTED, response_model=JobPublic
+)
+async def submit_scrape_job(
+    payload: ScrapeUrlsRequest,
+    jobs: JobManager = Depends(get_job_manager),
+):
+    return await jobs.submit('scrape', payload.model_dump(mode='json'))
+
+
+@router.post(
+    '/crawl', status_code=HTTPStatus.ACCEPTED, response_model=JobPublic
+)
+async def submit_crawl_job(
+    payload: CrawlRequest,
+    jobs: JobManager = Depends(get_job_manager),
+):
+    return await jobs.submit('crawl', payload.model_dump(mode='json'))
+
+
+@router.post(
+    '/search', status_code=HTTPStatus.ACCEPTED, response_model=JobPublic
+)
+async def submit_search_job(
+    payload: SearchCrawlRequest,
+    jobs: JobManager = Depends(get_job_manager),
+):
+    return await jobs.submit('search', payload.model_dump(mode='json'))
+
+
+@router.get('/{job_id}', status_code=HTTPStatus.OK, response_model=JobPublic)
+async def read_job(job_id: str, jobs: JobManager = Depends(get_job_manager)):
+    job = await jobs.get(job_id)
+    if job is None:
+        raise HTTPException(
+            status_code=HTTPStatus.NOT_FOUND, detail='Job not found'
+        )
+    return job
+
+
+@router.delete(
+    '/{job_id}', status_code=HTTPStatus.OK, response_model=JobPublic
+)
+async def cancel_job(job_id: str, jobs: JobManager = Depends(get_job_manager)):
+    job = await jobs.cancel(job_id)
+    if job is None:
+        raise HTTPException(
+            status_code=HTTPStatus.NOT_FOUND, detail='Job not found'
+        )
+    return job
@@ -0,0 +1,26 @@
+from http import HTTPStatus
+
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from fastapi_zero.db.session import get_async_session
+from fastapi_zero.schemas import ProductSearchResponse
+from fastapi_zero.services.product_search import search_products
+
+router = APIRouter(tags=['products'])
+
+
+@router.get(
+    '/products/search',
+    status_code=HTTPStatus.OK,
+    response_model=ProductSearchResponse,
+)
+async def search_stored_products(
+    q: str = Query(min_length=1, max_length=200),
+    limit: int = Query(default=20, ge=1, le=100),
+    session: AsyncSession = Depends(get_async_session),
+):
+    products = await session.run_sync(search_products, q, limit)
+    return ProductSearchResponse(
+        query=q, total=len(products), products=products
+    )
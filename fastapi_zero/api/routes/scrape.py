@@ -1,32 +1,60 @@
+import json
 from http import HTTPStatus
+from typing import AsyncIterator, Literal
 
-from fastapi import APIRouter, Depends
-from sqlalchemy import func, select
-from sqlalchemy.orm import Session
+import httpx
+from fastapi import APIRouter, Depends, Query
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from fastapi_zero.db.models import PriceRecord, Product
-from fastapi_zero.db.session import get_session
+from fastapi_zero.api.dependencies import (
+    get_host_limiter,
+    get_http_client,
+    get_parse_executor,
+    get_session_factory,
+    get_validator_store,
+)
+from fastapi_zero.db.session import get_async_session
 from fastapi_zero.schemas import (
     CrawlRequest,
     CrawlResponse,
-    ProductBestPrice,
+    HostLimit,
+    HostLimitsResponse,
     ScrapedItemPublic,
     ScrapeResult,
+    ScrapeSummary,
     ScrapeUrlsRequest,
     SearchCrawlRequest,
     SearchCrawlResponse,
 )
-from fastapi_zero.services.scraper import Scraper, normalize_product_name
+from fastapi_zero.services.catalog import load_best_prices, save_scraped_items
+from fastapi_zero.services.jobs import SessionFactory
+from fastapi_zero.services.parse_executor import ParseExecutor
+from fastapi_zero.services.scraper import ScrapedItem, Scraper
 from fastapi_zero.services.smart_scraper import SmartScraper
+from fastapi_zero.services.throttle import AdaptiveHostLimiter
+from fastapi_zero.services.validators import ValidatorStore
 
 router = APIRouter(tags=['scraping'])
 
+STREAM_PERSIST_BATCH = 25
+
 
 @router.post(
     '/crawl/urls', status_code=HTTPStatus.OK, response_model=CrawlResponse
 )
-async def crawl_urls(payload: CrawlRequest):
-    scraper = Scraper(max_concurrency=payload.max_concurrency)
+async def crawl_urls(
+    payload: CrawlRequest,
+    http_client: httpx.AsyncClient | None = Depends(get_http_client),
+    host_limiter: AdaptiveHostLimiter | None = Depends(get_host_limiter),
+):
+    scraper = Scraper(
+        max_concurrency=payload.max_concurrency,
+        client=http_client,
+        adaptive=payload.adaptive,
+        host_limiter=host_limiter if payload.adaptive else None,
+    )
     urls = await scraper.discover_urls(
         base_url=str(payload.base_url),
         max_urls=payload.max_urls,
@@ -44,10 +72,15 @@ async def crawl_urls(payload: CrawlRequest):
     status_code=HTTPStatus.OK,
     response_model=SearchCrawlResponse,
 )
-async def crawl_search(payload: SearchCrawlRequest):
+async def crawl_search(
+    payload: SearchCrawlRequest,
+    http_client: httpx.AsyncClient | None = Depends(get_http_client),
+):
     if payload.query:
         # Use SmartScraper with optimization when query is provided
-        scraper = SmartScraper(max_concurrency=payload.max_concurrency)
+        scraper = SmartScraper(
+            max_concurrency=payload.max_concurrency, client=http_client
+        )
         urls = await scraper.discover_search_urls_optimized(
             search_url=str(payload.search_url),
             query=payload.query,
@@ -58,7 +91,9 @@ async def crawl_search(payload: SearchCrawlRequest):
         )
     else:
         # Use regular Scraper when no query is provided
-        scraper = Scraper(max_concurrency=payload.max_concurrency)
+        scraper = Scraper(
+            max_concurrency=payload.max_concurrency, client=http_client
+        )
         urls = await scraper.discover_search_urls(
             search_url=str(payload.search_url),
             max_pages=payload.max_pages,
@@ -69,98 +104,162 @@ async def crawl_search(payload: SearchCrawlRequest):
     return SearchCrawlResponse(total_urls=len(urls), urls=urls)
 
 
+@router.get(
+    '/scrape/host-limits',
+    status_code=HTTPStatus.OK,
+    response_model=HostLimitsResponse,
+)
+def host_limits(
+    host_limiter: AdaptiveHostLimiter | None = Depends(get_host_limiter),
+):
+    if host_limiter is None:
+        return HostLimitsResponse(hosts=[])
+    return HostLimitsResponse(
+        hosts=[
+            HostLimit(
+                host=host,
+                limit=limit,
+                in_flight=host_limiter.in_flight(host),
+            )
+            for host, limit in sorted(host_limiter.limits().items())
+        ]
+    )
+
+
 @router.post(
     '/scrape/urls', status_code=HTTPStatus.OK, response_model=ScrapeResult
 )
-async def scrape_urls(
-    payload: ScrapeUrlsRequest, session: Session = Depends(get_session)
+async def scrape_urls(  # noqa: PLR0913, PLR0917
+    payload: ScrapeUrlsRequest,
+    session: AsyncSession = Depends(get_async_session),
+    http_client: httpx.AsyncClient | None = Depends(get_http_client),
+    host_limiter: AdaptiveHostLimiter | None = Depends(get_host_limiter),
+    parse_executor: ParseExecutor | None = Depends(get_parse_executor),
+    validator_store: ValidatorStore | None = Depends(get_validator_store),
 ):
-    scraper = Scraper(max_concurrency=payload.max_concurrency)
+    scraper = _build_url_scraper(
+        payload, http_client, host_limiter, parse_executor, validator_store
+    )
     items = await scraper.scrape_urls([str(url) for url in payload.urls])
 
-    product_ids: set[int] = set()
-    saved_count = 0
+    saved_count, product_ids = await session.run_sync(
+        save_scraped_items, items, payload.category
+    )
+
+    return ScrapeResult(
+        total_scraped=len(items),
+        total_saved=saved_count,
+        products=await session.run_sync(load_best_prices, product_ids),
+        raw_items=[_to_public(item) for item in items],
+    )
+
 
-    for item in items:
-        if not item.title or item.price is None:
-            continue
+@router.post('/scrape/urls/stream', status_code=HTTPStatus.OK)
+async def scrape_urls_stream(  # noqa: PLR0913, PLR0917
+    payload: ScrapeUrlsRequest,
+    stream_format: Literal['ndjson', 'sse'] = Query(
+        default='ndjson', alias='format'
+    ),
+    session_factory: SessionFactory = Depends(get_session_factory),
+    http_client: httpx.AsyncClient | None = Depends(get_http_client),
+    host_limiter: AdaptiveHostLimiter | None = Depends(get_host_limiter),
+    parse_executor: ParseExecutor | None = Depends(get_parse_executor),
+    validator_store: ValidatorStore | None = Depends(get_validator_store),
+):
+    scraper = _build_url_scraper(
+        payload, http_client, host_limiter, parse_executor, validator_store
+    )
+    events = _scrape_events(scraper, payload, session_factory)
 
-        normalized = normalize_product_name(item.title)
-        product = session.scalar(
-            select(Product).where(Product.normalized_name == normalized)
+    if stream_format == 'sse':
+        return StreamingResponse(
+            (_encode_sse(name, data) async for name, data in events),
+            media_type='text/event-stream',
+            headers={'Cache-Control': 'no-cache'},
         )
+    return StreamingResponse(
+        (_encode_ndjson(name, data) async for name, data in events),
+        media_type='application/x-ndjson',
+    )
+
+
+async def _scrape_events(
+    scraper: Scraper,
+    payload: ScrapeUrlsRequest,
+    session_factory: SessionFactory,
+) -> AsyncIterator[tuple[str, BaseModel]]:
+    """Item events as they are scraped, product events per saved chunk.
+
+    The body streams after the request's dependencies have exited, so each
+    chunk is saved in a session of its own rather than a borrowed one.
+    """
+    total_scraped = 0
+    total_saved = 0
+    pending: list[ScrapedItem] = []
 
-        if not product:
-            product = Product(
-                display_name=item.title,
-                normalized_name=normalized,
-                category=payload.category,
+    async def flush():
+        async with session_factory() as session:
+            saved_count, product_ids = await session.run_sync(
+                save_scraped_items, pending, payload.category
             )
-            session.add(product)
-            session.commit()
-            session.refresh(product)
+            pending.clear()
+            products = await session.run_sync(load_best_prices, product_ids)
+        return saved_count, products
 
-        product_ids.add(product.id)
+    async for item in scraper.iter_scrape(str(url) for url in payload.urls):
+        total_scraped += 1
+        yield 'item', _to_public(item)
 
-        price_record = PriceRecord(
-            product_id=product.id,
-            source_url=item.url,
-            price=item.price,
-            currency=item.currency,
-        )
-        session.add(price_record)
-        saved_count += 1
+        pending.append(item)
+        if len(pending) >= STREAM_PERSIST_BATCH:
+            saved_count, products = await flush()
+            total_saved += saved_count
+            for product in products:
+                yield 'product', product
 
-    if saved_count:
-        session.commit()
+    if pending:
+        saved_count, products = await flush()
+        total_saved += saved_count
+        for product in products:
+            yield 'product', product
 
-    products: list[ProductBestPrice] = []
+    yield 'summary', ScrapeSummary(
+        total_scraped=total_scraped, total_saved=total_saved
+    )
 
-    if product_ids:
-        subquery = (
-            select(
-                PriceRecord.product_id,
-                func.min(PriceRecord.price).label('min_price'),
-            )
-            .where(PriceRecord.product_id.in_(product_ids))
-            .group_by(PriceRecord.product_id)
-            .subquery()
-        )
 
-        rows = session.execute(
-            select(Product, PriceRecord)
-            .join(subquery, Product.id == subquery.c.product_id)
-            .join(
-                PriceRecord,
-                (PriceRecord.product_id == subquery.c.product_id)
-                & (PriceRecord.price == subquery.c.min_price),
-            )
-            .where(Product.id.in_(product_ids))
-        ).all()
-
-        for product, price_record in rows:
-            products.append(
-                ProductBestPrice(
-                    product_id=product.id,
-                    name=product.display_name,
-                    category=product.category,
-                    lowest_price=price_record.price,
-                    currency=price_record.currency,
-                    source_url=price_record.source_url,
-                )
-            )
+def _encode_ndjson(event: str, data: BaseModel) -> str:
+    body = json.dumps({'event': event, 'data': data.model_dump(mode='json')})
+    return body + '\n'
 
-    return ScrapeResult(
-        total_scraped=len(items),
-        total_saved=saved_count,
-        products=products,
-        raw_items=[
-            ScrapedItemPublic(
-                url=item.url,
-                title=item.title,
-                price=item.price,
-                currency=item.currency,
-            )
-            for item in items
-        ],
+
+def _encode_sse(event: str, data: BaseModel) -> str:
+    return f'event: {event}\ndata: {data.model_dump_json()}\n\n'
+
+
+def _build_url_scraper(
+    payload: ScrapeUrlsRequest,
+    http_client: httpx.AsyncClient | None,
+    host_limiter: AdaptiveHostLimiter | None,
+    parse_executor: ParseExecutor | None = None,
+    validator_store: ValidatorStore | None = None,
+) -> Scraper:
+    return Scraper(
+        max_concurrency=payload.max_concurrency,
+        client=http_client,
+        per_host_concurrency=payload.per_host_concurrency,
+        per_host_rps=payload.per_host_rps,
+        adaptive=payload.adaptive,
+        host_limiter=host_limiter if payload.adaptive else None,
+        parse_executor=parse_executor,
+        validator_store=validator_store,
+    )
+
+
+def _to_public(item: ScrapedItem) -> ScrapedItemPublic:
+    return ScrapedItemPublic(
+        url=item.url,
+        title=item.title,
+        price=item.price,
+        currency=item.currency,
     )
@@ -1,3 +1,5 @@
+import logging
+from contextlib import asynccontextmanager
 from http import HTTPStatus
 
 from fastapi import FastAPI, Request
@@ -7,11 +9,79 @@ from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
 
 from fastapi_zero.api.routes.cart import router as cart_router
+from fastapi_zero.api.routes.jobs import router as jobs_router
+from fastapi_zero.api.routes.products import router as products_router
 from fastapi_zero.api.routes.scrape import router as scrape_router
 from fastapi_zero.api.routes.users import router as users_router
+from fastapi_zero.core.settings import Settings
+from fastapi_zero.db.session import get_async_sessionmaker
 from fastapi_zero.schemas import Message
+from fastapi_zero.services.http_client import ClientRegistry
+from fastapi_zero.services.jobs import JobManager
+from fastapi_zero.services.parse_executor import ParseExecutor
+from fastapi_zero.services.throttle import AdaptiveHostLimiter
+from fastapi_zero.services.validators import SqlValidatorStore
 
-app = FastAPI(title='API')
+logger = logging.getLogger(__name__)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    settings = Settings()
+    app.state.http_clients = ClientRegistry.from_settings(settings)
+    # Shared so the limits learned for each host outlive a single request.
+    app.state.host_limiter = AdaptiveHostLimiter(
+        initial_per_host=settings.SCRAPER_ADAPTIVE_INITIAL_PER_HOST,
+        max_per_host=settings.SCRAPER_ADAPTIVE_MAX_PER_HOST,
+    )
+    app.state.parse_executor = None
+    if settings.SCRAPER_PARSE_WORKERS > 0:
+        app.state.parse_executor = ParseExecutor(
+            workers=settings.SCRAPER_PARSE_WORKERS,
+            kind=settings.SCRAPER_PARSE_EXECUTOR,
+        )
+    # Tests set ``app.state.session_factory`` to point these at their
+    # own database.
+    session_factory = getattr(app.state, 'session_factory', None)
+    if session_factory is None:
+        session_factory = get_async_sessionmaker()
+    app.state.sessions = session_factory
+    app.state.validator_store = None
+    if settings.SCRAPER_CONDITIONAL_REQUESTS:
+        app.state.validator_store = SqlValidatorStore(session_factory)
+    jobs = JobManager(
+        session_factory=session_factory,
+        workers=settings.JOBS_WORKERS,
+        result_ttl=settings.JOBS_RESULT_TTL,
+        client_provider=app.state.http_clients.get,
+        host_limiter=app.state.host_limiter,
+        parse_executor=app.state.parse_executor,
+        validator_store=app.state.validator_store,
+    )
+    try:
+        await jobs.start()
+    except Exception:
+        # e.g. a database not migrated yet: only /jobs answers 503.
+        logger.exception('Job queue failed to start; /jobs is disabled')
+        jobs = None
+    app.state.jobs = jobs
+    try:
+        yield
+    finally:
+        if app.state.jobs is not None:
+            await app.state.jobs.stop()
+        await app.state.http_clients.aclose()
+        if app.state.parse_executor is not None:
+            app.state.parse_executor.shutdown()
+        del app.state.jobs
+        del app.state.sessions
+        del app.state.validator_store
+        del app.state.parse_executor
+        del app.state.http_clients
+        del app.state.host_limiter
+
+
+app = FastAPI(title='API', lifespan=lifespan)
 
 app.mount(
     '/static', StaticFiles(directory='fastapi_zero/static'), name='static'
@@ -21,6 +91,8 @@ templates = Jinja2Templates(directory='fastapi_zero/templates')
 app.include_router(users_router)
 app.include_router(scrape_router)
 app.include_router(cart_router)
+app.include_router(jobs_router)
+app.include_router(products_router)
 
 
 @app.get('/favicon.ico', include_in_schema=False)
@@ -1,3 +1,5 @@
+from typing import Literal
+
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
@@ -7,3 +9,19 @@ class Settings(BaseSettings):
         env_file_encoding='utf-8',
     )
     DATABASE_URL: str = 'sqlite:///./dev.db'
+
+    HTTP_TIMEOUT: float = 10.0
+    HTTP_MAX_CONNECTIONS: int = 100
+    HTTP_MAX_KEEPALIVE_CONNECTIONS: int = 20
+    HTTP_KEEPALIVE_EXPIRY: float = 30.0
+
+    SCRAPER_ADAPTIVE_INITIAL_PER_HOST: int = 4
+    SCRAPER_ADAPTIVE_MAX_PER_HOST: int = 64
+    # 0 parses on the event loop; otherwise the size of the parse pool.
+    SCRAPER_PARSE_WORKERS: int = 0
+    SCRAPER_PARSE_EXECUTOR: Literal['process', 'thread'] = 'process'
+    # Revalidate known product pages with ETag/Last-Modified.
+    SCRAPER_CONDITIONAL_REQUESTS: bool = True
+
+    JOBS_WORKERS: int = 2
+    JOBS_RESULT_TTL: float = 3600.0
@@ -1,6 +1,6 @@
 from datetime import datetime
 
-from sqlalchemy import Float, ForeignKey, func
+from sqlalchemy import DDL, JSON, Float, ForeignKey, Index, event, func
 from sqlalchemy.orm import Mapped, mapped_column, registry
 
 table_registry = registry()
@@ -35,9 +35,28 @@ class Product:
     )
 
 
+@table_registry.mapped_as_dataclass
+class ProductTerm:
+    """Inverted index of the words in each product's names.
+
+    The primary key leads with ``term``, so finding the products that
+    contain any of a query's words is an index range scan per word.
+    """
+
+    __tablename__ = 'product_terms'
+
+    term: Mapped[str] = mapped_column(primary_key=True)
+    product_id: Mapped[int] = mapped_column(
+        ForeignKey('products.id'), primary_key=True
+    )
+
+
 @table_registry.mapped_as_dataclass
 class PriceRecord:
     __tablename__ = 'price_records'
+    __table_args__ = (
+        Index('ix_price_records_product_id_price', 'product_id', 'price'),
+    )
 
     id: Mapped[int] = mapped_column(init=False, primary_key=True)
     product_id: Mapped[int] = mapped_column(ForeignKey('products.id'))
@@ -49,6 +68,75 @@ class PriceRecord:
     )
 
 
+@table_registry.mapped_as_dataclass
+class BestPrice:
+    """Lowest price recorded per product.
+
+    Kept up to date by a trigger on ``price_records`` inserts, so reading
+    the best offer is a primary-key lookup instead of an aggregate over the
+    whole price history.
+    """
+
+    __tablename__ = 'product_best_price'
+
+    product_id: Mapped[int] = mapped_column(
+        ForeignKey('products.id'), primary_key=True
+    )
+    price_record_id: Mapped[int] = mapped_column(
+        ForeignKey('price_records.id')
+    )
+    price: Mapped[float] = mapped_column(Float)
+    source_url: Mapped[str]
+    currency: Mapped[str | None] = mapped_column(default=None)
+
+
+BEST_PRICE_UPSERT = """
+    INSERT INTO product_best_price
+        (product_id, price_record_id, price, currency, source_url)
+    VALUES (NEW.product_id, NEW.id, NEW.price, NEW.currency, NEW.source_url)
+    ON CONFLICT (product_id) DO UPDATE SET
+        price_record_id = excluded.price_record_id,
+        price = excluded.price,
+        currency = excluded.currency,
+        source_url = excluded.source_url
+    WHERE excluded.price < product_best_price.price;
+"""
+
+SQLITE_BEST_PRICE_TRIGGER = f"""
+CREATE TRIGGER IF NOT EXISTS price_records_best_price
+AFTER INSERT ON price_records
+BEGIN
+{BEST_PRICE_UPSERT}
+END
+"""
+
+POSTGRESQL_BEST_PRICE_FUNCTION = f"""
+CREATE OR REPLACE FUNCTION product_best_price_on_insert() RETURNS trigger AS $$
+BEGIN
+{BEST_PRICE_UPSERT}
+    RETURN NEW;
+END
+$$ LANGUAGE plpgsql
+"""
+
+POSTGRESQL_BEST_PRICE_TRIGGER = """
+CREATE TRIGGER price_records_best_price
+AFTER INSERT ON price_records
+FOR EACH ROW EXECUTE FUNCTION product_best_price_on_insert()
+"""
+
+for _statement, _dialect in (
+    (SQLITE_BEST_PRICE_TRIGGER, 'sqlite'),
+    (POSTGRESQL_BEST_PRICE_FUNCTION, 'postgresql'),
+    (POSTGRESQL_BEST_PRICE_TRIGGER, 'postgresql'),
+):
+    event.listen(
+        BestPrice.__table__,
+        'after_create',
+        DDL(_statement).execute_if(dialect=_dialect),
+    )
+
+
 @table_registry.mapped_as_dataclass
 class Cart:
     __tablename__ = 'carts'
@@ -67,3 +155,39 @@ class CartItem:
     cart_id: Mapped[int] = mapped_column(ForeignKey('carts.id'))
     product_id: Mapped[int] = mapped_column(ForeignKey('products.id'))
     quantity: Mapped[int] = mapped_column(default=1)
+
+
+@table_registry.mapped_as_dataclass
+class ScrapeJob:
+    __tablename__ = 'scrape_jobs'
+
+    id: Mapped[str] = mapped_column(primary_key=True)
+    kind: Mapped[str]
+    payload: Mapped[dict] = mapped_column(JSON)
+    status: Mapped[str] = mapped_column(default='queued', index=True)
+    progress: Mapped[int] = mapped_column(default=0)
+    total: Mapped[int | None] = mapped_column(default=None)
+    result: Mapped[dict | None] = mapped_column(JSON, default=None)
+    error: Mapped[str | None] = mapped_column(default=None)
+    expires_at: Mapped[datetime | None] = mapped_column(default=None)
+    created_at: Mapped[datetime] = mapped_column(
+        init=False, server_default=func.now()
+    )
+    updated_at: Mapped[datetime] = mapped_column(
+        init=False, server_default=func.now(), onupdate=func.now()
+    )
+
+
+@table_registry.mapped_as_dataclass
+class HttpValidator:
+    """Cache validators and the last parsed item of a scraped URL."""
+
+    __tablename__ = 'http_validators'
+
+    url: Mapped[str] = mapped_column(primary_key=True)
+    item: Mapped[dict] = mapped_column(JSON)
+    etag: Mapped[str | None] = mapped_column(default=None)
+    last_modified: Mapped[str | None] = mapped_column(default=None)
+    updated_at: Mapped[datetime] = mapped_column(
+        init=False, server_default=func.now(), onupdate=func.now()
+    )
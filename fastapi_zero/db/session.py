@@ -1,14 +1,64 @@
+from functools import cache
+
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import (
+    AsyncEngine,
+    AsyncSession,
+    async_sessionmaker,
+    create_async_engine,
+)
 from sqlalchemy.orm import Session
 
 from fastapi_zero.core.settings import Settings
 
+ASYNC_DRIVERS = {
+    'sqlite': 'sqlite+aiosqlite',
+    'postgresql': 'postgresql+asyncpg',
+}
+# Drivers that already run under asyncio and are kept as configured.
+ASYNC_CAPABLE_DRIVERS = {'aiosqlite', 'asyncpg', 'psycopg', 'psycopg_async'}
+
 engine = create_engine(
     Settings().DATABASE_URL,
 )
 
 
+def to_async_url(url: str) -> str:
+    """Swap the sync DBAPI driver of a database URL for its asyncio one."""
+    parsed = make_url(url)
+    driver = ASYNC_DRIVERS.get(parsed.get_backend_name())
+    # Only an explicit driver counts; the dialect default may be sync.
+    explicit = parsed.drivername.partition('+')[2]
+    if driver is None or explicit in ASYNC_CAPABLE_DRIVERS:
+        return url
+    return parsed.set(drivername=driver).render_as_string(hide_password=False)
+
+
+@cache
+def get_async_engine() -> AsyncEngine:
+    """Async engine for ``DATABASE_URL``, created on first use.
+
+    Building it lazily keeps the app importable when the asyncio driver
+    for the configured database (e.g. the ``postgres`` extra) is missing
+    and nothing needs an async session yet.
+    """
+    return create_async_engine(to_async_url(Settings().DATABASE_URL))
+
+
 def get_session():
     """Get a new SQLAlchemy session."""
     with Session(engine) as session:
         yield session
+
+
+@cache
+def get_async_sessionmaker() -> async_sessionmaker[AsyncSession]:
+    """Session factory for work outside a request (jobs, stores)."""
+    return async_sessionmaker(get_async_engine(), expire_on_commit=False)
+
+
+async def get_async_session():
+    """Get a new SQLAlchemy session for async routes."""
+    async with get_async_sessionmaker()() as session:
+        yield session
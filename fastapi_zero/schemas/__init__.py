@@ -1,3 +1,5 @@
+from datetime import datetime
+
 from pydantic import BaseModel, ConfigDict, EmailStr, Field, HttpUrl
 
 from .cart import AddToCartRequest, CartItemPublic, CartResponse
@@ -28,6 +30,9 @@ class ScrapeUrlsRequest(BaseModel):
     urls: list[HttpUrl]
     category: str | None = None
     max_concurrency: int = Field(default=20, ge=1, le=200)
+    per_host_concurrency: int | None = Field(default=None, ge=1, le=200)
+    per_host_rps: float | None = Field(default=None, gt=0, le=100)
+    adaptive: bool = False
 
 
 class ScrapedItemPublic(BaseModel):
@@ -46,6 +51,16 @@ class ProductBestPrice(BaseModel):
     source_url: HttpUrl
 
 
+class ProductSearchHit(ProductBestPrice):
+    relevance_score: float
+
+
+class ProductSearchResponse(BaseModel):
+    query: str
+    total: int
+    products: list[ProductSearchHit]
+
+
 class ScrapeResult(BaseModel):
     total_scraped: int
     total_saved: int
@@ -53,6 +68,11 @@ class ScrapeResult(BaseModel):
     raw_items: list[ScrapedItemPublic]
 
 
+class ScrapeSummary(BaseModel):
+    total_scraped: int
+    total_saved: int
+
+
 class CrawlRequest(BaseModel):
     base_url: HttpUrl
     max_urls: int = Field(default=1000, ge=1, le=20000)
@@ -62,6 +82,7 @@ class CrawlRequest(BaseModel):
     use_sitemap: bool = True
     follow_links: bool = False
     max_depth: int = Field(default=1, ge=0, le=5)
+    adaptive: bool = False
 
 
 class CrawlResponse(BaseModel):
@@ -84,6 +105,30 @@ class SearchCrawlResponse(BaseModel):
     urls: list[HttpUrl]
 
 
+class HostLimit(BaseModel):
+    host: str
+    limit: float
+    in_flight: int
+
+
+class HostLimitsResponse(BaseModel):
+    hosts: list[HostLimit]
+
+
+class JobPublic(BaseModel):
+    id: str
+    kind: str
+    status: str
+    progress: int
+    total: int | None
+    result: dict | None
+    error: str | None
+    created_at: datetime
+    updated_at: datetime
+    expires_at: datetime | None
+    model_config = ConfigDict(from_attributes=True)
+
+
 __all__ = [
     'Message',
     'UserSchema',
@@ -93,10 +138,14 @@ __all__ = [
     'ScrapedItemPublic',
     'ProductBestPrice',
     'ScrapeResult',
+    'ScrapeSummary',
     'CrawlRequest',
     'CrawlResponse',
     'SearchCrawlRequest',
     'SearchCrawlResponse',
+    'HostLimit',
+    'HostLimitsResponse',
+    'JobPublic',
     'AddToCartRequest',
     'CartItemPublic',
     'CartResponse',
@@ -0,0 +1,134 @@
+"""Persistence of scraped items into products and price history."""
+
+from typing import Iterable
+
+from sqlalchemy import insert, select
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+
+from fastapi_zero.db.models import BestPrice, PriceRecord, Product
+from fastapi_zero.schemas import ProductBestPrice
+from fastapi_zero.services.product_search import index_products
+from fastapi_zero.services.scraper import ScrapedItem, normalize_product_name
+
+# Keeps IN lists under the bound-parameter limits of SQLite and Postgres.
+PREFETCH_CHUNK = 500
+
+
+def save_scraped_items(
+    session: Session,
+    items: Iterable[ScrapedItem],
+    category: str | None = None,
+) -> tuple[int, set[int]]:
+    """Store a price record per priced item, creating products as needed.
+
+    The whole batch costs one prefetch per chunk of names, one multi-row
+    insert for the missing products, one for their search terms and one
+    for the price records, all in a single transaction. Returns the number
+    of saved price records and the touched product ids.
+    """
+    priced = [
+        (normalize_product_name(item.title), item)
+        for item in items
+        if item.title and item.price is not None
+    ]
+    if not priced:
+        return 0, set()
+
+    # First title seen for a name becomes the product's display name.
+    titles: dict[str, str] = {}
+    for normalized, item in priced:
+        titles.setdefault(normalized, item.title)
+
+    product_ids = _product_ids_by_name(session, titles)
+    missing = [name for name in titles if name not in product_ids]
+    if missing:
+        session.execute(
+            _insert_missing_products(session),
+            [
+                {
+                    'display_name': titles[name],
+                    'normalized_name': name,
+                    'category': category,
+                }
+                for name in missing
+            ],
+        )
+        product_ids.update(_product_ids_by_name(session, missing))
+        index_products(
+            session,
+            ((product_ids[name], titles[name], name) for name in missing),
+        )
+
+    session.execute(
+        insert(PriceRecord),
+        [
+            {
+                'product_id': product_ids[normalized],
+                'source_url': item.url,
+                'price': item.price,
+                'currency': item.currency,
+            }
+            for normalized, item in priced
+        ],
+    )
+    session.commit()
+
+    return len(priced), {product_ids[name] for name in titles}
+
+
+def _product_ids_by_name(
+    session: Session, names: Iterable[str]
+) -> dict[str, int]:
+    names = list(names)
+    found: dict[str, int] = {}
+    for start in range(0, len(names), PREFETCH_CHUNK):
+        chunk = names[start : start + PREFETCH_CHUNK]
+        found.update(
+            session.execute(
+                select(Product.normalized_name, Product.id).where(
+                    Product.normalized_name.in_(chunk)
+                )
+            ).all()
+        )
+    return found
+
+
+def _insert_missing_products(session: Session):
+    """Multi-row product insert that skips names created concurrently."""
+    dialect = session.get_bind().dialect.name
+    if dialect == 'sqlite':
+        return sqlite_insert(Product).on_conflict_do_nothing(
+            index_elements=['normalized_name']
+        )
+    if dialect == 'postgresql':
+        return postgresql_insert(Product).on_conflict_do_nothing(
+            index_elements=['normalized_name']
+        )
+    return insert(Product)
+
+
+def load_best_prices(
+    session: Session, product_ids: set[int]
+) -> list[ProductBestPrice]:
+    if not product_ids:
+        return []
+
+    rows = session.execute(
+        select(Product, BestPrice)
+        .join(BestPrice, BestPrice.product_id == Product.id)
+        .where(Product.id.in_(product_ids))
+    ).all()
+
+    return [
+        ProductBestPrice(
+            product_id=product.id,
+            name=product.display_name,
+            category=product.category,
+            lowest_price=best.price,
+            currency=best.currency,
+            source_url=best.source_url,
+        )
+        for product, best in rows
+    ]
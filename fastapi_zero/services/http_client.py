@@ -0,0 +1,86 @@
+"""Shared httpx clients reused across scraping requests."""
+
+import httpx
+
+from fastapi_zero.core.settings import Settings
+
+DEFAULT_HEADERS = {
+    'User-Agent': (
+        'Mozilla/5.0 (X11; Linux x86_64) '
+        'AppleWebKit/537.36 (KHTML, like Gecko) '
+        'Chrome/122.0 Safari/537.36'
+    ),
+    'Accept': (
+        'text/html,application/xhtml+xml,application/xml;'
+        'q=0.9,image/avif,image/webp,*/*;q=0.8'
+    ),
+    'Accept-Language': 'pt-BR,pt;q=0.9,en-US;q=0.8,en;q=0.7',
+    'Cache-Control': 'no-cache',
+    'Pragma': 'no-cache',
+    'Upgrade-Insecure-Requests': '1',
+}
+
+
+def build_client(
+    timeout: float, limits: httpx.Limits | None = None
+) -> httpx.AsyncClient:
+    options = {}
+    if limits is not None:
+        options['limits'] = limits
+    return httpx.AsyncClient(
+        timeout=httpx.Timeout(timeout),
+        headers=DEFAULT_HEADERS,
+        follow_redirects=True,
+        **options,
+    )
+
+
+class ClientRegistry:
+    """Long-lived AsyncClients keyed by timeout.
+
+    Owned by the application lifespan so keep-alive connections survive
+    between API requests instead of being torn down with each Scraper.
+    """
+
+    def __init__(
+        self,
+        timeout: float = 10.0,
+        max_connections: int = 100,
+        max_keepalive_connections: int = 20,
+        keepalive_expiry: float = 30.0,
+    ):
+        self._timeout = timeout
+        self._limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+            keepalive_expiry=keepalive_expiry,
+        )
+        self._clients: dict[float, httpx.AsyncClient] = {}
+
+    @classmethod
+    def from_settings(cls, settings: Settings) -> 'ClientRegistry':
+        return cls(
+            timeout=settings.HTTP_TIMEOUT,
+            max_connections=settings.HTTP_MAX_CONNECTIONS,
+            max_keepalive_connections=settings.HTTP_MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=settings.HTTP_KEEPALIVE_EXPIRY,
+        )
+
+    @property
+    def limits(self) -> httpx.Limits:
+        return self._limits
+
+    def get(self, timeout: float | None = None) -> httpx.AsyncClient:
+        if timeout is None:
+            timeout = self._timeout
+        client = self._clients.get(timeout)
+        if client is None or client.is_closed:
+            client = build_client(timeout, self._limits)
+            self._clients[timeout] = client
+        return client
+
+    async def aclose(self) -> None:
+        clients = list(self._clients.values())
+        self._clients.clear()
+        for client in clients:
+            await client.aclose()
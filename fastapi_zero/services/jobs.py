@@ -0,0 +1,413 @@
+"""In-process background jobs for long scrapes and crawls.
+
+Jobs are rows in ``scrape_jobs``: submitting one inserts a queued row and
+hands its id to an asyncio worker pool. On startup every job still marked
+queued or running is put back on the queue, so a restart does not lose
+work; a job interrupted mid-run simply starts over.
+"""
+
+import asyncio
+import logging
+import time
+import uuid
+from contextlib import AbstractAsyncContextManager
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Awaitable, Callable
+
+import httpx
+from sqlalchemy import delete, func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from fastapi_zero.db.models import ScrapeJob
+from fastapi_zero.schemas import (
+    CrawlRequest,
+    CrawlResponse,
+    ScrapedItemPublic,
+    ScrapeResult,
+    ScrapeUrlsRequest,
+    SearchCrawlRequest,
+    SearchCrawlResponse,
+)
+from fastapi_zero.services.catalog import load_best_prices, save_scraped_items
+from fastapi_zero.services.parse_executor import ParseExecutor
+from fastapi_zero.services.scraper import Scraper
+from fastapi_zero.services.smart_scraper import SmartScraper
+from fastapi_zero.services.throttle import AdaptiveHostLimiter
+from fastapi_zero.services.validators import ValidatorStore
+
+logger = logging.getLogger(__name__)
+
+JOB_QUEUED = 'queued'
+JOB_RUNNING = 'running'
+JOB_SUCCEEDED = 'succeeded'
+JOB_FAILED = 'failed'
+JOB_CANCELLED = 'cancelled'
+
+ACTIVE_STATUSES = (JOB_QUEUED, JOB_RUNNING)
+
+PROGRESS_INTERVAL = 1.0
+
+SessionFactory = Callable[[], AbstractAsyncContextManager[AsyncSession]]
+
+
+@dataclass(slots=True)
+class JobContext:
+    session_factory: SessionFactory
+    report: Callable[[int, int | None], Awaitable[None]]
+    http_client: httpx.AsyncClient | None = None
+    host_limiter: AdaptiveHostLimiter | None = None
+    parse_executor: ParseExecutor | None = None
+    validator_store: ValidatorStore | None = None
+
+
+JobRunner = Callable[[dict, JobContext], Awaitable[dict]]
+
+
+class JobManager:
+    def __init__(  # noqa: PLR0913, PLR0917
+        self,
+        session_factory: SessionFactory,
+        runners: dict[str, JobRunner] | None = None,
+        workers: int = 2,
+        result_ttl: float = 3600.0,
+        client_provider: Callable[[], httpx.AsyncClient | None] | None = None,
+        host_limiter: AdaptiveHostLimiter | None = None,
+        parse_executor: ParseExecutor | None = None,
+        validator_store: ValidatorStore | None = None,
+    ):
+        self._session_factory = session_factory
+        self._runners = runners if runners is not None else DEFAULT_RUNNERS
+        self._workers = workers
+        self._result_ttl = timedelta(seconds=result_ttl)
+        self._client_provider = client_provider or (lambda: None)
+        self._host_limiter = host_limiter
+        self._parse_executor = parse_executor
+        self._validator_store = validator_store
+        self._queue: asyncio.Queue[str] = asyncio.Queue()
+        self._tasks: list[asyncio.Task] = []
+        self._running: dict[str, asyncio.Task] = {}
+        self._cancelled: set[str] = set()
+
+    async def start(self) -> None:
+        async with self._session_factory() as session:
+            await session.execute(
+                update(ScrapeJob)
+                .where(ScrapeJob.status == JOB_RUNNING)
+                .values(status=JOB_QUEUED, progress=0)
+            )
+            await session.commit()
+            queued = (
+                await session.scalars(
+                    select(ScrapeJob.id)
+                    .where(ScrapeJob.status == JOB_QUEUED)
+                    .order_by(ScrapeJob.created_at)
+                )
+            ).all()
+        for job_id in queued:
+            self._queue.put_nowait(job_id)
+
+        self._tasks = [
+            asyncio.create_task(self._worker()) for _ in range(self._workers)
+        ]
+        self._tasks.append(asyncio.create_task(self._sweeper()))
+
+    async def stop(self) -> None:
+        interrupted = list(self._running)
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+        # Whatever was interrupted is picked up again on the next start.
+        if interrupted:
+            async with self._session_factory() as session:
+                await session.execute(
+                    update(ScrapeJob)
+                    .where(
+                        ScrapeJob.id.in_(interrupted),
+                        ScrapeJob.status == JOB_RUNNING,
+                    )
+                    .values(status=JOB_QUEUED, progress=0)
+                )
+                await session.commit()
+
+    async def submit(self, kind: str, payload: dict) -> ScrapeJob:
+        if kind not in self._runners:
+            raise ValueError(f'unknown job kind: {kind}')
+        job = ScrapeJob(id=uuid.uuid4().hex, kind=kind, payload=payload)
+        async with self._session_factory() as session:
+            session.add(job)
+            await session.commit()
+            await session.refresh(job)
+            session.expunge(job)
+        self._queue.put_nowait(job.id)
+        return job
+
+    async def get(self, job_id: str) -> ScrapeJob | None:
+        async with self._session_factory() as session:
+            job = await session.get(ScrapeJob, job_id, populate_existing=True)
+            if job is None or _is_expired(job):
+                return None
+            session.expunge(job)
+            return job
+
+    async def cancel(self, job_id: str) -> ScrapeJob | None:
+        """Cancel a queued or running job; finished jobs are left as-is."""
+        async with self._session_factory() as session:
+            job = await session.get(ScrapeJob, job_id, populate_existing=True)
+            if job is None or _is_expired(job):
+                return None
+            if job.status in ACTIVE_STATUSES:
+                self._cancelled.add(job_id)
+                job.status = JOB_CANCELLED
+                job.expires_at = datetime.now() + self._result_ttl
+                await session.commit()
+                await session.refresh(job)
+                task = self._running.get(job_id)
+                if task is not None:
+                    task.cancel()
+            session.expunge(job)
+            return job
+
+    async def purge_expired(self) -> int:
+        async with self._session_factory() as session:
+            result = await session.execute(
+                delete(ScrapeJob).where(ScrapeJob.expires_at < datetime.now())
+            )
+            await session.commit()
+            return result.rowcount
+
+    async def _sweeper(self) -> None:
+        interval = min(self._result_ttl.total_seconds(), 60.0)
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await self.purge_expired()
+            except Exception:
+                logger.exception('Could not purge expired jobs')
+
+    async def _worker(self) -> None:
+        while True:
+            job_id = await self._queue.get()
+            try:
+                await self._run(job_id)
+            except Exception as exc:
+                # Keep the worker alive; the job is failed if the database
+                # lets us, otherwise the next start picks it up again.
+                logger.exception('Job %s crashed', job_id)
+                try:
+                    await self._finish(
+                        job_id, JOB_FAILED, error=str(exc) or repr(exc)
+                    )
+                except Exception:
+                    logger.exception('Could not mark job %s failed', job_id)
+            finally:
+                self._queue.task_done()
+
+    async def _run(self, job_id: str) -> None:
+        try:
+            await self._execute(job_id)
+        finally:
+            # Also clears jobs cancelled while they were still queued.
+            self._cancelled.discard(job_id)
+
+    async def _execute(self, job_id: str) -> None:
+        claimed = await self._claim(job_id)
+        if claimed is None:
+            return
+        kind, payload = claimed
+
+        context = JobContext(
+            session_factory=self._session_factory,
+            report=self._progress_reporter(job_id),
+            http_client=self._client_provider(),
+            host_limiter=self._host_limiter,
+            parse_executor=self._parse_executor,
+            validator_store=self._validator_store,
+        )
+        # Cancelled after the claim but before the task was registered.
+        if job_id in self._cancelled:
+            return
+        task = asyncio.create_task(self._runners[kind](payload, context))
+        self._running[job_id] = task
+        try:
+            result = await task
+        except asyncio.CancelledError:
+            if job_id not in self._cancelled:
+                raise
+            return
+        except Exception as exc:  # noqa: BLE001
+            await self._finish(job_id, JOB_FAILED, error=str(exc) or repr(exc))
+        else:
+            await self._finish(job_id, JOB_SUCCEEDED, result=result)
+        finally:
+            self._running.pop(job_id, None)
+
+    async def _claim(self, job_id: str) -> tuple[str, dict] | None:
+        """Move a queued job to running; ``None`` if it is not queued."""
+        async with self._session_factory() as session:
+            job = await session.get(ScrapeJob, job_id, populate_existing=True)
+            if job is None or job.status != JOB_QUEUED:
+                return None
+            kind, payload = job.kind, job.payload
+            claimed = await session.execute(
+                update(ScrapeJob)
+                .where(ScrapeJob.id == job_id, ScrapeJob.status == JOB_QUEUED)
+                .values(status=JOB_RUNNING)
+            )
+            await session.commit()
+        if claimed.rowcount != 1:
+            return None
+        return kind, payload
+
+    async def _finish(
+        self,
+        job_id: str,
+        status: str,
+        result: dict | None = None,
+        error: str | None = None,
+    ) -> None:
+        values = {
+            'status': status,
+            'result': result,
+            'error': error,
+            'expires_at': datetime.now() + self._result_ttl,
+        }
+        if status == JOB_SUCCEEDED:
+            values['progress'] = func.coalesce(
+                ScrapeJob.total, ScrapeJob.progress
+            )
+        async with self._session_factory() as session:
+            # Only a running job is finished, so a cancel that lands while
+            # the runner wraps up keeps the job cancelled.
+            await session.execute(
+                update(ScrapeJob)
+                .where(ScrapeJob.id == job_id, ScrapeJob.status == JOB_RUNNING)
+                .values(**values)
+            )
+            await session.commit()
+
+    def _progress_reporter(self, job_id: str):
+        last_write = 0.0
+
+        async def report(done: int, total: int | None) -> None:
+            nonlocal last_write
+            now = time.monotonic()
+            if now - last_write < PROGRESS_INTERVAL and done != total:
+                return
+            last_write = now
+            async with self._session_factory() as session:
+                await session.execute(
+                    update(ScrapeJob)
+                    .where(ScrapeJob.id == job_id)
+                    .values(progress=done, total=total)
+                )
+                await session.commit()
+
+        return report
+
+
+def _is_expired(job: ScrapeJob) -> bool:
+    return job.expires_at is not None and job.expires_at < datetime.now()
+
+
+async def run_scrape_job(payload: dict, context: JobContext) -> dict:
+    request = ScrapeUrlsRequest.model_validate(payload)
+    scraper = Scraper(
+        max_concurrency=request.max_concurrency,
+        client=context.http_client,
+        per_host_concurrency=request.per_host_concurrency,
+        per_host_rps=request.per_host_rps,
+        adaptive=request.adaptive,
+        host_limiter=context.host_limiter if request.adaptive else None,
+        parse_executor=context.parse_executor,
+        validator_store=context.validator_store,
+    )
+    total = len(request.urls)
+    await context.report(0, total)
+
+    items = []
+    async for item in scraper.iter_scrape(str(url) for url in request.urls):
+        items.append(item)
+        await context.report(len(items), total)
+
+    async with context.session_factory() as session:
+        saved_count, product_ids = await session.run_sync(
+            save_scraped_items, items, request.category
+        )
+        products = await session.run_sync(load_best_prices, product_ids)
+
+    return ScrapeResult(
+        total_scraped=len(items),
+        total_saved=saved_count,
+        products=products,
+        raw_items=[
+            ScrapedItemPublic(
+                url=item.url,
+                title=item.title,
+                price=item.price,
+                currency=item.currency,
+            )
+            for item in items
+        ],
+    ).model_dump(mode='json')
+
+
+async def run_crawl_job(payload: dict, context: JobContext) -> dict:
+    request = CrawlRequest.model_validate(payload)
+    scraper = Scraper(
+        max_concurrency=request.max_concurrency,
+        client=context.http_client,
+        adaptive=request.adaptive,
+        host_limiter=context.host_limiter if request.adaptive else None,
+    )
+    urls = await scraper.discover_urls(
+        base_url=str(request.base_url),
+        max_urls=request.max_urls,
+        include_patterns=request.include_patterns,
+        exclude_patterns=request.exclude_patterns,
+        use_sitemap=request.use_sitemap,
+        follow_links=request.follow_links,
+        max_depth=request.max_depth,
+    )
+    await context.report(len(urls), len(urls))
+    return CrawlResponse(total_urls=len(urls), urls=urls).model_dump(
+        mode='json'
+    )
+
+
+async def run_search_job(payload: dict, context: JobContext) -> dict:
+    request = SearchCrawlRequest.model_validate(payload)
+    options = {
+        'search_url': str(request.search_url),
+        'max_pages': request.max_pages,
+        'max_urls': request.max_urls,
+        'include_patterns': request.include_patterns,
+        'exclude_patterns': request.exclude_patterns,
+    }
+    if request.query:
+        scraper = SmartScraper(
+            max_concurrency=request.max_concurrency,
+            client=context.http_client,
+        )
+        urls = await scraper.discover_search_urls_optimized(
+            query=request.query, **options
+        )
+    else:
+        scraper = Scraper(
+            max_concurrency=request.max_concurrency,
+            client=context.http_client,
+        )
+        urls = await scraper.discover_search_urls(**options)
+    await context.report(len(urls), len(urls))
+    return SearchCrawlResponse(total_urls=len(urls), urls=urls).model_dump(
+        mode='json'
+    )
+
+
+DEFAULT_RUNNERS: dict[str, JobRunner] = {
+    'scrape': run_scrape_job,
+    'crawl': run_crawl_job,
+    'search': run_search_job,
+}
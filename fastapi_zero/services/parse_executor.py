@@ -0,0 +1,67 @@
+"""Optional off-loop executor for the CPU-heavy part of scraping."""
+
+import asyncio
+import multiprocessing
+from concurrent.futures import (
+    Executor,
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+)
+from typing import Literal
+
+from fastapi_zero.services.scraper import ScrapedItem, parse_html
+
+ExecutorKind = Literal['process', 'thread']
+
+
+def parse_html_bytes(
+    url: str, content: bytes, encoding: str | None = None
+) -> ScrapedItem:
+    """Decode and parse a page body; runs inside the executor workers."""
+    html = content.decode(encoding or 'utf-8', errors='replace')
+    return parse_html(url, html)
+
+
+class ParseExecutor:
+    """Runs ``parse_html`` in a process or thread pool.
+
+    Parsing a product page (DOM build, a dozen regex scans, JSON-LD and
+    ``__NEXT_DATA__`` decoding) is pure CPU; done on the event loop it
+    delays every other in-flight fetch. Bodies cross the pool boundary as
+    the raw response bytes, which are usually smaller than the decoded
+    ``str`` and pickle without re-encoding, and are decoded in the worker.
+    """
+
+    def __init__(
+        self, workers: int | None = None, kind: ExecutorKind = 'process'
+    ):
+        self._kind = kind
+        self._executor: Executor
+        if kind == 'process':
+            # spawn: forking a process that already runs an event loop and
+            # a thread pool is not safe.
+            self._executor = ProcessPoolExecutor(
+                max_workers=workers,
+                mp_context=multiprocessing.get_context('spawn'),
+            )
+        elif kind == 'thread':
+            self._executor = ThreadPoolExecutor(
+                max_workers=workers, thread_name_prefix='parse'
+            )
+        else:
+            raise ValueError(f'unknown parse executor kind: {kind}')
+
+    @property
+    def kind(self) -> ExecutorKind:
+        return self._kind
+
+    async def parse(
+        self, url: str, content: bytes, encoding: str | None = None
+    ) -> ScrapedItem:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self._executor, parse_html_bytes, url, content, encoding
+        )
+
+    def shutdown(self, wait: bool = True) -> None:
+        self._executor.shutdown(wait=wait, cancel_futures=True)
@@ -0,0 +1,126 @@
+"""Local search over stored products through an inverted word index.
+
+Every product's ``display_name`` and ``normalized_name`` are split into
+words and kept in ``product_terms`` as products are created, so a query
+only reads the products sharing a word with it. The candidates are then
+ranked with the same relevance score as ``SearchOptimizer``, computed on
+accent-folded text so ``cafe`` and ``café`` rank alike.
+"""
+
+import heapq
+import unicodedata
+from collections.abc import Iterable
+from operator import itemgetter
+
+from sqlalchemy import func, insert, select
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+
+from fastapi_zero.db.models import BestPrice, Product, ProductTerm
+from fastapi_zero.schemas import ProductSearchHit
+from fastapi_zero.services.search_optimizer import (
+    MIN_RELEVANCE_SCORE,
+    WORD_PATTERN,
+    SearchOptimizer,
+)
+
+# Products read per query, those matching the most query words first.
+SEARCH_CANDIDATES = 1000
+
+
+def fold_accents(word: str) -> str:
+    decomposed = unicodedata.normalize('NFKD', word)
+    return ''.join(c for c in decomposed if not unicodedata.combining(c))
+
+
+def product_terms(display_name: str, normalized_name: str) -> set[str]:
+    """Index terms of a product, with and without accents.
+
+    Stopwords stay in the index; they are dropped from the query instead.
+    """
+    words = set(WORD_PATTERN.findall(display_name.lower()))
+    words.update(normalized_name.split())
+    return words | {fold_accents(word) for word in words}
+
+
+def index_products(
+    session: Session, products: Iterable[tuple[int, str, str]]
+) -> None:
+    """Add the terms of ``(id, display_name, normalized_name)`` products.
+
+    Runs in the caller's transaction; terms already indexed are skipped.
+    """
+    rows = [
+        {'term': term, 'product_id': product_id}
+        for product_id, display_name, normalized_name in products
+        for term in product_terms(display_name, normalized_name)
+    ]
+    if rows:
+        session.execute(_insert_terms(session), rows)
+
+
+def _insert_terms(session: Session):
+    dialect = session.get_bind().dialect.name
+    if dialect == 'sqlite':
+        return sqlite_insert(ProductTerm).on_conflict_do_nothing()
+    if dialect == 'postgresql':
+        return postgresql_insert(ProductTerm).on_conflict_do_nothing()
+    return insert(ProductTerm)
+
+
+def search_products(
+    session: Session, query: str, limit: int
+) -> list[ProductSearchHit]:
+    """Best ``limit`` products for ``query``, most relevant first."""
+    words = SearchOptimizer(query).meaningful_words
+    terms = words | {fold_accents(word) for word in words}
+    if not terms:
+        return []
+
+    matched = func.count(ProductTerm.term)
+    candidates = (
+        select(ProductTerm.product_id)
+        .where(ProductTerm.term.in_(terms))
+        .group_by(ProductTerm.product_id)
+        .order_by(matched.desc(), ProductTerm.product_id)
+        .limit(SEARCH_CANDIDATES)
+        .subquery()
+    )
+    rows = session.execute(
+        select(Product, BestPrice)
+        .join(candidates, candidates.c.product_id == Product.id)
+        .join(BestPrice, BestPrice.product_id == Product.id)
+        .order_by(Product.id)
+    ).all()
+
+    # Ranked without accents on both sides, like the index lookup.
+    optimizer = SearchOptimizer(fold_accents(query))
+    scores = optimizer.score_titles([
+        fold_accents(product.display_name) for product, _ in rows
+    ])
+    # Ties keep the product id order.
+    ranked = heapq.nlargest(
+        limit,
+        (
+            (score, position)
+            for position, score in enumerate(scores)
+            if score >= MIN_RELEVANCE_SCORE
+        ),
+        key=itemgetter(0),
+    )
+    hits = []
+    for score, position in ranked:
+        product, best = rows[position]
+        hits.append(
+            ProductSearchHit(
+                product_id=product.id,
+                name=product.display_name,
+                category=product.category,
+                lowest_price=best.price,
+                currency=best.currency,
+                source_url=best.source_url,
+                relevance_score=score,
+            )
+        )
+    return hits
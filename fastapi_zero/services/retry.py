@@ -0,0 +1,76 @@
+"""Retry policy for scraper fetches: Retry-After plus decorrelated jitter."""
+
+import random
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+
+import httpx
+
+RETRY_STATUSES = frozenset({403, 429, 503})
+
+
+def parse_retry_after(
+    value: str | None, now: datetime | None = None
+) -> float | None:
+    """Seconds to wait from a ``Retry-After`` header (delta or HTTP-date)."""
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    now = now or datetime.now(timezone.utc)
+    return max(0.0, (when - now).total_seconds())
+
+
+class RetryPolicy:
+    """Decides whether a failed fetch is retried and how long to back off.
+
+    Delays follow the "decorrelated jitter" scheme,
+    ``min(max_delay, uniform(base_delay, previous * 3))``, so concurrent
+    retries spread out instead of firing in lockstep. A server-provided
+    ``Retry-After`` takes precedence; if it asks for more than
+    ``max_delay`` the URL is given up on rather than parked.
+    """
+
+    def __init__(
+        self,
+        max_attempts: int = 3,
+        base_delay: float = 0.4,
+        max_delay: float = 30.0,
+        retry_statuses: frozenset[int] = RETRY_STATUSES,
+        rng: random.Random | None = None,
+    ):
+        self.max_attempts = max_attempts
+        self._base_delay = base_delay
+        self._max_delay = max_delay
+        self._retry_statuses = retry_statuses
+        self._rng = rng or random.Random()
+
+    def should_retry(self, response: httpx.Response | None) -> bool:
+        """Retry transport errors, throttling statuses and 5xx answers."""
+        if response is None:
+            return True
+        status = response.status_code
+        return status in self._retry_statuses or status >= 500  # noqa: PLR2004
+
+    def next_delay(
+        self,
+        previous_delay: float | None,
+        response: httpx.Response | None = None,
+    ) -> float | None:
+        headers = getattr(response, 'headers', None) or {}
+        retry_after = parse_retry_after(headers.get('Retry-After'))
+        if retry_after is not None:
+            if retry_after > self._max_delay:
+                return None
+            return retry_after
+
+        previous = previous_delay or self._base_delay
+        upper = max(self._base_delay, previous * 3)
+        return min(self._max_delay, self._rng.uniform(self._base_delay, upper))
@@ -1,16 +1,53 @@
 import asyncio
 import json
+import logging
 import re
+import time
 import xml.etree.ElementTree as ET
+import zlib
 from collections import deque
+from contextlib import (
+    AbstractAsyncContextManager,
+    aclosing,
+    asynccontextmanager,
+    nullcontext,
+)
 from dataclasses import dataclass
-from typing import Iterable
+from functools import lru_cache
+from http import HTTPStatus
+from itertools import islice
+from typing import (
+    TYPE_CHECKING,
+    AsyncIterator,
+    Callable,
+    Iterable,
+    Iterator,
+)
 from urllib.parse import urljoin, urlparse, urlunparse
 
 import httpx
 from selectolax.parser import HTMLParser
 
+from fastapi_zero.services.http_client import build_client
+from fastapi_zero.services.retry import RetryPolicy
+from fastapi_zero.services.throttle import (
+    AdaptiveHostLimiter,
+    HostLimiter,
+    LayeredHostLimiter,
+)
+
+if TYPE_CHECKING:
+    from fastapi_zero.services.parse_executor import ParseExecutor
+    from fastapi_zero.services.validators import CachedPage, ValidatorStore
+
+logger = logging.getLogger(__name__)
+
 MIN_PRICE_LENGTH = 3
+PRICE_CACHE_SIZE = 4096
+PLAIN_PRICE = re.compile(r'[0-9]+(?:\.[0-9]+)?')
+BRL_CODE = re.compile(r'\bBRL\b', flags=re.IGNORECASE)
+EUR_CODE = re.compile(r'\bEUR\b', flags=re.IGNORECASE)
+USD_CODE = re.compile(r'\bUSD\b', flags=re.IGNORECASE)
 
 PRICE_PATTERNS = [
     re.compile(r'R\$\s*\d{1,3}(?:\.\d{3})*(?:,\d{2})?'),
@@ -20,6 +57,35 @@ PRICE_PATTERNS = [
     re.compile(r'\d{1,3}(?:\.\d{3})*,\d{2}'),
     re.compile(r'\d{1,3}(?:,\d{3})*\.\d{2}'),
 ]
+# A literal every match of the PRICE_PATTERNS entry at the same index
+# contains; tokens without it skip that pattern.
+PRICE_PATTERN_HINTS = ('R$', 'R$', '$', '€', ',', '.')
+# Runs of digits and separators, glued to a currency symbol across
+# whitespace the way the patterns allow. No PRICE_PATTERNS match can span
+# two of these tokens, so matching inside each token gives the same
+# results as matching over the whole document.
+PRICE_TOKEN = re.compile(
+    r'(?:(?:R\$|[$€])\s*+)?\d[\d.,]*+'
+    r'(?:\s*+(?:R\$|[$€])(?:\s*+\d[\d.,]*+)?+)*+'
+)
+
+ABSOLUTE_PRODUCT_URL = re.compile(r"https?://[^\s\"'>]+/produto/[^\s\"'>]+")
+RELATIVE_PRODUCT_URL = re.compile(r"/produto/[^\s\"'>]+")
+SITEMAP_URL_ENTRY = 'url'
+SITEMAP_INDEX_ENTRY = 'sitemap'
+SITEMAP_ROOTS = {
+    'urlset': SITEMAP_URL_ENTRY,
+    'sitemapindex': SITEMAP_INDEX_ENTRY,
+}
+GZIP_MAGIC = b'\x1f\x8b'
+SITEMAP_FETCH_CONCURRENCY = 8
+LINK_CRAWL_WORKERS = 8
+
+FetchSlot = Callable[[str], AbstractAsyncContextManager[object]]
+PAGINATION_MARKERS = ('page=', 'pagina=', 'page_number=', 'pageNumber=')
+PAGE_NUMBER_PARAM = re.compile(
+    r'([?&](?:page|pagina|page_number|pageNumber)=)(\d+)'
+)
 
 
 @dataclass(slots=True)
@@ -49,20 +115,94 @@ class ScrapedItem:
 
 
 class Scraper:
-    def __init__(self, max_concurrency: int = 20, timeout: float = 10.0):
+    def __init__(  # noqa: PLR0913, PLR0917
+        self,
+        max_concurrency: int = 20,
+        timeout: float = 10.0,
+        client: httpx.AsyncClient | None = None,
+        per_host_concurrency: int | None = None,
+        per_host_rps: float | None = None,
+        adaptive: bool = False,
+        host_limiter: HostLimiter | None = None,
+        retry_policy: RetryPolicy | None = None,
+        parse_executor: 'ParseExecutor | None' = None,
+        validator_store: 'ValidatorStore | None' = None,
+    ):
         self._semaphore = asyncio.Semaphore(max_concurrency)
+        # Twice the slot count keeps slots busy while some URLs back off.
+        self._max_in_flight = max_concurrency * 2
         self._timeout = timeout
+        self._client = client
+        self._retry_policy = retry_policy or RetryPolicy()
+        if host_limiter is None:
+            host_limiter = _build_host_limiter(
+                max_concurrency, per_host_concurrency, per_host_rps, adaptive
+            )
+        elif per_host_concurrency or per_host_rps:
+            # A shared limiter keeps its learned state; the caller's caps
+            # still apply on top of it.
+            host_limiter = LayeredHostLimiter(
+                host_limiter, per_host_concurrency, per_host_rps
+            )
+        self._host_limiter = host_limiter
+        self._parse_executor = parse_executor
+        self._validator_store = validator_store
+
+    def host_limits(self) -> dict[str, float]:
+        return self._host_limiter.limits()
 
     async def scrape_urls(self, urls: Iterable[str]) -> list[ScrapedItem]:
-        async with self._build_client() as client:
-            tasks = [self._bounded_fetch(client, url) for url in urls]
-            results = await asyncio.gather(*tasks, return_exceptions=True)
+        return [item async for item in self.iter_scrape(urls)]
+
+    async def iter_scrape(
+        self, urls: Iterable[str]
+    ) -> AsyncIterator[ScrapedItem]:
+        """Yield items in completion order, pulling URLs lazily.
+
+        At most ``2 * max_concurrency`` fetches exist at any time, so the
+        input can be a generator over millions of URLs.
+        """
+        url_iter = iter(urls)
+        pending: set[asyncio.Task] = set()
+        # Validators are looked up per refill and written back in batches,
+        # so the store costs a round trip per batch rather than per URL.
+        changes: dict[str, CachedPage | None] = {}
+
+        async with self._client_scope() as client:
+            try:
+                while True:
+                    batch = list(
+                        islice(url_iter, self._max_in_flight - len(pending))
+                    )
+                    cached = await self._lookup_validators(batch)
+                    for url in batch:
+                        pending.add(
+                            asyncio.create_task(
+                                self._bounded_fetch(
+                                    client, url, cached.get(url), changes
+                                )
+                            )
+                        )
+                    if len(changes) >= self._max_in_flight:
+                        await self._save_validators(changes)
+                    if not pending:
+                        break
 
-        items: list[ScrapedItem] = []
-        for result in results:
-            if isinstance(result, ScrapedItem):
-                items.append(result)
-        return items
+                    done, pending = await asyncio.wait(
+                        pending, return_when=asyncio.FIRST_COMPLETED
+                    )
+                    for task in done:
+                        if task.cancelled() or task.exception():
+                            continue
+                        result = task.result()
+                        if isinstance(result, ScrapedItem):
+                            yield result
+            finally:
+                for task in pending:
+                    task.cancel()
+                if pending:
+                    await asyncio.gather(*pending, return_exceptions=True)
+                await self._save_validators(changes)
 
     async def discover_urls(
         self,
@@ -95,22 +235,35 @@ class Scraper:
             include_regex=_compile_patterns(config.include_patterns),
             exclude_regex=_compile_patterns(config.exclude_patterns),
         )
-        discovered: set[str] = set()
+        # A dict is an insertion-ordered set: O(1) membership and results
+        # come back in discovery order, sitemap URLs first.
+        discovered: dict[str, None] = {}
 
-        async with self._build_client() as client:
+        async with self._client_scope() as client:
             if config.use_sitemap:
                 sitemap_urls = await _discover_from_sitemap(
-                    client, base_url, config.max_urls, filters
+                    client,
+                    base_url,
+                    config.max_urls,
+                    filters,
+                    slot=self._fetch_slot,
+                    max_in_flight=self._max_in_flight,
                 )
-                discovered.update(sitemap_urls)
+                discovered.update(dict.fromkeys(sitemap_urls))
 
             if config.follow_links and len(discovered) < config.max_urls:
                 link_urls = await _discover_from_links(
-                    client, base_url, allowed_host, config, filters
+                    client,
+                    base_url,
+                    allowed_host,
+                    config,
+                    filters,
+                    slot=self._fetch_slot,
+                    workers=self._max_in_flight,
                 )
-                discovered.update(link_urls)
+                discovered.update(dict.fromkeys(link_urls))
 
-        return list(discovered)[: config.max_urls]
+        return list(islice(discovered, config.max_urls))
 
     async def discover_search_urls(
         self,
@@ -125,95 +278,223 @@ class Scraper:
 
         include_regex = _compile_patterns(include_patterns)
         exclude_regex = _compile_patterns(exclude_patterns)
-        discovered: set[str] = set()
+        discovered: dict[str, None] = {}
         visited_pages: set[str] = set()
-        page_queue = deque([search_url])
-
-        async with self._build_client() as client:
-            while page_queue and len(visited_pages) < max_pages:
-                page_url = page_queue.popleft()
-                if page_url in visited_pages:
-                    continue
-                visited_pages.add(page_url)
-
-                html = await _fetch_text(client, page_url)
-                if not html:
-                    continue
-
-                product_links = _extract_product_urls_from_html(
-                    html,
-                    base_url=page_url,
-                    include_regex=include_regex,
-                    exclude_regex=exclude_regex,
+        paginators = _Paginators()
+        frontier = [search_url]
+
+        async with self._client_scope() as client:
+            # Pages are fetched in waves: every page known so far, linked
+            # or predicted, is fetched concurrently within the budget.
+            while (
+                len(visited_pages) < max_pages and len(discovered) < max_urls
+            ):
+                batch = list(
+                    islice(
+                        dict.fromkeys(
+                            url for url in frontier if url not in visited_pages
+                        ),
+                        max_pages - len(visited_pages),
+                    )
                 )
-                product_links.extend(
-                    _extract_product_urls_from_next_data(
-                        html,
-                        base_url=page_url,
-                        include_regex=include_regex,
-                        exclude_regex=exclude_regex,
+                if not batch:
+                    break
+                visited_pages.update(batch)
+
+                pages = await asyncio.gather(
+                    *(
+                        self._fetch_search_page(
+                            client, page_url, include_regex, exclude_regex
+                        )
+                        for page_url in batch
                     )
                 )
-                for link in product_links:
-                    if link not in discovered:
-                        discovered.add(link)
+
+                frontier = []
+                for page_url, page in zip(batch, pages):
+                    paginators.record(page_url, page)
+                    if page is None:
+                        continue
+                    for link in page.product_links:
                         if len(discovered) >= max_urls:
                             break
+                        discovered[link] = None
+                    frontier.extend(page.pagination_links)
+                frontier.extend(
+                    paginators.predict(max_pages - len(visited_pages))
+                )
 
-                if len(visited_pages) >= max_pages:
-                    break
+        return list(islice(discovered, max_urls))
 
-                for next_page in _extract_pagination_links(
-                    html,
-                    base_url=page_url,
-                ):
-                    if next_page not in visited_pages:
-                        page_queue.append(next_page)
+    async def _fetch_search_page(
+        self,
+        client: httpx.AsyncClient,
+        page_url: str,
+        include_regex: list[re.Pattern[str]] | None,
+        exclude_regex: list[re.Pattern[str]] | None,
+    ) -> 'PageAnalysis | None':
+        async with self._fetch_slot(page_url):
+            html = await _fetch_text(client, page_url)
+        if not html:
+            return None
+        return analyze_search_page(
+            html,
+            base_url=page_url,
+            include_regex=include_regex,
+            exclude_regex=exclude_regex,
+        )
 
-        return list(discovered)[:max_urls]
+    def _client_scope(self):
+        # A shared client belongs to whoever injected it (the app lifespan),
+        # so it is lent out without being closed at the end of the call.
+        if self._client is not None:
+            return nullcontext(self._client)
+        return self._build_client()
 
     def _build_client(self) -> httpx.AsyncClient:
-        return httpx.AsyncClient(
-            timeout=httpx.Timeout(self._timeout),
-            headers={
-                'User-Agent': (
-                    'Mozilla/5.0 (X11; Linux x86_64) '
-                    'AppleWebKit/537.36 (KHTML, like Gecko) '
-                    'Chrome/122.0 Safari/537.36'
-                ),
-                'Accept': (
-                    'text/html,application/xhtml+xml,application/xml;'
-                    'q=0.9,image/avif,image/webp,*/*;q=0.8'
-                ),
-                'Accept-Language': 'pt-BR,pt;q=0.9,en-US;q=0.8,en;q=0.7',
-                'Cache-Control': 'no-cache',
-                'Pragma': 'no-cache',
-                'Upgrade-Insecure-Requests': '1',
-            },
-            follow_redirects=True,
-        )
+        return build_client(self._timeout)
+
+    @asynccontextmanager
+    async def _fetch_slot(self, url: str) -> AsyncIterator[None]:
+        host = urlparse(url).netloc
+        async with self._host_limiter.slot(host), self._semaphore:
+            yield
+
+    async def _lookup_validators(
+        self, urls: list[str]
+    ) -> dict[str, 'CachedPage']:
+        # The store only saves bandwidth: when it fails the batch is
+        # fetched unconditionally instead of being lost.
+        if self._validator_store is None or not urls:
+            return {}
+        try:
+            return await self._validator_store.get_many(urls)
+        except Exception:
+            logger.exception(
+                'Validator lookup failed; fetching %d URLs unconditionally',
+                len(urls),
+            )
+            return {}
 
-    async def _bounded_fetch(self, client: httpx.AsyncClient, url: str):
-        async with self._semaphore:
-            for attempt in range(3):
-                try:
-                    response = await client.get(url)
-                    if response.status_code in {403, 429, 503}:
-                        await asyncio.sleep(0.6 * (attempt + 1))
-                        continue
-                    response.raise_for_status()
-                    return parse_html(url, response.text)
-                except Exception:
-                    await asyncio.sleep(0.4 * (attempt + 1))
-
-            return ScrapedItem(
-                url=url,
-                title=None,
-                price=None,
-                currency=None,
-                raw_price=None,
+    async def _save_validators(
+        self, changes: dict[str, 'CachedPage | None']
+    ) -> None:
+        if self._validator_store is None or not changes:
+            return
+        batch = dict(changes)
+        changes.clear()
+        try:
+            await self._validator_store.update(batch)
+        except Exception:
+            logger.exception(
+                'Could not store validators for %d URLs', len(batch)
             )
 
+    async def _bounded_fetch(
+        self,
+        client: httpx.AsyncClient,
+        url: str,
+        cached: 'CachedPage | None' = None,
+        changes: dict[str, 'CachedPage | None'] | None = None,
+    ):
+        host = urlparse(url).netloc
+        delay = None
+        for attempt in range(self._retry_policy.max_attempts):
+            # The host slot is taken first so requests queued behind a busy
+            # host never sit on a global slot other hosts could be using.
+            async with self._host_limiter.slot(host), self._semaphore:
+                item, response = await self._fetch_once(
+                    client, url, host, cached
+                )
+            if item is not None:
+                if (
+                    self._validator_store is not None
+                    and changes is not None
+                    and response.status_code != HTTPStatus.NOT_MODIFIED
+                ):
+                    page = self._validator_store.page_for(response, item)
+                    # A page that stopped sending validators drops its
+                    # stale entry.
+                    if page is not None or cached is not None:
+                        changes[url] = page
+                return item
+
+            if attempt + 1 >= self._retry_policy.max_attempts:
+                break
+            if not self._retry_policy.should_retry(response):
+                break
+            delay = self._retry_policy.next_delay(delay, response)
+            if delay is None:
+                break
+            # Backoff happens outside both slots so other URLs keep them
+            # busy while this one waits to be retried.
+            await asyncio.sleep(delay)
+
+        return ScrapedItem(
+            url=url,
+            title=None,
+            price=None,
+            currency=None,
+            raw_price=None,
+        )
+
+    async def _fetch_once(
+        self,
+        client: httpx.AsyncClient,
+        url: str,
+        host: str,
+        cached: 'CachedPage | None' = None,
+    ) -> tuple[ScrapedItem | None, httpx.Response | None]:
+        headers = cached.request_headers() if cached is not None else None
+        started = time.monotonic()
+        try:
+            if headers:
+                response = await client.get(url, headers=headers)
+            else:
+                response = await client.get(url)
+        except httpx.TimeoutException:
+            self._host_limiter.record(host, time.monotonic() - started, None)
+            return None, None
+        except Exception:
+            return None, None
+
+        self._host_limiter.record(
+            host, time.monotonic() - started, response.status_code
+        )
+        if self._retry_policy.should_retry(response):
+            return None, response
+        if headers and response.status_code == HTTPStatus.NOT_MODIFIED:
+            return cached.item, response
+        try:
+            response.raise_for_status()
+            if self._parse_executor is not None:
+                item = await self._parse_executor.parse(
+                    url, response.content, response.encoding
+                )
+            else:
+                item = parse_html(url, response.text)
+        except Exception:
+            return None, response
+        return item, response
+
+
+def _build_host_limiter(
+    max_concurrency: int,
+    per_host_concurrency: int | None,
+    per_host_rps: float | None,
+    adaptive: bool,
+) -> HostLimiter:
+    if adaptive:
+        ceiling = per_host_concurrency or max_concurrency
+        return AdaptiveHostLimiter(
+            initial_per_host=min(4, ceiling),
+            max_per_host=ceiling,
+            rate_per_host=per_host_rps,
+        )
+    return HostLimiter(
+        max_per_host=per_host_concurrency, rate_per_host=per_host_rps
+    )
+
 
 def parse_html(url: str, html: str) -> ScrapedItem:
     parser = HTMLParser(html)
@@ -270,10 +551,9 @@ def extract_price(
         if tag and tag.attributes.get('content'):
             candidates.append(tag.attributes['content'].strip())
 
-    body_text = parser.text()
-    for pattern in PRICE_PATTERNS:
-        candidates.extend(pattern.findall(body_text))
-
+    candidates.extend(
+        match for _, match in scan_price_candidates(parser.text())
+    )
     candidates.extend(extract_price_from_raw_html(html))
 
     parsed_candidates: list[tuple[float, str | None, str, int]] = []
@@ -298,11 +578,32 @@ def extract_price(
     return best_raw, best_currency, best_price
 
 
+def scan_price_candidates(text: str) -> list[tuple[int, str]]:
+    """Find every PRICE_PATTERNS match in ``text`` with a single scan.
+
+    Returns ``(pattern index, match)`` pairs in the order of running each
+    pattern's ``findall`` over ``text`` in turn. The document is tokenized
+    once with PRICE_TOKEN; each pattern then only runs over the tokens
+    holding its hint, packed with a separator no pattern can match.
+    """
+    buckets: list[list[str]] = [[] for _ in PRICE_PATTERNS]
+    hinted = tuple(zip(PRICE_PATTERN_HINTS, buckets))
+    for token in PRICE_TOKEN.findall(text):
+        if token.isdigit():
+            continue
+        for hint, bucket in hinted:
+            if hint in token:
+                bucket.append(token)
+    return [
+        (index, match)
+        for index, (pattern, bucket) in enumerate(zip(PRICE_PATTERNS, buckets))
+        if bucket
+        for match in pattern.findall('\x00'.join(bucket))
+    ]
+
+
 def extract_price_from_raw_html(html: str) -> list[str]:
-    candidates: list[str] = []
-    for pattern in PRICE_PATTERNS:
-        candidates.extend(pattern.findall(html))
-    return candidates
+    return [match for _, match in scan_price_candidates(html)]
 
 
 def extract_from_scripts(
@@ -432,14 +733,27 @@ def _extract_from_next(
 
 
 def parse_price(raw: str) -> tuple[float | None, str | None]:
+    """Parse a price string into ``(value, currency)``.
+
+    Bare numbers such as ``"1299"`` or ``"1299.90"`` (meta tags, JSON-LD)
+    skip currency detection; anything else goes through an LRU cache, as
+    the same few strings repeat across candidates and pages.
+    """
+    if PLAIN_PRICE.fullmatch(raw):
+        return _to_price(raw, None), None
+    return _parse_price_cached(raw)
+
+
+@lru_cache(maxsize=PRICE_CACHE_SIZE)
+def _parse_price_cached(raw: str) -> tuple[float | None, str | None]:
     raw = raw.replace('\u00a0', ' ').strip()
     currency = None
 
-    if 'R$' in raw or re.search(r'\bBRL\b', raw, flags=re.IGNORECASE):
+    if 'R$' in raw or BRL_CODE.search(raw):
         currency = 'BRL'
-    elif '€' in raw or re.search(r'\bEUR\b', raw, flags=re.IGNORECASE):
+    elif '€' in raw or EUR_CODE.search(raw):
         currency = 'EUR'
-    elif '$' in raw or re.search(r'\bUSD\b', raw, flags=re.IGNORECASE):
+    elif '$' in raw or USD_CODE.search(raw):
         currency = 'USD'
 
     cleaned = (
@@ -464,18 +778,21 @@ def parse_price(raw: str) -> tuple[float | None, str | None]:
     elif ',' in cleaned:
         cleaned = cleaned.replace('.', '').replace(',', '.')
 
-    if cleaned.isdigit() and len(cleaned) >= MIN_PRICE_LENGTH:
-        try:
-            if currency is None:
-                return float(cleaned) / 100, currency
-            return float(cleaned), currency
-        except ValueError:
-            return None, currency
+    return _to_price(cleaned, currency), currency
+
 
+def _to_price(cleaned: str, currency: str | None) -> float | None:
     try:
-        return float(cleaned), currency
+        if (
+            currency is None
+            and cleaned.isdigit()
+            and len(cleaned) >= MIN_PRICE_LENGTH
+        ):
+            # Bare integers this long are cents, e.g. "129990".
+            return float(cleaned) / 100
+        return float(cleaned)
     except ValueError:
-        return None, currency
+        return None
 
 
 def normalize_product_name(name: str) -> str:
@@ -503,7 +820,10 @@ def _allowed_by_filters(
 
 
 def _normalize_url(url: str) -> str | None:
-    parsed = urlparse(url)
+    try:
+        parsed = urlparse(url)
+    except ValueError:
+        return None
     if not parsed.scheme or not parsed.netloc:
         return None
     normalized = parsed._replace(fragment='')
@@ -532,6 +852,28 @@ def _extract_links(
     return links
 
 
+class _LinkResolver:
+    """``urljoin`` plus normalization, memoized per page by raw reference.
+
+    Search pages repeat the same hrefs across anchors, inline scripts and
+    data attributes, and resolving them dominates per-page CPU.
+    """
+
+    __slots__ = ('_base_url', '_cache')
+
+    def __init__(self, base_url: str):
+        self._base_url = base_url
+        self._cache: dict[str, str | None] = {}
+
+    def __call__(self, ref: str) -> str | None:
+        try:
+            return self._cache[ref]
+        except KeyError:
+            normalized = _normalize_url(urljoin(self._base_url, ref))
+            self._cache[ref] = normalized
+            return normalized
+
+
 def _extract_product_urls_from_html(
     html: str,
     base_url: str,
@@ -553,25 +895,30 @@ def _extract_product_urls_from_html(
             continue
         links.add(normalized)
 
-    for match in re.findall(r"https?://[^\s\"'>]+/produto/[^\s\"'>]+", html):
-        normalized = _normalize_url(match)
-        if not normalized:
-            continue
-        if not _allowed_by_filters(normalized, include_regex, exclude_regex):
-            continue
-        links.add(normalized)
+    _add_product_urls_from_text(
+        links, html, _LinkResolver(base_url), include_regex, exclude_regex
+    )
+    return list(links)
 
-    for match in re.findall(r"/produto/[^\s\"'>]+", html):
-        absolute = urljoin(base_url, match)
-        normalized = _normalize_url(absolute)
-        if not normalized:
+
+def _add_product_urls_from_text(
+    links: set[str],
+    html: str,
+    resolve: _LinkResolver,
+    include_regex: list[re.Pattern[str]] | None,
+    exclude_regex: list[re.Pattern[str]] | None,
+) -> None:
+    """Product URLs that only appear in inline scripts or attributes."""
+    matches = ABSOLUTE_PRODUCT_URL.findall(html)
+    matches.extend(RELATIVE_PRODUCT_URL.findall(html))
+    for match in matches:
+        normalized = resolve(match)
+        if not normalized or normalized in links:
             continue
         if not _allowed_by_filters(normalized, include_regex, exclude_regex):
             continue
         links.add(normalized)
 
-    return list(links)
-
 
 def _extract_product_urls_from_next_data(
     html: str,
@@ -579,7 +926,17 @@ def _extract_product_urls_from_next_data(
     include_regex: list[re.Pattern[str]] | None,
     exclude_regex: list[re.Pattern[str]] | None,
 ) -> list[str]:
-    parser = HTMLParser(html)
+    return _product_urls_from_next_data(
+        HTMLParser(html), _LinkResolver(base_url), include_regex, exclude_regex
+    )
+
+
+def _product_urls_from_next_data(
+    parser: HTMLParser,
+    resolve: _LinkResolver,
+    include_regex: list[re.Pattern[str]] | None,
+    exclude_regex: list[re.Pattern[str]] | None,
+) -> list[str]:
     node = parser.css_first('script#__NEXT_DATA__')
     if not node or not node.text():
         return []
@@ -600,9 +957,8 @@ def _extract_product_urls_from_next_data(
                 yield item
                 yield from walk(item)
 
-    def add_url(candidate: str):
-        normalized = _normalize_url(candidate)
-        if not normalized:
+    def add_url(normalized: str | None):
+        if not normalized or normalized in urls:
             return
         if not _allowed_by_filters(normalized, include_regex, exclude_regex):
             return
@@ -611,19 +967,18 @@ def _extract_product_urls_from_next_data(
     for value in walk(payload):
         if isinstance(value, str) and '/produto/' in value:
             if value.startswith('/'):
-                add_url(urljoin(base_url, value))
+                add_url(resolve(value))
             else:
-                add_url(value)
+                add_url(_normalize_url(value))
 
         if isinstance(value, dict):
             code = value.get('code')
             friendly = value.get('friendlyName')
             external = value.get('externalUrl')
             if isinstance(external, str) and '/produto/' in external:
-                add_url(external)
+                add_url(_normalize_url(external))
             if isinstance(code, int) and isinstance(friendly, str):
-                candidate = urljoin(base_url, f'/produto/{code}/{friendly}')
-                add_url(candidate)
+                add_url(resolve(f'/produto/{code}/{friendly}'))
 
     return list(urls)
 
@@ -633,14 +988,7 @@ def _extract_pagination_links(html: str, base_url: str) -> list[str]:
     links: list[str] = []
     for anchor in parser.css('a'):
         href = anchor.attributes.get('href')
-        if not href:
-            continue
-        if (
-            'page=' not in href
-            and 'pagina=' not in href
-            and 'page_number=' not in href
-            and 'pageNumber=' not in href
-        ):
+        if not href or not _is_pagination_href(href):
             continue
         absolute = urljoin(base_url, href)
         normalized = _normalize_url(absolute)
@@ -649,47 +997,182 @@ def _extract_pagination_links(html: str, base_url: str) -> list[str]:
     return list(dict.fromkeys(links))
 
 
-async def _discover_from_sitemap(
+def _is_pagination_href(href: str) -> bool:
+    return any(marker in href for marker in PAGINATION_MARKERS)
+
+
+@dataclass(slots=True)
+class PageAnalysis:
+    product_links: list[str]
+    pagination_links: list[str]
+
+
+class _Paginators:
+    """Numbered paginators (``?page=N``) seen while crawling a search.
+
+    Each is keyed by the URL around the page number. Pages past the
+    highest one with products are predicted without waiting for links to
+    them, as many as pages of it already had products, so the look-ahead
+    doubles each wave and overshoots the last page by at most that much.
+    A page without products marks the paginator as exhausted.
+    """
+
+    def __init__(self):
+        self._highest: dict[tuple[str, str], int] = {}
+        self._productive: dict[tuple[str, str], int] = {}
+        self._exhausted: set[tuple[str, str]] = set()
+
+    def record(self, page_url: str, page: 'PageAnalysis | None') -> None:
+        match = PAGE_NUMBER_PARAM.search(page_url)
+        if match is None:
+            return
+        key = (page_url[: match.end(1)], page_url[match.end(2) :])
+        if page is None or not page.product_links:
+            self._exhausted.add(key)
+            return
+        number = int(match.group(2))
+        self._highest[key] = max(self._highest.get(key, 0), number)
+        self._productive[key] = self._productive.get(key, 0) + 1
+
+    def predict(self, limit: int) -> list[str]:
+        predicted = []
+        for key, number in self._highest.items():
+            if key in self._exhausted:
+                continue
+            prefix, suffix = key
+            ahead = min(limit, self._productive[key])
+            predicted.extend(
+                f'{prefix}{next_number}{suffix}'
+                for next_number in range(number + 1, number + 1 + ahead)
+            )
+        return predicted
+
+
+def analyze_search_page(
+    html: str,
+    base_url: str,
+    include_regex: list[re.Pattern[str]] | None,
+    exclude_regex: list[re.Pattern[str]] | None,
+) -> PageAnalysis:
+    """Product and pagination links of a search page from a single parse.
+
+    Equivalent to running ``_extract_product_urls_from_html``,
+    ``_extract_product_urls_from_next_data`` and
+    ``_extract_pagination_links`` on the same page, but the DOM is built
+    once and every distinct reference is resolved once for all link kinds.
+    """
+    parser = HTMLParser(html)
+    resolve = _LinkResolver(base_url)
+    product_links: set[str] = set()
+    pagination_links: list[str] = []
+
+    for anchor in parser.css('a'):
+        href = anchor.attributes.get('href')
+        if not href:
+            continue
+        normalized = resolve(href)
+        if not normalized:
+            continue
+        if normalized not in product_links and _allowed_by_filters(
+            normalized, include_regex, exclude_regex
+        ):
+            product_links.add(normalized)
+        if _is_pagination_href(href):
+            pagination_links.append(normalized)
+
+    _add_product_urls_from_text(
+        product_links, html, resolve, include_regex, exclude_regex
+    )
+    links = list(product_links)
+    links.extend(
+        _product_urls_from_next_data(
+            parser, resolve, include_regex, exclude_regex
+        )
+    )
+    return PageAnalysis(
+        product_links=links,
+        pagination_links=list(dict.fromkeys(pagination_links)),
+    )
+
+
+async def _discover_from_sitemap(  # noqa: PLR0913, PLR0917
     client: httpx.AsyncClient,
     base_url: str,
     max_urls: int,
     filters: DiscoveryFilters,
+    slot: FetchSlot | None = None,
+    max_in_flight: int = SITEMAP_FETCH_CONCURRENCY,
 ) -> list[str]:
+    """Collect product URLs from the site's sitemaps.
+
+    Child sitemaps of an index are read concurrently, up to
+    ``max_in_flight`` at once and each inside ``slot(url)`` (the scraper's
+    global and per-host limits). URLs are merged as they arrive; once
+    ``max_urls`` is reached the remaining downloads are cancelled.
+    """
     sitemap_candidates = await _find_sitemaps(client, base_url)
     seen_sitemaps: set[str] = set()
-    discovered: list[str] = []
-
+    discovered: dict[str, None] = {}
     queue = deque(sitemap_candidates)
-    while queue and len(discovered) < max_urls:
-        sitemap_url = queue.popleft()
-        if sitemap_url in seen_sitemaps:
-            continue
-        seen_sitemaps.add(sitemap_url)
-
-        content = await _fetch_text(client, sitemap_url)
-        if not content:
-            continue
+    slot = slot or (lambda url: nullcontext())
 
-        urls, sitemaps = _parse_sitemap(content)
-        for loc in urls:
-            normalized = _normalize_url(loc)
-            if not normalized:
-                continue
-            if not _allowed_by_filters(
-                normalized, filters.include_regex, filters.exclude_regex
-            ):
-                continue
-            if normalized not in discovered:
-                discovered.append(normalized)
+    async def read(sitemap_url: str) -> None:
+        # A broken child only loses its own URLs, never its siblings'.
+        try:
+            await collect(sitemap_url)
+        except Exception as exc:  # noqa: BLE001
+            logger.warning('Skipping sitemap %s: %r', sitemap_url, exc)
+
+    async def collect(sitemap_url: str) -> None:
+        # aclosing: leaving early closes the response instead of letting
+        # the rest of a multi-megabyte sitemap download in the background.
+        async with (
+            slot(sitemap_url),
+            aclosing(_iter_sitemap(client, sitemap_url)) as entries,
+        ):
+            async for kind, loc in entries:
                 if len(discovered) >= max_urls:
-                    break
+                    return
+                normalized = _normalize_url(loc)
+                if not normalized:
+                    continue
+                if kind == SITEMAP_INDEX_ENTRY:
+                    if normalized not in seen_sitemaps:
+                        queue.append(normalized)
+                    continue
+                if not _allowed_by_filters(
+                    normalized, filters.include_regex, filters.exclude_regex
+                ):
+                    continue
+                if normalized not in discovered:
+                    discovered[normalized] = None
+                    if len(discovered) >= max_urls:
+                        return
 
-        for loc in sitemaps:
-            normalized = _normalize_url(loc)
-            if normalized and normalized not in seen_sitemaps:
-                queue.append(normalized)
+    pending: set[asyncio.Task] = set()
+    try:
+        while len(discovered) < max_urls:
+            while queue and len(pending) < max_in_flight:
+                sitemap_url = queue.popleft()
+                if sitemap_url in seen_sitemaps:
+                    continue
+                seen_sitemaps.add(sitemap_url)
+                pending.add(asyncio.create_task(read(sitemap_url)))
+            if not pending:
+                break
+
+            done, pending = await asyncio.wait(
+                pending, return_when=asyncio.FIRST_COMPLETED
+            )
+            for task in done:
+                task.result()
+    finally:
+        for task in pending:
+            task.cancel()
+        if pending:
+            await asyncio.gather(*pending, return_exceptions=True)
 
-    return discovered
+    return list(discovered)
 
 
 async def _find_sitemaps(
@@ -711,53 +1194,100 @@ async def _find_sitemaps(
     return list(dict.fromkeys(candidates))
 
 
-async def _discover_from_links(
+async def _discover_from_links(  # noqa: PLR0913, PLR0917
     client: httpx.AsyncClient,
     base_url: str,
     allowed_host: str,
     config: DiscoveryConfig,
     filters: DiscoveryFilters,
+    slot: FetchSlot | None = None,
+    workers: int = LINK_CRAWL_WORKERS,
 ) -> list[str]:
-    discovered: set[str] = set()
+    """Breadth-first crawl of same-host links down to ``max_depth``.
+
+    ``workers`` tasks pull pages from a shared frontier and fetch them
+    inside ``slot(url)``, sharing the visited and discovered sets. The
+    crawl ends when the frontier drains or ``max_urls`` is reached, and
+    then cancels whatever fetches are still running.
+    """
+    discovered: dict[str, None] = {}
     visited: set[str] = set()
-    queue = deque([(base_url, 0)])
-
-    while queue and len(discovered) < config.max_urls:
-        current, depth = queue.popleft()
-        if current in visited or depth > config.max_depth:
-            continue
-        visited.add(current)
-
-        html = await _fetch_text(client, current)
+    frontier: asyncio.Queue[tuple[str, int]] = asyncio.Queue()
+    frontier.put_nowait((base_url, 0))
+    full = asyncio.Event()
+    slot = slot or (lambda url: nullcontext())
+
+    async def crawl(current: str, depth: int) -> None:
+        async with slot(current):
+            html = await _fetch_text(client, current)
         if not html:
-            continue
+            return
 
-        parser = HTMLParser(html)
-        for anchor in parser.css('a'):
-            href = anchor.attributes.get('href')
-            if not href:
-                continue
-            absolute = urljoin(current, href)
-            normalized = _normalize_url(absolute)
-            if not normalized:
-                continue
-            parsed = urlparse(normalized)
-            if parsed.netloc != allowed_host:
-                continue
-            if not _allowed_by_filters(
-                normalized, filters.include_regex, filters.exclude_regex
-            ):
-                continue
+        for normalized in _same_host_links(
+            html, current, allowed_host, filters
+        ):
             if normalized not in discovered:
-                discovered.add(normalized)
+                discovered[normalized] = None
                 if len(discovered) >= config.max_urls:
-                    break
+                    full.set()
+                    return
             if depth + 1 <= config.max_depth and normalized not in visited:
-                queue.append((normalized, depth + 1))
+                frontier.put_nowait((normalized, depth + 1))
+
+    async def worker() -> None:
+        while True:
+            current, depth = await frontier.get()
+            try:
+                if full.is_set() or current in visited:
+                    continue
+                if depth > config.max_depth:
+                    continue
+                visited.add(current)
+                await crawl(current, depth)
+            finally:
+                frontier.task_done()
+
+    tasks = [asyncio.create_task(worker()) for _ in range(workers)]
+    drained = asyncio.create_task(frontier.join())
+    stopped = asyncio.create_task(full.wait())
+    try:
+        done, _ = await asyncio.wait(
+            [drained, stopped, *tasks], return_when=asyncio.FIRST_COMPLETED
+        )
+        # Workers only return by raising; surface that instead of hanging.
+        for task in done:
+            task.result()
+    finally:
+        pending = [drained, stopped, *tasks]
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
 
     return list(discovered)
 
 
+def _same_host_links(
+    html: str, page_url: str, allowed_host: str, filters: DiscoveryFilters
+) -> Iterator[str]:
+    parser = HTMLParser(html)
+    for anchor in parser.css('a'):
+        href = anchor.attributes.get('href')
+        if not href:
+            continue
+        absolute = urljoin(page_url, href)
+        normalized = _normalize_url(absolute)
+        if not normalized:
+            continue
+        parsed = urlparse(normalized)
+        if parsed.netloc != allowed_host:
+            continue
+        if not _allowed_by_filters(
+            normalized, filters.include_regex, filters.exclude_regex
+        ):
+            continue
+        yield normalized
+
+
 async def _fetch_text(client: httpx.AsyncClient, url: str) -> str | None:
     try:
         response = await client.get(url)
@@ -769,23 +1299,97 @@ async def _fetch_text(client: httpx.AsyncClient, url: str) -> str | None:
         return None
 
 
+async def _iter_sitemap(
+    client: httpx.AsyncClient, url: str
+) -> AsyncIterator[tuple[str, str]]:
+    """Yield ``(kind, loc)`` entries of a sitemap while it downloads.
+
+    The body is parsed chunk by chunk and fully read ``<url>`` elements
+    are dropped from the tree, so memory stays flat however large the
+    sitemap is, and a consumer that stops early never downloads the rest.
+    """
+    reader = _SitemapReader()
+    try:
+        async with client.stream('GET', url) as response:
+            if response.status_code >= HTTPStatus.BAD_REQUEST:
+                return
+            async for chunk in response.aiter_bytes():
+                for entry in reader.feed(chunk):
+                    yield entry
+            entries = reader.close()
+    except Exception as exc:  # noqa: BLE001
+        # Like _fetch_text: a bad URL or body only loses this sitemap.
+        logger.warning('Skipping sitemap %s: %r', url, exc)
+        return
+    for entry in entries:
+        yield entry
+
+
+class _SitemapReader:
+    """Incremental ``<loc>`` extraction from sitemap XML chunks.
+
+    Gzipped sitemaps (``.xml.gz`` served without ``Content-Encoding``) are
+    recognised by their magic bytes and inflated on the fly.
+    """
+
+    def __init__(self):
+        self._parser = ET.XMLPullParser(events=('start', 'end'))
+        self._inflate = None
+        self._started = False
+        self._root: ET.Element | None = None
+        self._kind: str | None = None
+        self._depth = 0
+
+    def feed(self, chunk: bytes | str) -> list[tuple[str, str]]:
+        if not self._started and chunk:
+            self._started = True
+            if isinstance(chunk, bytes) and chunk.startswith(GZIP_MAGIC):
+                self._inflate = zlib.decompressobj(wbits=zlib.MAX_WBITS | 16)
+        if self._inflate is not None:
+            chunk = self._inflate.decompress(chunk)
+        self._parser.feed(chunk)
+        return self._read_entries()
+
+    def close(self) -> list[tuple[str, str]]:
+        if self._inflate is not None:
+            self._parser.feed(self._inflate.flush())
+        self._parser.close()
+        return self._read_entries()
+
+    def _read_entries(self) -> list[tuple[str, str]]:
+        entries = []
+        for event, element in self._parser.read_events():
+            if event == 'start':
+                if self._root is None:
+                    self._root = element
+                    self._kind = SITEMAP_ROOTS.get(_strip_ns(element.tag))
+                self._depth += 1
+                continue
+
+            self._depth -= 1
+            if _strip_ns(element.tag) == 'loc':
+                if self._kind and element.text:
+                    entries.append((self._kind, element.text.strip()))
+            elif self._depth == 1:
+                # A finished <url>/<sitemap>: nothing in it is needed again.
+                self._root.clear()
+        return entries
+
+
 def _parse_sitemap(content: str) -> tuple[list[str], list[str]]:
     urls: list[str] = []
     sitemaps: list[str] = []
+    reader = _SitemapReader()
     try:
-        root = ET.fromstring(content)
+        entries = reader.feed(content) + reader.close()
     except ET.ParseError:
         return urls, sitemaps
 
-    tag = _strip_ns(root.tag)
-    if tag == 'sitemapindex':
-        for sitemap in root.findall('.//{*}loc'):
-            if sitemap.text:
-                sitemaps.append(sitemap.text.strip())
-    elif tag == 'urlset':
-        for loc in root.findall('.//{*}loc'):
-            if loc.text:
-                urls.append(loc.text.strip())
+    for kind, loc in entries:
+        if kind == SITEMAP_INDEX_ENTRY:
+            sitemaps.append(loc)
+        else:
+            urls.append(loc)
     return urls, sitemaps
 
 
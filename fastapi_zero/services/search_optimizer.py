@@ -3,13 +3,66 @@ Módulo de busca inteligente para produtos.
 Fornece filtragem precisa e validação de resultados.
 """
 
+import heapq
+import random
 import re
+import zlib
+from array import array
+from collections import Counter
+from collections.abc import Iterable, Iterator, Sequence
 from dataclasses import dataclass
 from difflib import SequenceMatcher
+from functools import lru_cache
+from itertools import islice
+from operator import attrgetter
 
 MIN_TITLE_LENGTH = 3
 MAX_TITLE_LENGTH = 200
 MIN_RELEVANCE_SCORE = 10.0
+DEFAULT_SIMILARITY_THRESHOLD = 0.85
+WORD_PATTERN = re.compile(r'\w+')
+# Começos de título típicos de cabeçalhos e menus, em uma só alternação
+NAVIGATION_TITLE = re.compile(
+    r'(?:home$|menu|back|voltar|mais|carrinho|conta|sair|entrar|login'
+    r'|registr)'
+)
+
+# Palavras que não agregam valor à busca, por idioma
+STOPWORDS: dict[str, frozenset[str]] = {
+    'pt': frozenset({
+        'de', 'o', 'a', 'em', 'para', 'com', 'por', 'que', 'e', 'ou',
+        'um', 'uma', 'os', 'as', 'nos', 'nas', 'ao', 'à', 'essa',
+        'esse', 'este', 'esses', 'essas', 'esta', 'estão', 'estou',
+    }),
+    'en': frozenset({
+        'a', 'an', 'the', 'of', 'for', 'with', 'and', 'or', 'to', 'in',
+        'on', 'by', 'at', 'from', 'this', 'that', 'these', 'those',
+    }),
+}
+DEFAULT_LOCALE = 'pt'
+
+# Deduplicação aproximada: MinHash sobre trigramas de caracteres, com
+# buckets LSH; só pares que caem no mesmo bucket passam pelo
+# SequenceMatcher.
+SHINGLE_SIZE = 3
+# Abaixo deste comprimento os títulos são comparados diretamente
+SHORT_TITLE_LENGTH = 24
+MINHASH_PERMUTATIONS = 96
+# A partir deste limiar, bandas de 3 linhas já acham os pares; abaixo
+# dele os títulos similares compartilham menos trigramas e as bandas
+# passam a ter 2 linhas.
+STRICT_SIMILARITY_THRESHOLD = 0.8
+# Cache global pequeno para os trigramas mais comuns; cada índice guarda
+# os seus, que somem com ele
+SHINGLE_CACHE_SIZE = 4096
+_MERSENNE_PRIME = (1 << 61) - 1
+_MAX_HASH = (1 << 32) - 1
+_seed = random.Random(0x5EED)
+_PERMUTATIONS = tuple(
+    (_seed.randrange(1, _MERSENNE_PRIME), _seed.randrange(_MERSENNE_PRIME))
+    for _ in range(MINHASH_PERMUTATIONS)
+)
+del _seed
 
 
 @dataclass
@@ -25,17 +78,16 @@ class SearchResult:
 class SearchOptimizer:
     """Otimiza resultados de busca com filtragem e relevância."""
 
-    def __init__(self, query: str):
+    def __init__(self, query: str, locale: str = DEFAULT_LOCALE):
+        if locale not in STOPWORDS:
+            msg = f'unknown stopword locale: {locale!r}'
+            raise ValueError(msg)
         self.query = query.lower()
-        self.query_words = set(re.findall(r'\w+', self.query))
+        self.query_words = set(WORD_PATTERN.findall(self.query))
         # Palavras que não agregam valor
-        self.stopwords = {
-            'de', 'o', 'a', 'em', 'para', 'com', 'por', 'que', 'e', 'ou',
-            'um', 'uma', 'os', 'as', 'nos', 'nas', 'ao', 'à', 'essa',
-            'esse', 'este', 'esse', 'esses', 'essas', 'este', 'esta',
-            'este', 'estão', 'estou'
-        }
+        self.stopwords = STOPWORDS[locale]
         self.meaningful_words = self.query_words - self.stopwords
+        self.query_shingles = _shingles(self.query)
 
     def calculate_relevance(self, title: str) -> float:
         """
@@ -43,39 +95,58 @@ class SearchOptimizer:
 
         Critérios:
         - Palavras-chave presentes (peso alto)
-        - Ordem das palavras (peso médio)
-        - Comprimento do título (weight baixo)
+        - Trigramas da query presentes no título (peso médio)
+        - Query aparece inteira no título (bonus)
         """
-        if not title:
-            return 0.0
-
-        title_lower = title.lower()
-        title_words = set(re.findall(r'\w+', title_lower))
-
-        # 1. Quantas palavras-chave significativas estão presentes
-        matching_words = len(self.meaningful_words & title_words)
-        if not self.meaningful_words:
-            word_match_score = 0.0
-        else:
-            word_match_score = matching_words / len(self.meaningful_words)
-
-        # 2. Similaridade de sequência (ordem importa)
-        sequence_matcher = SequenceMatcher(None, self.query, title_lower)
-        sequence_score = sequence_matcher.ratio()
-
-        # 3. Query aparece como substring contíguo (bonus)
-        substring_bonus = 0.0
-        if self.query in title_lower:
-            substring_bonus = 0.2
-
-        # Score final (0-100)
-        final_score = (
-            (word_match_score * 50) +      # 50% peso para palavras-chave
-            (sequence_score * 40) +        # 40% peso para sequência
-            (substring_bonus * 10)         # 10% bonus para substring
-        )
+        return self.score_titles([title])[0]
+
+    def score_titles(self, titles: Sequence[str]) -> list[float]:
+        """
+        Calcula a relevância de vários títulos de uma vez.
+
+        A query é tokenizada uma única vez; cada título é convertido para
+        minúsculas e tokenizado uma vez só. No lugar da razão do
+        SequenceMatcher entra o coeficiente de Dice entre os trigramas da
+        query e os do título, que também fica entre 0 e 1 e penaliza
+        títulos longos, mas custa uma busca de substring por trigrama.
+        """
+        meaningful = self.meaningful_words
+        query = self.query
+        query_shingles = self.query_shingles
+        shingle_count = len(query_shingles)
+        find_words = WORD_PATTERN.findall
+        scores = []
+
+        for title in titles:
+            if not title:
+                scores.append(0.0)
+                continue
+            title_lower = title.lower()
+
+            # 1. Quantas palavras-chave significativas estão presentes
+            if meaningful:
+                matching = meaningful.intersection(find_words(title_lower))
+                word_match_score = len(matching) / len(meaningful)
+            else:
+                word_match_score = 0.0
 
-        return min(100.0, final_score)
+            # 2. Trigramas da query encontrados no título
+            found = len([g for g in query_shingles if g in title_lower])
+            positions = max(len(title_lower) - SHINGLE_SIZE + 1, 1)
+            shingle_score = 2 * found / (shingle_count + positions)
+
+            # 3. Query aparece como substring contíguo (bonus)
+            substring_bonus = 0.2 if query in title_lower else 0.0
+
+            # Score final (0-100)
+            final_score = (
+                (word_match_score * 50) +      # 50% peso para palavras-chave
+                (shingle_score * 40) +         # 40% peso para trigramas
+                (substring_bonus * 10)         # 10% bonus para substring
+            )
+            scores.append(min(100.0, final_score))
+
+        return scores
 
     @staticmethod
     def is_likely_product(title: str, price: float | None) -> bool:
@@ -86,6 +157,7 @@ class SearchOptimizer:
         - Tem preço
         - Não é muito curto (mínimo 3 caracteres)
         - Não é muito longo (máximo 200 caracteres)
+        - Não parece item de navegação (menu, voltar, login...)
         """
         if price is None:
             return False
@@ -98,17 +170,7 @@ class SearchOptimizer:
             return False
 
         # Evita títulos que parecem ser cabeçalhos/navegação
-        navigation_patterns = [
-            r'^home$', r'^menu', r'^back', r'^voltar',
-            r'^mais', r'^carrinho', r'^conta', r'^sair',
-            r'^entrar', r'^login', r'^registr'
-        ]
-        title_lower = title.lower().strip()
-        for pattern in navigation_patterns:
-            if re.match(pattern, title_lower):
-                return False
-
-        return True
+        return not NAVIGATION_TITLE.match(title.lower().strip())
 
     def filter_and_rank(
         self,
@@ -120,68 +182,200 @@ class SearchOptimizer:
         Input: lista de (url, title, price, currency)
         Output: lista de SearchResult ordenada por relevância
         """
-        filtered = []
+        filtered = self.filter_and_score(results)
 
-        for url, title, price, currency in results:
-            # Validação básica
-            if not self.is_likely_product(title, price):
-                continue
+        # Ordena por relevância (decrescente)
+        filtered.sort(key=lambda x: x.relevance_score, reverse=True)
 
-            # Calcula relevância
-            score = self.calculate_relevance(title or "")
+        return filtered
 
-            # Filtra por score mínimo (ajustável)
-            if score < MIN_RELEVANCE_SCORE:
-                continue
+    def filter_and_score(
+        self,
+        results: list[tuple[str, str | None, float | None, str | None]]
+    ) -> list[SearchResult]:
+        """
+        Filtra e pontua resultados, sem ordenar.
+
+        Input: lista de (url, title, price, currency)
+        Output: lista de SearchResult na ordem de entrada
+        """
+        # Validação básica
+        candidates = [
+            result for result in results
+            if self.is_likely_product(result[1], result[2])
+        ]
+        scores = self.score_titles([title for _, title, _, _ in candidates])
 
-            filtered.append(SearchResult(
+        return [
+            SearchResult(
                 url=url,
                 title=title,
                 price=price,
                 currency=currency,
                 relevance_score=score
-            ))
-
-        # Ordena por relevância (decrescente)
-        filtered.sort(key=lambda x: x.relevance_score, reverse=True)
-
-        return filtered
+            )
+            for (url, title, price, currency), score in zip(
+                candidates, scores
+            )
+            # Filtra por score mínimo (ajustável)
+            if score >= MIN_RELEVANCE_SCORE
+        ]
 
     @staticmethod
     def deduplicate(
         results: list[SearchResult],
-        similarity_threshold: float = 0.85
+        similarity_threshold: float = DEFAULT_SIMILARITY_THRESHOLD
     ) -> list[SearchResult]:
         """
         Remove resultados duplicados/muito similares.
 
-        Usa SequenceMatcher para comparar títulos.
+        Usa MinHash/LSH para achar os pares candidatos e SequenceMatcher
+        para confirmar, com o mesmo limiar de similaridade nos títulos.
+        Pares que não dividem nenhuma banda não são comparados, então
+        limiares muito baixos (< 0.6) podem deixar duplicatas passarem.
         """
-        if not results:
-            return []
+        return list(_unique_titles(results, similarity_threshold))
+
+
+def _unique_titles(
+    results: Iterable[SearchResult], similarity_threshold: float
+) -> Iterator[SearchResult]:
+    """Entrega cada resultado que não repete um título já entregue."""
+    index = _NearDuplicateIndex(similarity_threshold)
+    for current in results:
+        # Resultados sem título nunca são considerados duplicados
+        if current.title and not index.add_unless_duplicate(
+            current.title.lower()
+        ):
+            continue
+        yield current
 
-        deduplicated = [results[0]]
 
-        for current in results[1:]:
-            is_duplicate = False
+def _by_relevance(results: list[SearchResult]) -> Iterator[SearchResult]:
+    """
+    Entrega os resultados do mais ao menos relevante, sob demanda.
 
-            for existing in deduplicated:
-                # Compara títulos
-                if existing.title and current.title:
-                    similarity = SequenceMatcher(
-                        None,
-                        existing.title.lower(),
-                        current.title.lower()
-                    ).ratio()
+    Empates saem na ordem de entrada, como na ordenação estável.
+    """
+    heap = [
+        (-result.relevance_score, position, result)
+        for position, result in enumerate(results)
+    ]
+    heapq.heapify(heap)
+    while heap:
+        yield heapq.heappop(heap)[2]
 
-                    if similarity >= similarity_threshold:
-                        is_duplicate = True
-                        break
 
-            if not is_duplicate:
-                deduplicated.append(current)
+@lru_cache(maxsize=SHINGLE_CACHE_SIZE)
+def _shingle_hashes(shingle: str) -> array:
+    """Valores do trigrama em cada uma das permutações do MinHash.
 
-        return deduplicated
+    Em ``array('I')`` cada valor ocupa 4 bytes, contra ~32 de um int
+    numa tupla.
+    """
+    value = zlib.crc32(shingle.encode())
+    return array(
+        'I',
+        [
+            (a * value + b) % _MERSENNE_PRIME & _MAX_HASH
+            for a, b in _PERMUTATIONS
+        ],
+    )
+
+
+def _shingles(title: str) -> set[str]:
+    text = ' '.join(title.split())
+    if len(text) <= SHINGLE_SIZE:
+        return {text}
+    last = len(text) - SHINGLE_SIZE + 1
+    return {text[i : i + SHINGLE_SIZE] for i in range(last)}
+
+
+class _NearDuplicateIndex:
+    """
+    Índice dos títulos mantidos pela deduplicação.
+
+    Títulos longos viram uma assinatura MinHash dividida em bandas, e só
+    os que têm alguma banda idêntica são candidatos a duplicata. Em
+    títulos curtos poucos caracteres mudam muitos trigramas, então eles
+    são comparados com todos os títulos de comprimento compatível. Cada
+    candidato é confirmado com SequenceMatcher, pelo mesmo limiar.
+    """
+
+    def __init__(self, similarity_threshold: float):
+        self.threshold = similarity_threshold
+        strict = similarity_threshold >= STRICT_SIMILARITY_THRESHOLD
+        self.rows = 3 if strict else 2
+        self.bands = MINHASH_PERMUTATIONS // self.rows
+        self.titles: list[str] = []
+        self.char_counts: list[Counter[str]] = []
+        self.by_length: dict[int, list[int]] = {}
+        self.buckets: dict[tuple[int, ...], list[int]] = {}
+        self.shingle_hashes: dict[str, array] = {}
+        self.matcher = SequenceMatcher(None)
+
+    def _hashes(self, shingle: str) -> array:
+        hashes = self.shingle_hashes.get(shingle)
+        if hashes is None:
+            hashes = self.shingle_hashes[shingle] = _shingle_hashes(shingle)
+        return hashes
+
+    def _keys(self, title: str) -> list[tuple[int, ...]]:
+        signature = list(map(min, zip(*map(self._hashes, _shingles(title)))))
+        rows = self.rows
+        return [
+            (band, *signature[band * rows : (band + 1) * rows])
+            for band in range(self.bands)
+        ]
+
+    def _within_reach(self, length: int, other: int) -> bool:
+        # Mesmo limite de real_quick_ratio: 2 * min / soma dos tamanhos
+        return 2 * min(length, other) >= self.threshold * (length + other)
+
+    def _candidates(
+        self, length: int, keys: list[tuple[int, ...]]
+    ) -> Iterator[int]:
+        for other, indexes in self.by_length.items():
+            short = min(length, other) < SHORT_TITLE_LENGTH
+            if short and self._within_reach(length, other):
+                yield from indexes
+        for key in keys:
+            yield from self.buckets.get(key, ())
+
+    def _is_similar(self, index: int, title: str, counts: Counter) -> bool:
+        existing = self.titles[index]
+        total = len(existing) + len(title)
+        # Mesmo valor de quick_ratio, com as contagens já calculadas
+        common = (self.char_counts[index] & counts).total()
+        if 2 * common < self.threshold * total:
+            return False
+        self.matcher.set_seq1(existing)
+        return self.matcher.ratio() >= self.threshold
+
+    def add_unless_duplicate(self, title: str) -> bool:
+        """Indexa o título, a menos que ele repita um já indexado."""
+        length = len(title)
+        keys = self._keys(title) if length >= SHORT_TITLE_LENGTH else []
+        counts = Counter(title)
+        # SequenceMatcher guarda o pré-processamento da segunda sequência
+        self.matcher.set_seq2(title)
+        compared = set()
+        for index in self._candidates(length, keys):
+            if index in compared:
+                continue
+            compared.add(index)
+            if self._within_reach(
+                length, len(self.titles[index])
+            ) and self._is_similar(index, title, counts):
+                return False
+
+        index = len(self.titles)
+        self.titles.append(title)
+        self.char_counts.append(counts)
+        self.by_length.setdefault(length, []).append(index)
+        for key in keys:
+            self.buckets.setdefault(key, []).append(index)
+        return True
 
 
 def optimize_search_results(
@@ -204,12 +398,19 @@ def optimize_search_results(
     """
     optimizer = SearchOptimizer(query)
 
-    # Filtra e ordena por relevância
-    ranked = optimizer.filter_and_rank(results)
+    # Filtra e pontua, sem ordenar tudo
+    scored = optimizer.filter_and_score(results)
 
-    # Remove duplicados se configurado
-    if remove_duplicates:
-        ranked = optimizer.deduplicate(ranked)
+    if not remove_duplicates:
+        # Heap limitado aos max_results melhores
+        return heapq.nlargest(
+            max_results, scored, key=attrgetter('relevance_score')
+        )
 
-    # Limita ao máximo solicitado
-    return ranked[:max_results]
+    # Ordena sob demanda e para de deduplicar quando completa o limite;
+    # um resultado só é comparado com os mais relevantes que ele, então
+    # a saída é a mesma de deduplicar a lista ordenada inteira e cortar
+    ranked = _unique_titles(
+        _by_relevance(scored), DEFAULT_SIMILARITY_THRESHOLD
+    )
+    return list(islice(ranked, max_results))
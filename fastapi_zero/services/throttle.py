@@ -0,0 +1,250 @@
+"""Per-host concurrency caps and request-rate budgets for the scraper."""
+
+import asyncio
+import math
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from typing import Callable
+
+THROTTLE_STATUSES = frozenset({429, 503})
+
+
+class TokenBucket:
+    """Token bucket that hands out reservations instead of blocking.
+
+    ``reserve`` always takes a token, letting the balance go negative, and
+    returns how long the caller has to wait before using it. Concurrent
+    callers therefore queue up behind each other without a lock.
+    """
+
+    def __init__(
+        self,
+        rate: float,
+        burst: float | None = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self._rate = rate
+        self._capacity = burst if burst is not None else max(1.0, rate)
+        self._tokens = self._capacity
+        self._clock = clock
+        self._updated = clock()
+
+    @property
+    def rate(self) -> float:
+        return self._rate
+
+    def reserve(self) -> float:
+        now = self._clock()
+        elapsed = now - self._updated
+        self._updated = now
+        self._tokens = min(
+            self._capacity, self._tokens + elapsed * self._rate
+        )
+        self._tokens -= 1
+        if self._tokens >= 0:
+            return 0.0
+        return -self._tokens / self._rate
+
+
+@dataclass(slots=True)
+class _HostState:
+    limit: float
+    bucket: TokenBucket | None = None
+    in_flight: int = 0
+    waiters: deque[asyncio.Future] = field(default_factory=deque)
+    min_latency: float | None = None
+    smoothed_latency: float = 0.0
+    last_decrease: float = -math.inf
+
+    @property
+    def capacity(self) -> float:
+        if math.isinf(self.limit):
+            return self.limit
+        return max(1, int(self.limit))
+
+
+class HostLimiter:
+    """Caps in-flight requests and requests per second for every host.
+
+    Hosts are tracked independently, so a batch aimed at one retailer is
+    throttled without slowing down requests to the others.
+    """
+
+    def __init__(
+        self,
+        max_per_host: int | None = None,
+        rate_per_host: float | None = None,
+    ):
+        self._max_per_host = max_per_host
+        self._rate_per_host = rate_per_host
+        self._hosts: dict[str, _HostState] = {}
+
+    def _state(self, host: str) -> _HostState:
+        state = self._hosts.get(host)
+        if state is None:
+            state = _HostState(limit=self._initial_limit())
+            if self._rate_per_host:
+                state.bucket = TokenBucket(self._rate_per_host)
+            self._hosts[host] = state
+        return state
+
+    def _initial_limit(self) -> float:
+        if self._max_per_host is None:
+            return math.inf
+        return float(self._max_per_host)
+
+    def in_flight(self, host: str) -> int:
+        state = self._hosts.get(host)
+        return state.in_flight if state else 0
+
+    def limits(self) -> dict[str, float]:
+        return {host: state.limit for host, state in self._hosts.items()}
+
+    def record(
+        self, host: str, latency: float, status_code: int | None
+    ) -> None:
+        """Feed back the outcome of a request; ``None`` means timeout."""
+
+    @asynccontextmanager
+    async def slot(self, host: str):
+        state = self._state(host)
+        await self._acquire(state)
+        try:
+            if state.bucket is not None:
+                delay = state.bucket.reserve()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+            yield
+        finally:
+            self._release(state)
+
+    async def _acquire(self, state: _HostState) -> None:
+        if not state.waiters and state.in_flight < state.capacity:
+            state.in_flight += 1
+            return
+
+        waiter = asyncio.get_running_loop().create_future()
+        state.waiters.append(waiter)
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            # The slot may have been handed over right before cancellation.
+            if not waiter.cancelled():
+                self._release(state)
+            raise
+
+    def _release(self, state: _HostState) -> None:
+        state.in_flight -= 1
+        self._wake(state)
+
+    @staticmethod
+    def _wake(state: _HostState) -> None:
+        while state.waiters and state.in_flight < state.capacity:
+            waiter = state.waiters.popleft()
+            if waiter.done():
+                continue
+            state.in_flight += 1
+            waiter.set_result(None)
+
+
+class AdaptiveHostLimiter(HostLimiter):
+    """AIMD controller that learns how much concurrency each host takes.
+
+    Every healthy response grows the host limit by ``increase / limit``,
+    which adds roughly one slot per round trip. A 429/503 or a timeout
+    multiplies the limit by ``decrease``, at most once per smoothed round
+    trip so a burst of failures from one window only counts once.
+    Responses much slower than the fastest seen hold the limit steady.
+    """
+
+    def __init__(  # noqa: PLR0913, PLR0917
+        self,
+        initial_per_host: int = 4,
+        min_per_host: int = 1,
+        max_per_host: int = 64,
+        rate_per_host: float | None = None,
+        increase: float = 1.0,
+        decrease: float = 0.5,
+        latency_tolerance: float = 3.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        super().__init__(
+            max_per_host=initial_per_host, rate_per_host=rate_per_host
+        )
+        self._min_per_host = min_per_host
+        self._ceiling = max_per_host
+        self._increase = increase
+        self._decrease = decrease
+        self._latency_tolerance = latency_tolerance
+        self._clock = clock
+
+    def record(
+        self, host: str, latency: float, status_code: int | None
+    ) -> None:
+        state = self._state(host)
+        state.smoothed_latency = (
+            latency
+            if not state.smoothed_latency
+            else 0.8 * state.smoothed_latency + 0.2 * latency
+        )
+
+        if status_code is None or status_code in THROTTLE_STATUSES:
+            now = self._clock()
+            if now - state.last_decrease >= state.smoothed_latency:
+                state.limit = max(
+                    float(self._min_per_host), state.limit * self._decrease
+                )
+                state.last_decrease = now
+            return
+
+        if status_code >= 400:  # noqa: PLR2004
+            return
+
+        if state.min_latency is None or latency < state.min_latency:
+            state.min_latency = latency
+        if latency > state.min_latency * self._latency_tolerance:
+            return
+
+        state.limit = min(
+            float(self._ceiling), state.limit + self._increase / state.limit
+        )
+        self._wake(state)
+
+
+class LayeredHostLimiter(HostLimiter):
+    """A request's own per-host caps applied on top of a shared limiter.
+
+    The shared limiter keeps learning from every response, while this
+    layer holds the request to its ``max_per_host`` and ``rate_per_host``.
+    Its slot is taken first, so the rate wait never sits on a shared slot.
+    """
+
+    def __init__(
+        self,
+        shared: HostLimiter,
+        max_per_host: int | None = None,
+        rate_per_host: float | None = None,
+    ):
+        super().__init__(
+            max_per_host=max_per_host, rate_per_host=rate_per_host
+        )
+        self._shared = shared
+
+    def limits(self) -> dict[str, float]:
+        ceiling = self._initial_limit()
+        return {
+            host: min(limit, ceiling)
+            for host, limit in self._shared.limits().items()
+        }
+
+    def record(
+        self, host: str, latency: float, status_code: int | None
+    ) -> None:
+        self._shared.record(host, latency, status_code)
+
+    @asynccontextmanager
+    async def slot(self, host: str):
+        async with super().slot(host), self._shared.slot(host):
+            yield
@@ -0,0 +1,152 @@
+"""HTTP cache validators for conditional re-scrapes of known URLs.
+
+Recurring price checks fetch the same product pages over and over. The
+scraper remembers each page's ``ETag``/``Last-Modified`` with the item
+parsed from it, revalidates with ``If-None-Match``/``If-Modified-Since``
+and, on ``304 Not Modified``, reuses that item instead of downloading and
+parsing the page again.
+"""
+
+from dataclasses import asdict, dataclass
+from typing import TYPE_CHECKING, Collection, Mapping
+
+import httpx
+from sqlalchemy import delete, func, select
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from fastapi_zero.db.models import HttpValidator
+from fastapi_zero.services.scraper import ScrapedItem
+
+if TYPE_CHECKING:
+    from fastapi_zero.services.jobs import SessionFactory
+
+
+@dataclass(slots=True)
+class CachedPage:
+    etag: str | None
+    last_modified: str | None
+    item: ScrapedItem
+
+    def request_headers(self) -> dict[str, str]:
+        headers = {}
+        if self.etag:
+            headers['If-None-Match'] = self.etag
+        if self.last_modified:
+            headers['If-Modified-Since'] = self.last_modified
+        if headers:
+            # The client defaults to ``no-cache``, which caches in between
+            # may answer with a full response; ``max-age=0`` still reaches
+            # the origin but lets it reply 304.
+            headers['Cache-Control'] = 'max-age=0'
+        return headers
+
+
+class ValidatorStore:
+    """Validators kept in memory for the lifetime of the store.
+
+    The scraper looks pages up and writes them back in batches through
+    ``get_many`` and ``update``; the single-URL methods wrap those.
+    """
+
+    def __init__(self):
+        self._pages: dict[str, CachedPage] = {}
+
+    async def get_many(self, urls: Collection[str]) -> dict[str, CachedPage]:
+        return {url: self._pages[url] for url in urls if url in self._pages}
+
+    async def update(self, changes: Mapping[str, CachedPage | None]) -> None:
+        """Store each page, dropping the URLs mapped to ``None``."""
+        for url, page in changes.items():
+            if page is None:
+                self._pages.pop(url, None)
+            else:
+                self._pages[url] = page
+
+    async def get(self, url: str) -> CachedPage | None:
+        return (await self.get_many([url])).get(url)
+
+    async def put(self, url: str, page: CachedPage) -> None:
+        await self.update({url: page})
+
+    async def discard(self, url: str) -> None:
+        await self.update({url: None})
+
+    @staticmethod
+    def page_for(
+        response: httpx.Response, item: ScrapedItem
+    ) -> CachedPage | None:
+        """Validators of a full response with its parsed item, if any."""
+        etag = response.headers.get('ETag')
+        last_modified = response.headers.get('Last-Modified')
+        if etag or last_modified:
+            return CachedPage(etag, last_modified, item)
+        return None
+
+
+class SqlValidatorStore(ValidatorStore):
+    """Validators persisted in ``http_validators``, shared across runs."""
+
+    def __init__(self, session_factory: 'SessionFactory'):
+        self._session_factory = session_factory
+
+    async def get_many(self, urls: Collection[str]) -> dict[str, CachedPage]:
+        if not urls:
+            return {}
+        async with self._session_factory() as session:
+            rows = await session.scalars(
+                select(HttpValidator).where(HttpValidator.url.in_(urls))
+            )
+            return {
+                row.url: CachedPage(
+                    etag=row.etag,
+                    last_modified=row.last_modified,
+                    item=ScrapedItem(**row.item),
+                )
+                for row in rows
+            }
+
+    async def update(self, changes: Mapping[str, CachedPage | None]) -> None:
+        values = [
+            {
+                'url': url,
+                'etag': page.etag,
+                'last_modified': page.last_modified,
+                'item': asdict(page.item),
+            }
+            for url, page in changes.items()
+            if page is not None
+        ]
+        stale = [url for url, page in changes.items() if page is None]
+        if not values and not stale:
+            return
+        async with self._session_factory() as session:
+            if values:
+                await _upsert(session, values)
+            if stale:
+                await session.execute(
+                    delete(HttpValidator).where(HttpValidator.url.in_(stale))
+                )
+            await session.commit()
+
+
+async def _upsert(session: AsyncSession, values: list[dict]) -> None:
+    dialect = session.get_bind().dialect.name
+    if dialect not in {'sqlite', 'postgresql'}:
+        for row in values:
+            await session.merge(HttpValidator(**row))
+        return
+    insert = sqlite_insert if dialect == 'sqlite' else postgresql_insert
+    statement = insert(HttpValidator).values(values)
+    await session.execute(
+        statement.on_conflict_do_update(
+            index_elements=['url'],
+            set_={
+                'etag': statement.excluded.etag,
+                'last_modified': statement.excluded.last_modified,
+                'item': statement.excluded.item,
+                'updated_at': func.now(),
+            },
+        )
+    )
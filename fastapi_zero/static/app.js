@@ -469,6 +469,45 @@ if (cartToggle) {
 // fetch cart once on load (non-blocking)
 fetchCart();
 
+// Reads the NDJSON event stream from /scrape/urls/stream, calling
+// onProgress as items arrive, and resolves with the same shape as the
+// non-streaming /scrape/urls response.
+const readScrapeStream = async (response, onProgress) => {
+  const result = { total_scraped: 0, total_saved: 0, products: [], raw_items: [] };
+  const productsById = new Map();
+  const reader = response.body.getReader();
+  const decoder = new TextDecoder();
+  let buffer = "";
+
+  const handleLine = (line) => {
+    if (!line.trim()) return;
+    const { event, data } = JSON.parse(line);
+    if (event === "item") {
+      result.raw_items.push(data);
+    } else if (event === "product") {
+      productsById.set(data.product_id, data);
+      result.products = Array.from(productsById.values());
+    } else if (event === "summary") {
+      result.total_scraped = data.total_scraped;
+      result.total_saved = data.total_saved;
+      return;
+    }
+    onProgress(result);
+  };
+
+  while (true) {
+    const { done, value } = await reader.read();
+    if (done) break;
+    buffer += decoder.decode(value, { stream: true });
+    const lines = buffer.split("\n");
+    buffer = lines.pop();
+    lines.forEach(handleLine);
+  }
+  handleLine(buffer + decoder.decode());
+
+  return result;
+};
+
 const runScrape = async (urls, searchQuery = null, options = {}) => {
   statusEl.textContent = "";
   resultsEl.innerHTML = "";
@@ -538,7 +577,7 @@ const runScrape = async (urls, searchQuery = null, options = {}) => {
   showLoading("Processando... Extraindo preços...");
 
   try {
-    const response = await fetch("/scrape/urls", {
+    const response = await fetch("/scrape/urls/stream", {
       method: "POST",
       headers: { "Content-Type": "application/json" },
       body: JSON.stringify(payload),
@@ -549,7 +588,14 @@ const runScrape = async (urls, searchQuery = null, options = {}) => {
       throw new Error(error.detail ?? "Erro ao rodar scraping");
     }
 
-    const data = await response.json();
+    hideLoading();
+    const data = await readScrapeStream(response, (progress) => {
+      statusEl.textContent = `Capturados ${progress.raw_items.length} de ${finalUrls.length} URLs...`;
+      lastResults = progress.products;
+      applyResultFilters();
+      lastRawItems = progress.raw_items;
+      applyRawSort();
+    });
     
     let products = data.products || [];
     
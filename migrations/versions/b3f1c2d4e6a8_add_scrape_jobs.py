@@ -0,0 +1,37 @@
+"""add scrape_jobs
+
+Revision ID: b3f1c2d4e6a8
+Revises: 9a1b2c3d4e5f
+Create Date: 2026-10-17 00:00:00.000000
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'b3f1c2d4e6a8'
+down_revision = '9a1b2c3d4e5f'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'scrape_jobs',
+        sa.Column('id', sa.String(), primary_key=True),
+        sa.Column('kind', sa.String(), nullable=False),
+        sa.Column('payload', sa.JSON(), nullable=False),
+        sa.Column('status', sa.String(), nullable=False),
+        sa.Column('progress', sa.Integer(), nullable=False),
+        sa.Column('total', sa.Integer(), nullable=True),
+        sa.Column('result', sa.JSON(), nullable=True),
+        sa.Column('error', sa.String(), nullable=True),
+        sa.Column('expires_at', sa.DateTime(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), server_default=sa.text('CURRENT_TIMESTAMP'), nullable=False),
+        sa.Column('updated_at', sa.DateTime(), server_default=sa.text('CURRENT_TIMESTAMP'), nullable=False),
+    )
+    op.create_index('ix_scrape_jobs_status', 'scrape_jobs', ['status'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_scrape_jobs_status', table_name='scrape_jobs')
+    op.drop_table('scrape_jobs')
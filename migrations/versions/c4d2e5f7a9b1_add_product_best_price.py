@@ -0,0 +1,108 @@
+"""add price index and product_best_price
+
+Revision ID: c4d2e5f7a9b1
+Revises: b3f1c2d4e6a8
+Create Date: 2026-10-17 00:00:00.000000
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'c4d2e5f7a9b1'
+down_revision = 'b3f1c2d4e6a8'
+branch_labels = None
+depends_on = None
+
+# Copied from fastapi_zero.db.models at the time of this revision, so
+# later changes to the models do not rewrite it.
+BEST_PRICE_UPSERT = """
+    INSERT INTO product_best_price
+        (product_id, price_record_id, price, currency, source_url)
+    VALUES (NEW.product_id, NEW.id, NEW.price, NEW.currency, NEW.source_url)
+    ON CONFLICT (product_id) DO UPDATE SET
+        price_record_id = excluded.price_record_id,
+        price = excluded.price,
+        currency = excluded.currency,
+        source_url = excluded.source_url
+    WHERE excluded.price < product_best_price.price;
+"""
+
+SQLITE_BEST_PRICE_TRIGGER = f"""
+CREATE TRIGGER IF NOT EXISTS price_records_best_price
+AFTER INSERT ON price_records
+BEGIN
+{BEST_PRICE_UPSERT}
+END
+"""
+
+POSTGRESQL_BEST_PRICE_FUNCTION = f"""
+CREATE OR REPLACE FUNCTION product_best_price_on_insert() RETURNS trigger AS $$
+BEGIN
+{BEST_PRICE_UPSERT}
+    RETURN NEW;
+END
+$$ LANGUAGE plpgsql
+"""
+
+POSTGRESQL_BEST_PRICE_TRIGGER = """
+CREATE TRIGGER price_records_best_price
+AFTER INSERT ON price_records
+FOR EACH ROW EXECUTE FUNCTION product_best_price_on_insert()
+"""
+
+
+def upgrade() -> None:
+    op.create_index(
+        'ix_price_records_product_id_price',
+        'price_records',
+        ['product_id', 'price'],
+    )
+    op.create_table(
+        'product_best_price',
+        sa.Column('product_id', sa.Integer(), nullable=False),
+        sa.Column('price_record_id', sa.Integer(), nullable=False),
+        sa.Column('price', sa.Float(), nullable=False),
+        sa.Column('source_url', sa.String(), nullable=False),
+        sa.Column('currency', sa.String(), nullable=True),
+        sa.ForeignKeyConstraint(['product_id'], ['products.id']),
+        sa.ForeignKeyConstraint(['price_record_id'], ['price_records.id']),
+        sa.PrimaryKeyConstraint('product_id'),
+    )
+
+    # Cheapest record per product; ties go to the oldest record.
+    op.execute(
+        """
+        INSERT INTO product_best_price
+            (product_id, price_record_id, price, currency, source_url)
+        SELECT pr.product_id, pr.id, pr.price, pr.currency, pr.source_url
+        FROM price_records pr
+        WHERE pr.id = (
+            SELECT best.id FROM price_records best
+            WHERE best.product_id = pr.product_id
+            ORDER BY best.price, best.id
+            LIMIT 1
+        )
+        """
+    )
+
+    dialect = op.get_bind().dialect.name
+    if dialect == 'sqlite':
+        op.execute(SQLITE_BEST_PRICE_TRIGGER)
+    elif dialect == 'postgresql':
+        op.execute(POSTGRESQL_BEST_PRICE_FUNCTION)
+        op.execute(POSTGRESQL_BEST_PRICE_TRIGGER)
+
+
+def downgrade() -> None:
+    dialect = op.get_bind().dialect.name
+    if dialect == 'sqlite':
+        op.execute('DROP TRIGGER IF EXISTS price_records_best_price')
+    elif dialect == 'postgresql':
+        op.execute(
+            'DROP TRIGGER IF EXISTS price_records_best_price ON price_records'
+        )
+        op.execute('DROP FUNCTION IF EXISTS product_best_price_on_insert()')
+    op.drop_table('product_best_price')
+    op.drop_index(
+        'ix_price_records_product_id_price', table_name='price_records'
+    )
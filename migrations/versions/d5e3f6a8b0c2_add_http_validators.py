@@ -0,0 +1,29 @@
+"""add http_validators
+
+Revision ID: d5e3f6a8b0c2
+Revises: c4d2e5f7a9b1
+Create Date: 2026-10-17 00:00:00.000000
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'd5e3f6a8b0c2'
+down_revision = 'c4d2e5f7a9b1'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'http_validators',
+        sa.Column('url', sa.String(), primary_key=True),
+        sa.Column('item', sa.JSON(), nullable=False),
+        sa.Column('etag', sa.String(), nullable=True),
+        sa.Column('last_modified', sa.String(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), server_default=sa.text('CURRENT_TIMESTAMP'), nullable=False),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('http_validators')
@@ -0,0 +1,61 @@
+"""add product_terms
+
+Revision ID: e6f8a0b2c4d3
+Revises: d5e3f6a8b0c2
+Create Date: 2026-10-17 00:00:00.000000
+"""
+import re
+import unicodedata
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'e6f8a0b2c4d3'
+down_revision = 'd5e3f6a8b0c2'
+branch_labels = None
+depends_on = None
+
+BACKFILL_CHUNK = 1000
+WORD_PATTERN = re.compile(r'\w+')
+
+
+# Tokenizer copied from fastapi_zero.services.product_search at the time
+# of this revision, so later changes to it do not rewrite the backfill.
+def fold_accents(word: str) -> str:
+    decomposed = unicodedata.normalize('NFKD', word)
+    return ''.join(c for c in decomposed if not unicodedata.combining(c))
+
+
+def product_terms(display_name: str, normalized_name: str) -> set[str]:
+    words = set(WORD_PATTERN.findall(display_name.lower()))
+    words.update(normalized_name.split())
+    return words | {fold_accents(word) for word in words}
+
+
+def upgrade() -> None:
+    terms = op.create_table(
+        'product_terms',
+        sa.Column('term', sa.String(), nullable=False),
+        sa.Column('product_id', sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(['product_id'], ['products.id']),
+        sa.PrimaryKeyConstraint('term', 'product_id'),
+    )
+
+    # Index the products stored before the table existed.
+    products = op.get_bind().execute(
+        sa.text('SELECT id, display_name, normalized_name FROM products')
+    )
+    while chunk := products.fetchmany(BACKFILL_CHUNK):
+        op.bulk_insert(
+            terms,
+            [
+                {'term': term, 'product_id': product_id}
+                for product_id, display_name, normalized_name in chunk
+                for term in product_terms(display_name, normalized_name)
+            ],
+        )
+
+
+def downgrade() -> None:
+    op.drop_table('product_terms')
@@ -4,12 +4,13 @@ from datetime import datetime
 import pytest
 from fastapi.testclient import TestClient
 from sqlalchemy import create_engine, event
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.orm import Session
-from sqlalchemy.pool import StaticPool
+from sqlalchemy.pool import NullPool
 
 from fastapi_zero.app import app
 from fastapi_zero.db.models import User, table_registry
-from fastapi_zero.db.session import get_session
+from fastapi_zero.db.session import get_async_session, get_session
 
 
 @pytest.fixture
@@ -28,34 +29,61 @@ def user(session: Session):
 
 
 @pytest.fixture
-def client(session):
+def client(session, async_session_factory, override_get_async_session):
     def override_get_session():
         yield session
 
     app.dependency_overrides[get_session] = override_get_session
+    app.dependency_overrides[get_async_session] = override_get_async_session
+    # Background jobs and the validator store run outside requests.
+    app.state.session_factory = async_session_factory
 
     with TestClient(app) as client:
         yield client
 
+    del app.state.session_factory
     app.dependency_overrides.clear()
 
 
 @pytest.fixture
-def session():
+def engine(tmp_path):
+    # A file, not :memory:, so the sync and async engines share the data.
     engine = create_engine(
-        'sqlite:///:memory:',
+        f'sqlite:///{tmp_path / "test.db"}',
         connect_args={'check_same_thread': False},
-        poolclass=StaticPool,
     )
     table_registry.metadata.create_all(engine)
 
-    with Session(engine) as session:
-        yield session
+    yield engine
 
     table_registry.metadata.drop_all(engine)
     engine.dispose()
 
 
+@pytest.fixture
+def session(engine):
+    with Session(engine) as session:
+        yield session
+
+
+@pytest.fixture
+def async_session_factory(engine):
+    # NullPool: aiosqlite connections must not outlive the loop using them.
+    async_engine = create_async_engine(
+        engine.url.set(drivername='sqlite+aiosqlite'), poolclass=NullPool
+    )
+    return async_sessionmaker(async_engine, expire_on_commit=False)
+
+
+@pytest.fixture
+def override_get_async_session(async_session_factory):
+    async def override():
+        async with async_session_factory() as session:
+            yield session
+
+    return override
+
+
 @contextmanager
 def _mock_db_time(*, model, time=datetime(2025, 6, 30, 21, 36, 42)):
     def fake_time_hook(mapper, connection, target):
@@ -0,0 +1,131 @@
+# ruff: noqa: PLR6301, PLR2004, E501
+from sqlalchemy import event, func, select
+
+from fastapi_zero.db.models import BestPrice, PriceRecord, Product
+from fastapi_zero.services import catalog
+from fastapi_zero.services.catalog import load_best_prices, save_scraped_items
+from fastapi_zero.services.scraper import ScrapedItem
+
+
+def _item(title, price, url='https://a.com/p'):
+    return ScrapedItem(
+        url=url, title=title, price=price, currency='BRL', raw_price=None
+    )
+
+
+class TestSaveScrapedItems:
+    """Testes para a persistência em lote dos itens raspados."""
+
+    def test_creates_products_and_records(self, session):
+        """Deve criar produtos novos e um registro de preço por item."""
+        saved, product_ids = save_scraped_items(
+            session,
+            [
+                _item('GPU RTX 4070', 10.0),
+                _item('gpu  rtx 4070', 9.0, url='https://b.com/p'),
+                _item('SSD 1TB', 5.0),
+                _item(None, 1.0),
+                _item('Sem preço', None),
+            ],
+            category='hardware',
+        )
+
+        products = session.scalars(select(Product)).all()
+        assert saved == 3
+        assert len(products) == 2
+        assert product_ids == {product.id for product in products}
+        gpu = next(p for p in products if p.normalized_name == 'gpu rtx 4070')
+        assert gpu.display_name == 'GPU RTX 4070'
+        assert gpu.category == 'hardware'
+        assert session.scalar(select(func.count(PriceRecord.id))) == 3
+
+    def test_reuses_existing_products(self, session):
+        """Produtos já cadastrados não devem ser duplicados."""
+        session.add(Product(display_name='Antigo', normalized_name='ssd 1tb'))
+        session.commit()
+
+        save_scraped_items(session, [_item('SSD 1TB', 5.0)])
+
+        products = session.scalars(select(Product)).all()
+        assert [p.display_name for p in products] == ['Antigo']
+        assert session.scalar(select(PriceRecord.product_id)) == products[0].id
+
+    def test_single_commit_per_batch(self, session):
+        """O lote inteiro deve ser gravado em uma única transação."""
+        commits = []
+
+        def on_commit(session):
+            commits.append(session)
+
+        event.listen(session, 'after_commit', on_commit)
+        items = [_item(f'Produto {i}', float(i)) for i in range(1, 1201)]
+
+        saved, product_ids = save_scraped_items(session, items)
+
+        event.remove(session, 'after_commit', on_commit)
+        assert saved == 1200
+        assert len(product_ids) == 1200
+        assert len(commits) == 1
+
+    def test_prefetch_is_chunked(self, session, monkeypatch):
+        """Consultas IN devem respeitar o tamanho máximo do lote."""
+        monkeypatch.setattr(catalog, 'PREFETCH_CHUNK', 2)
+        items = [_item(f'Produto {i}', 1.0) for i in range(5)]
+
+        save_scraped_items(session, items)
+        saved, product_ids = save_scraped_items(session, items)
+
+        assert saved == 5
+        assert len(product_ids) == 5
+        assert session.scalar(select(func.count(Product.id))) == 5
+
+    def test_empty_batch(self, session):
+        """Sem itens com preço, nada é gravado."""
+        assert save_scraped_items(session, [_item('X', None)]) == (0, set())
+
+    def test_best_prices_after_bulk_insert(self, session):
+        """O menor preço deve refletir os registros inseridos em lote."""
+        _, product_ids = save_scraped_items(
+            session,
+            [
+                _item('Mouse', 50.0, url='https://a.com/m'),
+                _item('Mouse', 40.0, url='https://b.com/m'),
+            ],
+        )
+
+        [best] = load_best_prices(session, product_ids)
+        assert best.lowest_price == 40.0
+        assert str(best.source_url) == 'https://b.com/m'
+
+
+class TestBestPriceTable:
+    """Testes para a tabela de menor preço mantida por trigger."""
+
+    def test_tracks_lowest_price_on_insert(self, session):
+        """Cada inserção só substitui o registro se o preço for menor."""
+        product = Product(display_name='Teclado', normalized_name='teclado')
+        session.add(product)
+        session.commit()
+
+        for url, price in [('a', 80.0), ('b', 60.0), ('c', 60.0), ('d', 90.0)]:
+            session.add(
+                PriceRecord(
+                    product_id=product.id,
+                    source_url=f'https://{url}.com',
+                    price=price,
+                )
+            )
+            session.commit()
+
+        best = session.get(BestPrice, product.id)
+        assert best.price == 60.0
+        assert best.source_url == 'https://b.com'
+
+    def test_product_without_records_has_no_row(self, session):
+        """Produtos sem histórico não possuem linha de menor preço."""
+        product = Product(display_name='Vazio', normalized_name='vazio')
+        session.add(product)
+        session.commit()
+
+        assert session.get(BestPrice, product.id) is None
+        assert load_best_prices(session, {product.id}) == []
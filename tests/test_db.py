@@ -1,8 +1,12 @@
+import subprocess
+import sys
 from dataclasses import asdict
 
+import pytest
 from sqlalchemy import select
 
 from fastapi_zero.db.models import User
+from fastapi_zero.db.session import to_async_url
 
 
 def test_create_user(session, mock_db_time):
@@ -23,3 +27,56 @@ def test_create_user(session, mock_db_time):
         'created_at': time,
         'updated_at': time,
     }
+
+
+@pytest.mark.asyncio
+async def test_async_session_sees_sync_writes(session, async_session_factory):
+    session.add(User(username='bob', password='secret', email='bob@test'))
+    session.commit()
+
+    async with async_session_factory() as async_session:
+        user = await async_session.scalar(
+            select(User).where(User.username == 'bob')
+        )
+
+    assert user.email == 'bob@test'
+
+
+@pytest.mark.parametrize(
+    ('url', 'expected'),
+    [
+        ('sqlite:///./dev.db', 'sqlite+aiosqlite:///./dev.db'),
+        ('sqlite+aiosqlite:///./dev.db', 'sqlite+aiosqlite:///./dev.db'),
+        (
+            'postgresql://user:pw@db:5432/app',
+            'postgresql+asyncpg://user:pw@db:5432/app',
+        ),
+        (
+            'postgresql+psycopg2://user:pw@db/app',
+            'postgresql+asyncpg://user:pw@db/app',
+        ),
+        (
+            'postgresql+psycopg://user:pw@db/app',
+            'postgresql+psycopg://user:pw@db/app',
+        ),
+        ('mysql://user:pw@db/app', 'mysql://user:pw@db/app'),
+    ],
+)
+def test_to_async_url(url, expected):
+    assert to_async_url(url) == expected
+
+
+def test_async_engine_is_created_lazily():
+    # Importing the app must not build the engine (nor need its driver).
+    code = (
+        'import fastapi_zero.app;'
+        'from fastapi_zero.db.session import get_async_engine;'
+        'print(get_async_engine.cache_info().currsize)'
+    )
+    result = subprocess.run(
+        [sys.executable, '-c', code],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    assert result.stdout.strip() == '0'
@@ -0,0 +1,86 @@
+# ruff: noqa: PLR6301, PLR2004, E501
+import httpx
+import pytest
+from fastapi.testclient import TestClient
+
+from fastapi_zero.app import app
+from fastapi_zero.core.settings import Settings
+from fastapi_zero.services.http_client import (
+    DEFAULT_HEADERS,
+    ClientRegistry,
+    build_client,
+)
+from fastapi_zero.services.scraper import Scraper
+
+
+class TestClientRegistry:
+    """Testes para o registro de clientes HTTP compartilhados."""
+
+    @pytest.mark.asyncio
+    async def test_get_reuses_client(self):
+        registry = ClientRegistry(timeout=5.0)
+        first = registry.get()
+        assert registry.get() is first
+        assert registry.get(5.0) is first
+        assert registry.get(2.0) is not first
+        await registry.aclose()
+
+    @pytest.mark.asyncio
+    async def test_aclose_closes_and_recreates(self):
+        registry = ClientRegistry()
+        client = registry.get()
+        await registry.aclose()
+        assert client.is_closed
+        assert registry.get() is not client
+        await registry.aclose()
+
+    def test_from_settings_applies_limits(self):
+        settings = Settings(
+            HTTP_MAX_CONNECTIONS=7,
+            HTTP_MAX_KEEPALIVE_CONNECTIONS=3,
+            HTTP_KEEPALIVE_EXPIRY=12.0,
+        )
+        registry = ClientRegistry.from_settings(settings)
+        assert registry.limits.max_connections == 7
+        assert registry.limits.max_keepalive_connections == 3
+        assert registry.limits.keepalive_expiry == 12.0
+
+    @pytest.mark.asyncio
+    async def test_build_client_headers(self):
+        client = build_client(3.0)
+        assert client.headers['User-Agent'] == DEFAULT_HEADERS['User-Agent']
+        assert client.timeout.read == 3.0
+        await client.aclose()
+
+
+class TestScraperSharedClient:
+    """Testes para o Scraper com cliente injetado."""
+
+    @pytest.mark.asyncio
+    async def test_injected_client_is_not_closed(self):
+        def handler(request):
+            return httpx.Response(
+                200, text='<html><body><h1>Produto</h1>R$ 10,00</body></html>'
+            )
+
+        client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        scraper = Scraper(max_concurrency=2, client=client)
+
+        items = await scraper.scrape_urls(['https://example.com/p'])
+        assert items[0].title == 'Produto'
+        assert not client.is_closed
+
+        items = await scraper.scrape_urls(['https://example.com/q'])
+        assert items[0].price == 10.0
+        await client.aclose()
+
+
+def test_lifespan_owns_registry(async_session_factory):
+    app.state.session_factory = async_session_factory
+    with TestClient(app):
+        registry = app.state.http_clients
+        assert isinstance(registry, ClientRegistry)
+        client = registry.get()
+    assert client.is_closed
+    assert not hasattr(app.state, 'http_clients')
+    del app.state.session_factory
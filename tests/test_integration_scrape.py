@@ -6,7 +6,7 @@ from sqlalchemy.orm import Session
 
 from fastapi_zero.app import app
 from fastapi_zero.db.models import PriceRecord, Product
-from fastapi_zero.db.session import get_session
+from fastapi_zero.db.session import get_async_session, get_session
 from fastapi_zero.services.scraper import ScrapedItem
 
 client = TestClient(app)
@@ -15,12 +15,13 @@ client = TestClient(app)
 class TestScrapeEndpointsWithDatabase:
     """Testes de integração para endpoints de scraping com banco de dados."""
 
-    def test_scrape_urls_with_products(self, session: Session):
+    def test_scrape_urls_with_products(self, session: Session, override_get_async_session):
         """Testa /scrape/urls salvando produtos no banco."""
         def override_get_session():
             yield session
 
         app.dependency_overrides[get_session] = override_get_session
+        app.dependency_overrides[get_async_session] = override_get_async_session
 
         # Mock do Scraper para retornar items
         with patch("fastapi_zero.api.routes.scrape.Scraper") as mock_scraper_class:
@@ -72,12 +73,13 @@ class TestScrapeEndpointsWithDatabase:
 
         app.dependency_overrides.clear()
 
-    def test_scrape_urls_with_duplicate_products(self, session: Session):
+    def test_scrape_urls_with_duplicate_products(self, session: Session, override_get_async_session):
         """Testa /scrape/urls com produtos duplicados."""
         def override_get_session():
             yield session
 
         app.dependency_overrides[get_session] = override_get_session
+        app.dependency_overrides[get_async_session] = override_get_async_session
 
         # Primeiro cria um produto existente
         product = Product(
@@ -123,12 +125,13 @@ class TestScrapeEndpointsWithDatabase:
 
         app.dependency_overrides.clear()
 
-    def test_scrape_urls_with_invalid_items(self, session: Session):
+    def test_scrape_urls_with_invalid_items(self, session: Session, override_get_async_session):
         """Testa /scrape/urls ignorando items sem título ou preço."""
         def override_get_session():
             yield session
 
         app.dependency_overrides[get_session] = override_get_session
+        app.dependency_overrides[get_async_session] = override_get_async_session
 
         with patch("fastapi_zero.api.routes.scrape.Scraper") as mock_scraper_class:
             mock_scraper = MagicMock()
@@ -0,0 +1,385 @@
+# ruff: noqa: PLR6301, PLR2004, E501
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from datetime import datetime, timedelta
+from http import HTTPStatus
+from unittest.mock import MagicMock, patch
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.pool import NullPool
+
+from fastapi_zero.app import app
+from fastapi_zero.db.models import PriceRecord, ScrapeJob
+from fastapi_zero.services.jobs import (
+    JOB_CANCELLED,
+    JOB_FAILED,
+    JOB_QUEUED,
+    JOB_RUNNING,
+    JOB_SUCCEEDED,
+    JobManager,
+)
+from fastapi_zero.services.scraper import ScrapedItem
+
+
+@pytest.fixture
+def session_factory(override_get_async_session):
+    return asynccontextmanager(override_get_async_session)
+
+
+async def _wait_for(manager, job_id, statuses, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        job = await manager.get(job_id)
+        if job is not None and job.status in statuses:
+            return job
+        await asyncio.sleep(0.01)
+    raise AssertionError(f'job {job_id} never reached {statuses}')
+
+
+class TestJobManager:
+    """Testes para a fila de jobs em background."""
+
+    @pytest.mark.asyncio
+    async def test_runs_job_and_stores_result(self, session_factory):
+        """Deve executar o job e guardar resultado e progresso."""
+
+        async def runner(payload, context):
+            await context.report(payload['n'], payload['n'])
+            return {'double': payload['n'] * 2}
+
+        manager = JobManager(session_factory, runners={'echo': runner})
+        await manager.start()
+        job = await manager.submit('echo', {'n': 3})
+        assert job.status == JOB_QUEUED
+
+        done = await _wait_for(manager, job.id, {JOB_SUCCEEDED})
+        await manager.stop()
+
+        assert done.result == {'double': 6}
+        assert done.progress == done.total == 3
+        assert done.expires_at is not None
+
+    @pytest.mark.asyncio
+    async def test_failed_job_keeps_error(self, session_factory):
+        """Deve marcar como falho e registrar a mensagem de erro."""
+
+        async def runner(payload, context):
+            raise RuntimeError('boom')
+
+        manager = JobManager(session_factory, runners={'bad': runner})
+        await manager.start()
+        job = await manager.submit('bad', {})
+
+        done = await _wait_for(manager, job.id, {JOB_FAILED})
+        await manager.stop()
+
+        assert done.error == 'boom'
+        assert done.result is None
+
+    @pytest.mark.asyncio
+    async def test_cancel_running_job(self, session_factory):
+        """Deve cancelar a tarefa em execução."""
+        started = asyncio.Event()
+        cancelled = asyncio.Event()
+
+        async def runner(payload, context):
+            started.set()
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                cancelled.set()
+                raise
+            return {}
+
+        manager = JobManager(session_factory, runners={'slow': runner})
+        await manager.start()
+        job = await manager.submit('slow', {})
+        await asyncio.wait_for(started.wait(), 1)
+
+        result = await manager.cancel(job.id)
+        await asyncio.wait_for(cancelled.wait(), 1)
+        await manager.stop()
+
+        assert result.status == JOB_CANCELLED
+        assert (await manager.get(job.id)).status == JOB_CANCELLED
+
+    @pytest.mark.asyncio
+    async def test_cancel_queued_job_never_runs(self, session_factory):
+        """Jobs cancelados antes de iniciar não devem ser executados."""
+        calls = []
+
+        async def runner(payload, context):
+            calls.append(payload)
+            return {}
+
+        manager = JobManager(session_factory, runners={'echo': runner})
+        job = await manager.submit('echo', {})
+        await manager.cancel(job.id)
+        await manager.start()
+        await asyncio.sleep(0.05)
+        await manager.stop()
+
+        assert calls == []
+        assert (await manager.get(job.id)).status == JOB_CANCELLED
+        assert manager._cancelled == set()
+
+    @pytest.mark.asyncio
+    async def test_cancel_before_task_starts(self, session_factory):
+        """Cancelar logo após o job virar running deve impedir a execução."""
+        calls = []
+
+        async def runner(payload, context):
+            calls.append(payload)
+            return {}
+
+        manager = JobManager(session_factory, runners={'echo': runner})
+        claim = manager._claim
+
+        async def claim_then_cancel(job_id):
+            claimed = await claim(job_id)
+            await manager.cancel(job_id)
+            return claimed
+
+        manager._claim = claim_then_cancel
+        await manager.start()
+        job = await manager.submit('echo', {})
+        await asyncio.sleep(0.05)
+        await manager.stop()
+
+        assert calls == []
+        assert (await manager.get(job.id)).status == JOB_CANCELLED
+        assert manager._cancelled == set()
+
+    @pytest.mark.asyncio
+    async def test_cancel_while_finishing_wins(self, session_factory):
+        """Um cancelamento durante a finalização não pode ser sobrescrito."""
+
+        async def runner(payload, context):
+            return {'ok': True}
+
+        manager = JobManager(session_factory, runners={'echo': runner})
+        finish = manager._finish
+
+        async def cancel_then_finish(job_id, *args, **kwargs):
+            await manager.cancel(job_id)
+            await finish(job_id, *args, **kwargs)
+
+        manager._finish = cancel_then_finish
+        await manager.start()
+        job = await manager.submit('echo', {})
+        await asyncio.sleep(0.05)
+        await manager.stop()
+
+        done = await manager.get(job.id)
+        assert done.status == JOB_CANCELLED
+        assert done.result is None
+
+    @pytest.mark.asyncio
+    async def test_worker_survives_database_errors(self, session_factory):
+        """Um erro ao gravar o resultado falha o job sem matar o worker."""
+
+        async def runner(payload, context):
+            return {'n': payload['n']}
+
+        manager = JobManager(
+            session_factory, runners={'echo': runner}, workers=1
+        )
+        finish = manager._finish
+        errors = [RuntimeError('banco fora do ar')]
+
+        async def flaky_finish(*args, **kwargs):
+            if errors:
+                raise errors.pop()
+            await finish(*args, **kwargs)
+
+        manager._finish = flaky_finish
+        await manager.start()
+        first = await manager.submit('echo', {'n': 1})
+        second = await manager.submit('echo', {'n': 2})
+
+        failed = await _wait_for(manager, first.id, {JOB_FAILED})
+        done = await _wait_for(manager, second.id, {JOB_SUCCEEDED})
+        await manager.stop()
+
+        assert failed.error == 'banco fora do ar'
+        assert done.result == {'n': 2}
+
+    @pytest.mark.asyncio
+    async def test_sweeper_survives_errors(self, session_factory):
+        """Uma falha na limpeza não deve interromper as próximas."""
+        manager = JobManager(session_factory, runners={}, result_ttl=0.01)
+        sweeps = []
+
+        async def flaky_purge():
+            sweeps.append(1)
+            if len(sweeps) == 1:
+                raise RuntimeError('banco fora do ar')
+            return 0
+
+        manager.purge_expired = flaky_purge
+        await manager.start()
+        await asyncio.sleep(0.1)
+        await manager.stop()
+
+        assert len(sweeps) >= 2
+
+    @pytest.mark.asyncio
+    async def test_start_recovers_unfinished_jobs(
+        self, session, session_factory
+    ):
+        """Jobs pendentes de uma execução anterior devem ser retomados."""
+        session.add(ScrapeJob(id='a', kind='echo', payload={}))
+        session.add(
+            ScrapeJob(id='b', kind='echo', payload={}, status=JOB_RUNNING)
+        )
+        session.commit()
+        seen = []
+
+        async def runner(payload, context):
+            return {}
+
+        async def tracking_runner(payload, context):
+            seen.append(payload)
+            return await runner(payload, context)
+
+        manager = JobManager(
+            session_factory, runners={'echo': tracking_runner}
+        )
+        await manager.start()
+        await _wait_for(manager, 'a', {JOB_SUCCEEDED})
+        await _wait_for(manager, 'b', {JOB_SUCCEEDED})
+        await manager.stop()
+
+        assert len(seen) == 2
+
+    @pytest.mark.asyncio
+    async def test_stop_requeues_running_job(self, session_factory):
+        """Ao parar, jobs em execução voltam para a fila."""
+        started = asyncio.Event()
+
+        async def runner(payload, context):
+            started.set()
+            await asyncio.sleep(10)
+
+        manager = JobManager(session_factory, runners={'slow': runner})
+        await manager.start()
+        job = await manager.submit('slow', {})
+        await asyncio.wait_for(started.wait(), 1)
+        await manager.stop()
+
+        assert (await manager.get(job.id)).status == JOB_QUEUED
+
+    @pytest.mark.asyncio
+    async def test_expired_jobs_are_hidden_and_purged(
+        self, session, session_factory
+    ):
+        """Resultados expirados não são retornados e são removidos."""
+        session.add(
+            ScrapeJob(
+                id='old',
+                kind='echo',
+                payload={},
+                status=JOB_SUCCEEDED,
+                expires_at=datetime.now() - timedelta(seconds=1),
+            )
+        )
+        session.commit()
+        manager = JobManager(session_factory, runners={'echo': None})
+
+        assert await manager.get('old') is None
+        assert await manager.cancel('old') is None
+        assert await manager.purge_expired() == 1
+        session.expire_all()
+        assert session.get(ScrapeJob, 'old') is None
+
+    @pytest.mark.asyncio
+    async def test_submit_unknown_kind(self, session_factory):
+        """Deve rejeitar tipos de job desconhecidos."""
+        manager = JobManager(session_factory, runners={})
+        with pytest.raises(ValueError, match='unknown job kind'):
+            await manager.submit('nope', {})
+
+
+class TestJobsEndpoints:
+    """Testes para os endpoints de jobs."""
+
+    def test_scrape_job_end_to_end(self, client, session):
+        """Deve enfileirar, executar e persistir um scraping em background."""
+        items = [
+            ScrapedItem(
+                url='https://a.com/1',
+                title='Item',
+                price=9.9,
+                currency='BRL',
+                raw_price='R$ 9,90',
+            )
+        ]
+
+        async def fake_iter_scrape(urls):
+            for item in items:
+                yield item
+
+        with patch('fastapi_zero.services.jobs.Scraper') as scraper_cls:
+            scraper_cls.return_value = MagicMock(iter_scrape=fake_iter_scrape)
+            response = client.post(
+                '/jobs/scrape', json={'urls': ['https://a.com/1']}
+            )
+            assert response.status_code == HTTPStatus.ACCEPTED
+            job_id = response.json()['id']
+            assert response.json()['status'] in {JOB_QUEUED, JOB_RUNNING}
+
+            deadline = time.monotonic() + 2
+            while time.monotonic() < deadline:
+                job = client.get(f'/jobs/{job_id}').json()
+                if job['status'] == JOB_SUCCEEDED:
+                    break
+                time.sleep(0.01)
+
+        assert job['status'] == JOB_SUCCEEDED
+        assert job['progress'] == job['total'] == 1
+        assert job['result']['total_saved'] == 1
+        assert job['result']['products'][0]['lowest_price'] == 9.9
+        assert len(session.scalars(select(PriceRecord)).all()) == 1
+
+    def test_unknown_job(self, client):
+        """Deve retornar 404 para jobs inexistentes."""
+        assert client.get('/jobs/missing').status_code == HTTPStatus.NOT_FOUND
+        assert (
+            client.delete('/jobs/missing').status_code == HTTPStatus.NOT_FOUND
+        )
+
+    def test_cancel_endpoint(self, client):
+        """Deve cancelar um job via DELETE."""
+        with patch.object(client.app.state.jobs, '_queue', asyncio.Queue()):
+            job_id = client.post(
+                '/jobs/crawl', json={'base_url': 'https://a.com'}
+            ).json()['id']
+            response = client.delete(f'/jobs/{job_id}')
+
+        assert response.status_code == HTTPStatus.OK
+        assert response.json()['status'] == JOB_CANCELLED
+
+    def test_jobs_unavailable_without_lifespan(self):
+        """Sem o lifespan, a fila não está disponível."""
+        response = TestClient(app).get('/jobs/anything')
+        assert response.status_code == HTTPStatus.SERVICE_UNAVAILABLE
+
+    def test_unmigrated_database_only_disables_jobs(self, tmp_path):
+        """Sem a tabela de jobs, só /jobs fica indisponível."""
+        empty = create_async_engine(
+            f'sqlite+aiosqlite:///{tmp_path / "vazio.db"}', poolclass=NullPool
+        )
+        app.state.session_factory = async_sessionmaker(empty)
+        try:
+            with TestClient(app) as client:
+                assert app.state.jobs is None
+                assert client.get('/').status_code == HTTPStatus.OK
+                response = client.get('/jobs/anything')
+        finally:
+            del app.state.session_factory
+
+        assert response.status_code == HTTPStatus.SERVICE_UNAVAILABLE
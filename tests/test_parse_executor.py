@@ -0,0 +1,85 @@
+# ruff: noqa: PLR6301, PLR2004, E501
+import httpx
+import pytest
+
+from fastapi_zero.services.parse_executor import (
+    ParseExecutor,
+    parse_html_bytes,
+)
+from fastapi_zero.services.scraper import Scraper, parse_html
+
+PAGE = """
+<html><head><meta property="og:title" content="Café Expresso 500g"></head>
+<body><span class="price">R$ 1.299,90</span></body></html>
+"""
+
+
+class TestParseHtmlBytes:
+    """Testes para o parsing a partir dos bytes da resposta."""
+
+    def test_matches_parse_html(self):
+        """Deve gerar o mesmo item que parse_html sobre o texto."""
+        item = parse_html_bytes('https://a.com/p', PAGE.encode())
+        assert item == parse_html('https://a.com/p', PAGE)
+
+    def test_uses_response_encoding(self):
+        """Deve decodificar com a codificação informada."""
+        item = parse_html_bytes(
+            'https://a.com/p', PAGE.encode('latin-1'), 'latin-1'
+        )
+        assert item.title == 'Café Expresso 500g'
+        assert item.price == 1299.90
+
+
+class TestParseExecutor:
+    """Testes para o executor de parsing fora do event loop."""
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize('kind', ['thread', 'process'])
+    async def test_parse_in_pool(self, kind):
+        """Pools de threads e de processos devem devolver o item."""
+        executor = ParseExecutor(workers=1, kind=kind)
+        try:
+            item = await executor.parse('https://a.com/p', PAGE.encode())
+        finally:
+            executor.shutdown()
+
+        assert executor.kind == kind
+        assert item == parse_html('https://a.com/p', PAGE)
+
+    def test_unknown_kind(self):
+        """Deve rejeitar tipos de executor desconhecidos."""
+        with pytest.raises(ValueError, match='unknown parse executor'):
+            ParseExecutor(kind='gpu')
+
+    @pytest.mark.asyncio
+    async def test_scraper_sends_bytes_to_executor(self):
+        """O Scraper deve repassar o corpo bruto e a codificação."""
+        calls = []
+
+        class RecordingExecutor(ParseExecutor):
+            async def parse(self, url, content, encoding=None):
+                calls.append((url, content, encoding))
+                return await super().parse(url, content, encoding)
+
+        def handler(request):
+            return httpx.Response(
+                200,
+                content=PAGE.encode('latin-1'),
+                headers={'Content-Type': 'text/html; charset=latin-1'},
+            )
+
+        executor = RecordingExecutor(workers=1, kind='thread')
+        client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        scraper = Scraper(client=client, parse_executor=executor)
+        try:
+            [item] = await scraper.scrape_urls(['https://a.com/p'])
+        finally:
+            await client.aclose()
+            executor.shutdown()
+
+        assert calls == [
+            ('https://a.com/p', PAGE.encode('latin-1'), 'latin-1')
+        ]
+        assert item.title == 'Café Expresso 500g'
+        assert item.price == 1299.90
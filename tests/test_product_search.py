@@ -0,0 +1,158 @@
+# ruff: noqa: PLR6301, PLR2004, E501
+from sqlalchemy import select
+
+from fastapi_zero.db.models import Product, ProductTerm
+from fastapi_zero.services.catalog import save_scraped_items
+from fastapi_zero.services.product_search import (
+    index_products,
+    product_terms,
+    search_products,
+)
+from fastapi_zero.services.scraper import ScrapedItem, Scraper
+from fastapi_zero.services.search_optimizer import SearchOptimizer
+
+
+def _item(title, price, url='https://a.com/p'):
+    return ScrapedItem(
+        url=url, title=title, price=price, currency='BRL', raw_price=None
+    )
+
+
+CATALOG = [
+    _item('Gabinete Gamer RGB Preto', 399.0, 'https://a.com/1'),
+    _item('Gabinete Gamer RGB', 429.0, 'https://a.com/2'),
+    _item('Gabinete Office Branco', 199.0, 'https://a.com/3'),
+    _item('Monitor Gamer 24 polegadas', 899.0, 'https://a.com/4'),
+    _item('Café Expresso 500g', 29.9, 'https://a.com/5'),
+]
+
+
+class TestProductTerms:
+    """Testes para os termos indexados de cada produto."""
+
+    def test_words_with_and_without_accents(self):
+        """Deve indexar as palavras do nome com e sem acento."""
+        assert product_terms('Café Expresso 500g', 'caf expresso 500g') == {
+            'café',
+            'cafe',
+            'caf',
+            'expresso',
+            '500g',
+        }
+
+
+class TestIndexing:
+    """Testes para a atualização incremental do índice."""
+
+    def test_new_products_are_indexed(self, session):
+        """Produtos criados pelo save_scraped_items entram no índice."""
+        _, product_ids = save_scraped_items(
+            session, [_item('GPU RTX 4070', 10.0)]
+        )
+
+        rows = session.execute(select(ProductTerm.term, ProductTerm.product_id)).all()
+        assert set(rows) == {
+            (term, *product_ids) for term in ('gpu', 'rtx', '4070')
+        }
+
+    def test_existing_products_are_not_reindexed(self, session):
+        """Produtos já cadastrados não geram termos novos."""
+        save_scraped_items(session, [_item('GPU RTX 4070', 10.0)])
+        save_scraped_items(session, [_item('gpu rtx 4070!', 9.0)])
+
+        terms = session.scalars(select(ProductTerm.term)).all()
+        assert sorted(terms) == ['4070', 'gpu', 'rtx']
+
+    def test_index_is_idempotent(self, session):
+        """Reindexar um produto não deve duplicar termos."""
+        _, [product_id] = save_scraped_items(session, [_item('SSD 1TB', 5.0)])
+
+        index_products(session, [(product_id, 'SSD 1TB', 'ssd 1tb')])
+        session.commit()
+
+        assert len(session.scalars(select(ProductTerm)).all()) == 2
+
+
+class TestSearchProducts:
+    """Testes para a busca local de produtos."""
+
+    def test_ranked_like_search_optimizer(self, session):
+        """Deve ordenar pelo mesmo score do SearchOptimizer."""
+        save_scraped_items(session, CATALOG)
+
+        hits = search_products(session, 'gabinete gamer', limit=10)
+
+        names = [hit.name for hit in hits]
+        scores = SearchOptimizer('gabinete gamer').score_titles(names)
+        assert [hit.relevance_score for hit in hits] == scores
+        assert scores == sorted(scores, reverse=True)
+        assert names[0] == 'Gabinete Gamer RGB'
+        assert 'Café Expresso 500g' not in names
+
+    def test_includes_best_price(self, session):
+        """Cada resultado deve trazer o menor preço registrado."""
+        save_scraped_items(session, CATALOG)
+        save_scraped_items(
+            session, [_item('Gabinete Gamer RGB', 379.0, 'https://b.com/2')]
+        )
+
+        [hit] = search_products(session, 'gabinete gamer rgb', limit=1)
+
+        assert hit.name == 'Gabinete Gamer RGB'
+        assert hit.lowest_price == 379.0
+        assert str(hit.source_url) == 'https://b.com/2'
+
+    def test_respects_limit(self, session):
+        """Deve devolver no máximo ``limit`` produtos."""
+        save_scraped_items(session, CATALOG)
+        assert len(search_products(session, 'gamer', limit=2)) == 2
+
+    def test_accent_insensitive(self, session):
+        """Consultas sem acento devem achar nomes acentuados."""
+        save_scraped_items(session, CATALOG)
+
+        hits = search_products(session, 'cafe', limit=5)
+
+        assert [hit.name for hit in hits] == ['Café Expresso 500g']
+
+    def test_no_match_or_only_stopwords(self, session):
+        """Sem palavras em comum ou só com stopwords, nada é devolvido."""
+        save_scraped_items(session, CATALOG)
+
+        assert search_products(session, 'geladeira', limit=5) == []
+        assert search_products(session, 'de para com', limit=5) == []
+
+
+class TestSearchEndpoint:
+    """Testes para o endpoint de busca local."""
+
+    def test_finds_products_saved_by_scrape(self, client, session, monkeypatch):
+        """Produtos gravados por /scrape/urls devem aparecer na busca."""
+
+        async def fake_scrape(self, urls):
+            return CATALOG
+
+        monkeypatch.setattr(Scraper, 'scrape_urls', fake_scrape)
+        response = client.post(
+            '/scrape/urls', json={'urls': ['https://a.com/1']}
+        )
+        assert response.status_code == 200
+
+        response = client.get(
+            '/products/search', params={'q': 'gabinete', 'limit': 2}
+        )
+
+        assert response.status_code == 200
+        data = response.json()
+        assert data['query'] == 'gabinete'
+        assert data['total'] == 2
+        assert all('Gabinete' in p['name'] for p in data['products'])
+        product = session.scalar(
+            select(Product).where(Product.id == data['products'][0]['product_id'])
+        )
+        assert product.display_name == data['products'][0]['name']
+
+    def test_empty_query_is_rejected(self, client):
+        """A consulta é obrigatória."""
+        response = client.get('/products/search', params={'q': ''})
+        assert response.status_code == 422
@@ -0,0 +1,141 @@
+# ruff: noqa: PLR6301, PLR2004, E501
+import asyncio
+import random
+from datetime import datetime, timezone
+
+import httpx
+import pytest
+
+from fastapi_zero.services.retry import RetryPolicy, parse_retry_after
+from fastapi_zero.services.scraper import Scraper
+
+
+class TestParseRetryAfter:
+    """Testes para o parsing do header Retry-After."""
+
+    def test_seconds(self):
+        assert parse_retry_after('7') == 7.0
+        assert parse_retry_after(' 0 ') == 0.0
+
+    def test_http_date(self):
+        now = datetime(2026, 1, 1, 12, 0, 0, tzinfo=timezone.utc)
+        value = 'Thu, 01 Jan 2026 12:00:05 GMT'
+        assert parse_retry_after(value, now=now) == 5.0
+
+    def test_past_date_is_zero(self):
+        now = datetime(2026, 1, 1, 12, 0, 0, tzinfo=timezone.utc)
+        value = 'Thu, 01 Jan 2026 11:00:00 GMT'
+        assert parse_retry_after(value, now=now) == 0.0
+
+    def test_missing_or_invalid(self):
+        assert parse_retry_after(None) is None
+        assert parse_retry_after('') is None
+        assert parse_retry_after('soon') is None
+
+
+class TestRetryPolicy:
+    """Testes para a política de retry."""
+
+    def test_should_retry(self):
+        policy = RetryPolicy()
+        assert policy.should_retry(None)
+        assert policy.should_retry(httpx.Response(429))
+        assert policy.should_retry(httpx.Response(403))
+        assert policy.should_retry(httpx.Response(502))
+        assert not policy.should_retry(httpx.Response(404))
+        assert not policy.should_retry(httpx.Response(200))
+
+    def test_retry_after_wins(self):
+        policy = RetryPolicy(max_delay=10.0)
+        response = httpx.Response(429, headers={'Retry-After': '3'})
+        assert policy.next_delay(None, response) == 3.0
+
+    def test_retry_after_too_long_gives_up(self):
+        policy = RetryPolicy(max_delay=10.0)
+        response = httpx.Response(503, headers={'Retry-After': '120'})
+        assert policy.next_delay(None, response) is None
+
+    def test_decorrelated_jitter_bounds(self):
+        policy = RetryPolicy(base_delay=0.5, max_delay=4.0, rng=random.Random(1))
+        delay = None
+        for _ in range(50):
+            previous = delay or 0.5
+            delay = policy.next_delay(delay)
+            assert 0.5 <= delay <= min(4.0, previous * 3)
+
+    def test_jitter_spreads_delays(self):
+        policy = RetryPolicy(rng=random.Random(7))
+        delays = {round(policy.next_delay(1.0), 6) for _ in range(20)}
+        assert len(delays) > 1
+
+
+class TestScraperBackoff:
+    """Testes do backoff no Scraper."""
+
+    @pytest.mark.asyncio
+    async def test_backoff_releases_slot(self, monkeypatch):
+        calls: list[str] = []
+
+        def handler(request):
+            calls.append(request.url.path)
+            if request.url.path == '/a' and calls.count('/a') == 1:
+                return httpx.Response(429, headers={'Retry-After': '1'})
+            return httpx.Response(200, text='<h1>Produto</h1>R$ 10,00')
+
+        client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        scraper = Scraper(max_concurrency=1, client=client)
+        slots_during_backoff = []
+        real_sleep = asyncio.sleep
+
+        async def fake_sleep(delay, *args, **kwargs):
+            slots_during_backoff.append((delay, scraper._semaphore._value))
+            await real_sleep(0)
+
+        monkeypatch.setattr(asyncio, 'sleep', fake_sleep)
+        items = await scraper.scrape_urls(
+            ['https://example.com/a', 'https://example.com/b']
+        )
+        await client.aclose()
+
+        assert slots_during_backoff[0] == (1.0, 1)
+        assert {item.title for item in items} == {'Produto'}
+        # /b foi buscada enquanto /a aguardava o retry
+        assert calls.index('/b') < len(calls) - 1
+
+    @pytest.mark.asyncio
+    async def test_non_retryable_status_fails_fast(self, monkeypatch):
+        calls = []
+
+        def handler(request):
+            calls.append(request.url.path)
+            return httpx.Response(404)
+
+        client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        scraper = Scraper(client=client)
+        item = await scraper._bounded_fetch(client, 'https://example.com/x')
+        await client.aclose()
+
+        assert item.title is None
+        assert calls == ['/x']
+
+    @pytest.mark.asyncio
+    async def test_custom_policy_attempts(self, monkeypatch):
+        calls = []
+
+        async def fast_sleep(*args, **kwargs):
+            return None
+
+        def handler(request):
+            calls.append(request.url.path)
+            return httpx.Response(503)
+
+        monkeypatch.setattr(asyncio, 'sleep', fast_sleep)
+        client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        scraper = Scraper(
+            client=client, retry_policy=RetryPolicy(max_attempts=5)
+        )
+        item = await scraper._bounded_fetch(client, 'https://example.com/x')
+        await client.aclose()
+
+        assert item.price is None
+        assert len(calls) == 5
@@ -0,0 +1,141 @@
+# ruff: noqa: PLR6301, PLR2004, E501
+import json
+from contextlib import asynccontextmanager
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from fastapi_zero.api.dependencies import get_session_factory
+from fastapi_zero.api.routes import scrape as scrape_routes
+from fastapi_zero.db.models import PriceRecord, Product
+from fastapi_zero.services.scraper import ScrapedItem
+
+ITEMS = [
+    ScrapedItem(
+        url="https://example.com/produto/1",
+        title="Placa de Video RTX 4070",
+        price=3999.9,
+        currency="BRL",
+        raw_price="R$ 3.999,90",
+    ),
+    ScrapedItem(
+        url="https://example.com/produto/2",
+        title=None,
+        price=None,
+        currency=None,
+        raw_price=None,
+    ),
+    ScrapedItem(
+        url="https://example.com/produto/3",
+        title="Placa de Video RTX 4070",
+        price=3799.9,
+        currency="BRL",
+        raw_price="R$ 3.799,90",
+    ),
+]
+
+
+@pytest.fixture
+def mocked_scraper():
+    with patch("fastapi_zero.api.routes.scrape.Scraper") as mock_scraper_class:
+        mock_scraper = MagicMock()
+        mock_scraper_class.return_value = mock_scraper
+
+        async def mock_iter_scrape(urls):
+            list(urls)
+            for item in ITEMS:
+                yield item
+
+        mock_scraper.iter_scrape = mock_iter_scrape
+        yield mock_scraper
+
+
+PAYLOAD = {
+    "urls": [item.url for item in ITEMS],
+    "category": "gpu",
+}
+
+
+class TestScrapeStream:
+    """Testes para o streaming de /scrape/urls."""
+
+    def test_ndjson_stream(self, client, session, mocked_scraper):
+        response = client.post("/scrape/urls/stream", json=PAYLOAD)
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("application/x-ndjson")
+
+        events = [json.loads(line) for line in response.text.splitlines()]
+        kinds = [event["event"] for event in events]
+        assert kinds[:3] == ["item", "item", "item"]
+        assert kinds[-1] == "summary"
+        assert events[-1]["data"] == {"total_scraped": 3, "total_saved": 2}
+
+        products = [event["data"] for event in events if event["event"] == "product"]
+        assert len(products) == 1
+        assert products[0]["lowest_price"] == 3799.9
+        assert products[0]["category"] == "gpu"
+
+        assert session.query(Product).count() == 1
+        assert session.query(PriceRecord).count() == 2
+
+    def test_sse_stream(self, client, mocked_scraper):
+        response = client.post("/scrape/urls/stream?format=sse", json=PAYLOAD)
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/event-stream")
+
+        blocks = [block for block in response.text.split("\n\n") if block]
+        assert blocks[0].startswith("event: item\ndata: ")
+        name, data = blocks[-1].split("\n")
+        assert name == "event: summary"
+        assert json.loads(data.removeprefix("data: ")) == {
+            "total_scraped": 3,
+            "total_saved": 2,
+        }
+
+    def test_products_emitted_per_batch(self, client, mocked_scraper, monkeypatch):
+        monkeypatch.setattr(scrape_routes, "STREAM_PERSIST_BATCH", 1)
+        response = client.post("/scrape/urls/stream", json=PAYLOAD)
+        events = [json.loads(line) for line in response.text.splitlines()]
+        kinds = [event["event"] for event in events]
+        assert kinds == ["item", "product", "item", "item", "product", "summary"]
+        assert events[4]["data"]["lowest_price"] == 3799.9
+
+    def test_invalid_format(self, client):
+        response = client.post("/scrape/urls/stream?format=xml", json=PAYLOAD)
+        assert response.status_code == 422
+
+
+@pytest.fixture
+def tracked_sessions(client, async_session_factory):
+    """Conta as sessões abertas e fechadas pelo corpo do streaming."""
+    events = []
+
+    @asynccontextmanager
+    async def factory():
+        events.append("open")
+        try:
+            async with async_session_factory() as session:
+                yield session
+        finally:
+            events.append("close")
+
+    client.app.dependency_overrides[get_session_factory] = lambda: factory
+    return events
+
+
+class TestScrapeStreamSessions:
+    """Cada lote salvo usa uma sessão própria e de vida curta."""
+
+    def test_session_per_flush(self, client, mocked_scraper, monkeypatch, tracked_sessions):
+        monkeypatch.setattr(scrape_routes, "STREAM_PERSIST_BATCH", 1)
+        client.post("/scrape/urls/stream", json=PAYLOAD)
+        assert tracked_sessions == ["open", "close"] * 3
+
+    def test_session_closed_when_save_fails(self, client, mocked_scraper, monkeypatch, tracked_sessions):
+        def broken_save(session, items, category):
+            raise RuntimeError("banco fora do ar")
+
+        monkeypatch.setattr(scrape_routes, "save_scraped_items", broken_save)
+        with pytest.raises(RuntimeError, match="banco fora do ar"):
+            client.post("/scrape/urls/stream", json=PAYLOAD)
+        assert tracked_sessions == ["open", "close"]
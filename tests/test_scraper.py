@@ -1,15 +1,27 @@
-# ruff: noqa: PLR6301, PLR2004, E501
+# ruff: noqa: PLR6301, PLR2004, E501, PLC2701
+import asyncio
+import gzip
+import random
 from unittest.mock import AsyncMock, MagicMock, patch
 
+import httpx
 import pytest
 
+from fastapi_zero.services import scraper as scraper_module
 from fastapi_zero.services.scraper import (
     DiscoveryConfig,
     DiscoveryFilters,
     ScrapedItem,
     Scraper,
+    _compile_patterns,
+    _extract_pagination_links,
+    _extract_product_urls_from_html,
+    _extract_product_urls_from_next_data,
+    analyze_search_page,
+    extract_price_from_raw_html,
     normalize_product_name,
     parse_price,
+    scan_price_candidates,
 )
 
 
@@ -51,6 +63,90 @@ class TestPriceParser:
         assert price == 99.0  # Não é dividido por 100 (menos de 3 dígitos)
         assert currency is None
 
+    @pytest.mark.parametrize(
+        ('raw', 'expected'),
+        [
+            ('129990', (1299.90, None)),
+            ('1299.90', (1299.90, None)),
+            (' 129990 ', (1299.90, None)),
+            ('R$ 129990', (129990.0, 'BRL')),
+            ('BRL 1799', (1799.0, 'BRL')),
+            ('1.299,90 eur', (1299.90, 'EUR')),
+            ('USD 1,299.90', (1299.90, 'USD')),
+            ('$ 10 BRL', (10.0, 'BRL')),
+            ('R$', (None, 'BRL')),
+        ],
+    )
+    def test_parse_price_fast_and_cached_paths(self, raw, expected):
+        """Números puros e textos com moeda devem manter as regras."""
+        assert parse_price(raw) == expected
+
+    def test_parse_price_caches_currency_strings(self):
+        """Textos com moeda repetidos devem vir do cache."""
+        scraper_module._parse_price_cached.cache_clear()
+        for _ in range(3):
+            parse_price('R$ 1.299,00')
+        parse_price('1299')
+
+        info = scraper_module._parse_price_cached.cache_info()
+        assert (info.hits, info.misses) == (2, 1)
+
+
+def _findall_per_pattern(text):
+    return [
+        (index, match)
+        for index, pattern in enumerate(scraper_module.PRICE_PATTERNS)
+        for match in pattern.findall(text)
+    ]
+
+
+PRICE_TEXTS = [
+    'Por R$ 1.299,90 ou 12x de R$108,32 sem juros',
+    'Antes: 2.499,00 R$ agora 1.999,00\xa0R$',
+    'US$ 1,299.99 | $ 49.90 | €\n 1.234,56 | EUR 10',
+    '10 R$ 20 R$ 30 $ 40 € 50',
+    'Lote 12345678 de 1.2.3,45 e 9,99.99 ... ,,, R$ R$ $$',
+    '<span class="p">R$&nbsp;89,90</span><i>R$</i> <b>1.000</b>',
+    'width: 33.33%; margin: 0.5em 1,5px; ts=1700000000.12',
+    'Sem preço nenhum aqui.',
+    '',
+]
+
+
+class TestScanPriceCandidates:
+    """Testes para a varredura única dos padrões de preço."""
+
+    @pytest.mark.parametrize('text', PRICE_TEXTS)
+    def test_matches_per_pattern_findall(self, text):
+        """Deve achar os mesmos candidatos, na mesma ordem, que os laços."""
+        assert scan_price_candidates(text) == _findall_per_pattern(text)
+
+    def test_matches_per_pattern_findall_on_random_text(self):
+        """Deve coincidir com os laços em textos aleatórios de preço."""
+        rng = random.Random(13)
+        alphabet = 'R$€0123456789.,  \xa0\nabR'
+        for _ in range(2000):
+            text = ''.join(
+                rng.choice(alphabet) for _ in range(rng.randint(0, 40))
+            )
+            assert scan_price_candidates(text) == _findall_per_pattern(text)
+
+    def test_tags_matching_pattern(self):
+        """Cada candidato deve vir marcado com o padrão que o encontrou."""
+        assert scan_price_candidates('R$ 10,00 e 5.00') == [
+            (0, 'R$ 10,00'),
+            (2, '$ 10'),
+            (4, '10,00'),
+            (5, '5.00'),
+        ]
+
+    def test_raw_html_candidates(self):
+        """extract_price_from_raw_html deve devolver só os textos."""
+        html = PRICE_TEXTS[0]
+        assert extract_price_from_raw_html(html) == [
+            match for _, match in _findall_per_pattern(html)
+        ]
+
 
 class TestNormalizeProductName:
     """Testes para normalização de nomes de produtos."""
@@ -177,3 +273,679 @@ class TestScraperClass:
 
             result = await scraper.discover_search_urls("https://example.com/search")
             assert isinstance(result, list)
+
+
+def _mock_client(handler):
+    return httpx.AsyncClient(transport=httpx.MockTransport(handler))
+
+
+class TestIterScrape:
+    """Testes para o scraping em streaming."""
+
+    @pytest.mark.asyncio
+    async def test_yields_in_completion_order(self):
+        async def handler(request):
+            if request.url.path == '/slow':
+                await asyncio.sleep(0.05)
+            return httpx.Response(
+                200, text=f'<h1>{request.url.path}</h1>R$ 10,00'
+            )
+
+        client = _mock_client(handler)
+        scraper = Scraper(client=client)
+        titles = [
+            item.title
+            async for item in scraper.iter_scrape(
+                ['https://example.com/slow', 'https://example.com/fast']
+            )
+        ]
+        await client.aclose()
+        assert titles == ['/fast', '/slow']
+
+    @pytest.mark.asyncio
+    async def test_pulls_urls_lazily(self):
+        consumed = []
+
+        def url_source():
+            for index in range(1000):
+                consumed.append(index)
+                yield f'https://example.com/{index}'
+
+        client = _mock_client(
+            lambda request: httpx.Response(200, text='<h1>P</h1>')
+        )
+        scraper = Scraper(max_concurrency=2, client=client)
+        stream = scraper.iter_scrape(url_source())
+        first = await anext(stream)
+        assert first.title == 'P'
+        assert len(consumed) <= 5
+        await stream.aclose()
+        await client.aclose()
+        assert len(consumed) <= 6
+
+    @pytest.mark.asyncio
+    async def test_close_cancels_pending(self):
+        started = []
+        cancelled = []
+
+        async def handler(request):
+            started.append(request.url.path)
+            if request.url.path != '/0':
+                try:
+                    await asyncio.sleep(10)
+                except asyncio.CancelledError:
+                    cancelled.append(request.url.path)
+                    raise
+            return httpx.Response(200, text='<h1>P</h1>')
+
+        client = _mock_client(handler)
+        scraper = Scraper(max_concurrency=3, client=client)
+        stream = scraper.iter_scrape(
+            f'https://example.com/{index}' for index in range(3)
+        )
+        await anext(stream)
+        await stream.aclose()
+        await client.aclose()
+        assert sorted(cancelled) == ['/1', '/2']
+
+    @pytest.mark.asyncio
+    async def test_scrape_urls_collects_stream(self):
+        client = _mock_client(
+            lambda request: httpx.Response(200, text='<h1>P</h1>R$ 5,00')
+        )
+        scraper = Scraper(client=client)
+        items = await scraper.scrape_urls(
+            f'https://example.com/{index}' for index in range(30)
+        )
+        await client.aclose()
+        assert len(items) == 30
+        assert {item.price for item in items} == {5.0}
+
+
+SEARCH_PAGE = """
+<html><body>
+  <a href="/produto/1/gpu">GPU</a>
+  <a href="/produto/2/ssd#reviews">SSD</a>
+  <a href="https://outra.com/produto/3/cpu">CPU</a>
+  <a href="/busca?q=gpu&page=2">2</a>
+  <a href="/busca?q=gpu&pagina=3">3</a>
+  <a href="/busca?q=gpu&page=2">2 de novo</a>
+  <a href="/sobre">Sobre</a>
+  <a>Sem link</a>
+  <div data-url="/produto/4/ram"></div>
+  <script id="__NEXT_DATA__" type="application/json">
+    {"props": {"items": [{"code": 5, "friendlyName": "mouse"},
+                         {"externalUrl": "https://loja.com/produto/6/teclado"}]}}
+  </script>
+</body></html>
+"""
+
+
+class TestAnalyzeSearchPage:
+    """Testes para a análise de página de busca em uma única leitura."""
+
+    def test_matches_separate_extractors(self):
+        """Deve produzir os mesmos links que os três extratores separados."""
+        base = 'https://loja.com/busca?q=gpu'
+        include = _compile_patterns([r'/produto/'])
+        exclude = _compile_patterns([r'/produto/2/'])
+
+        page = analyze_search_page(SEARCH_PAGE, base, include, exclude)
+
+        expected_products = _extract_product_urls_from_html(
+            SEARCH_PAGE, base, include, exclude
+        ) + _extract_product_urls_from_next_data(
+            SEARCH_PAGE, base, include, exclude
+        )
+        assert sorted(page.product_links) == sorted(expected_products)
+        assert page.pagination_links == _extract_pagination_links(
+            SEARCH_PAGE, base
+        )
+        assert 'https://loja.com/produto/5/mouse' in page.product_links
+        assert page.pagination_links == [
+            'https://loja.com/busca?q=gpu&page=2',
+            'https://loja.com/busca?q=gpu&pagina=3',
+        ]
+
+    def test_parses_html_once(self, monkeypatch):
+        """O HTML deve ser lido pelo parser apenas uma vez."""
+        calls = []
+        original = scraper_module.HTMLParser
+
+        def counting_parser(html):
+            calls.append(html)
+            return original(html)
+
+        monkeypatch.setattr(scraper_module, 'HTMLParser', counting_parser)
+        scraper_module.analyze_search_page(
+            SEARCH_PAGE, 'https://loja.com/busca', None, None
+        )
+
+        assert len(calls) == 1
+
+
+def _urlset(count, start=0):
+    entries = ''.join(
+        f'<url><loc>https://loja.com/produto/{i}</loc></url>'
+        for i in range(start, start + count)
+    )
+    return (
+        '<?xml version="1.0" encoding="UTF-8"?>'
+        '<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">'
+        f'{entries}</urlset>'
+    ).encode()
+
+
+def _sitemap_client(routes):
+    def handler(request):
+        body = routes.get(str(request.url))
+        if body is None:
+            return httpx.Response(404)
+        return httpx.Response(200, content=body)
+
+    return httpx.AsyncClient(transport=httpx.MockTransport(handler))
+
+
+class TestStreamingSitemap:
+    """Testes para a leitura incremental de sitemaps."""
+
+    @pytest.mark.asyncio
+    async def test_gzipped_sitemap_index(self):
+        """Deve seguir o índice e descompactar sitemaps .xml.gz."""
+        index = (
+            b'<sitemapindex xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">'
+            b'<sitemap><loc>https://loja.com/produtos.xml.gz</loc></sitemap>'
+            b'</sitemapindex>'
+        )
+        client = _sitemap_client({
+            'https://loja.com/sitemap.xml': index,
+            'https://loja.com/produtos.xml.gz': gzip.compress(_urlset(3)),
+        })
+        filters = DiscoveryFilters(include_regex=None, exclude_regex=None)
+
+        async with client:
+            urls = await scraper_module._discover_from_sitemap(
+                client, 'https://loja.com', 10, filters
+            )
+
+        assert urls == [f'https://loja.com/produto/{i}' for i in range(3)]
+
+    @pytest.mark.asyncio
+    async def test_stops_reading_at_max_urls(self):
+        """Deve parar de baixar o corpo assim que atingir max_urls."""
+        body = _urlset(5000)
+        chunk_size = 1024
+        chunks = [
+            body[i : i + chunk_size] for i in range(0, len(body), chunk_size)
+        ]
+        sent = []
+
+        async def stream():
+            for chunk in chunks:
+                sent.append(chunk)
+                yield chunk
+
+        def handler(request):
+            if str(request.url) == 'https://loja.com/sitemap.xml':
+                return httpx.Response(200, content=stream())
+            return httpx.Response(404)
+
+        client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        filters = DiscoveryFilters(include_regex=None, exclude_regex=None)
+
+        async with client:
+            urls = await scraper_module._discover_from_sitemap(
+                client, 'https://loja.com', 10, filters
+            )
+
+        assert urls == [f'https://loja.com/produto/{i}' for i in range(10)]
+        assert len(sent) < len(chunks) / 10
+
+    def test_reader_frees_finished_entries(self):
+        """Entradas já lidas não devem ficar acumuladas na árvore."""
+        reader = scraper_module._SitemapReader()
+        body = _urlset(1000)
+
+        entries = []
+        for i in range(0, len(body), 512):
+            entries += reader.feed(body[i : i + 512])
+        entries += reader.close()
+
+        assert len(entries) == 1000
+        assert len(reader._root) == 0
+
+    @pytest.mark.asyncio
+    async def test_error_status_yields_nothing(self):
+        """Respostas de erro não devem ser lidas como sitemap."""
+        client = _sitemap_client({})
+
+        async with client:
+            entries = [
+                entry
+                async for entry in scraper_module._iter_sitemap(
+                    client, 'https://loja.com/sitemap.xml'
+                )
+            ]
+
+        assert entries == []
+
+    @pytest.mark.asyncio
+    async def test_malformed_sitemap_urls_are_skipped(self):
+        """URLs de sitemap inválidas no robots ou no índice são ignoradas."""
+        index = (
+            b'<sitemapindex xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">'
+            b'<sitemap><loc>https://loja.com:abc/filho.xml</loc></sitemap>'
+            b'<sitemap><loc>https://loja.com/produtos.xml</loc></sitemap>'
+            b'</sitemapindex>'
+        )
+        client = _sitemap_client({
+            'https://loja.com/robots.txt': (
+                b'Sitemap: http://loja.com:abc/sitemap.xml\n'
+            ),
+            'https://loja.com/sitemap.xml': index,
+            'https://loja.com/produtos.xml': _urlset(2),
+        })
+
+        async with client:
+            urls = await Scraper(client=client).discover_urls(
+                'https://loja.com'
+            )
+
+        assert urls == [f'https://loja.com/produto/{i}' for i in range(2)]
+
+
+class TestConcurrentSitemapIndex:
+    """Testes para a leitura concorrente dos sitemaps de um índice."""
+
+    @staticmethod
+    def _index(count):
+        children = ''.join(
+            f'<sitemap><loc>https://loja.com/filho-{i}.xml</loc></sitemap>'
+            for i in range(count)
+        )
+        return (
+            '<sitemapindex xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">'
+            f'{children}</sitemapindex>'
+        ).encode()
+
+    @pytest.mark.asyncio
+    async def test_children_fetched_concurrently_within_limit(self):
+        """Os filhos devem ser baixados em paralelo, respeitando o limite."""
+        in_flight = 0
+        peak = 0
+
+        async def handler(request):
+            nonlocal in_flight, peak
+            url = str(request.url)
+            if url == 'https://loja.com/sitemap.xml':
+                return httpx.Response(200, content=self._index(6))
+            if not url.startswith('https://loja.com/filho-'):
+                return httpx.Response(404)
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0.01)
+            in_flight -= 1
+            child = int(url.removesuffix('.xml').rsplit('-', 1)[1])
+            return httpx.Response(200, content=_urlset(2, start=child * 2))
+
+        client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        filters = DiscoveryFilters(include_regex=None, exclude_regex=None)
+
+        async with client:
+            urls = await scraper_module._discover_from_sitemap(
+                client, 'https://loja.com', 100, filters, max_in_flight=3
+            )
+
+        assert sorted(urls) == sorted(
+            f'https://loja.com/produto/{i}' for i in range(12)
+        )
+        assert peak == 3
+
+    @pytest.mark.asyncio
+    async def test_scraper_slots_bound_sitemap_fetches(self):
+        """O Scraper deve limitar os downloads pelos seus próprios slots."""
+        in_flight = 0
+        peak = 0
+
+        async def handler(request):
+            nonlocal in_flight, peak
+            url = str(request.url)
+            if url == 'https://loja.com/sitemap.xml':
+                return httpx.Response(200, content=self._index(6))
+            if not url.startswith('https://loja.com/filho-'):
+                return httpx.Response(404)
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0.01)
+            in_flight -= 1
+            return httpx.Response(200, content=_urlset(1))
+
+        client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        scraper = Scraper(
+            max_concurrency=10, client=client, per_host_concurrency=2
+        )
+
+        async with client:
+            urls = await scraper.discover_urls('https://loja.com')
+
+        assert urls == ['https://loja.com/produto/0']
+        assert peak == 2
+
+    @pytest.mark.asyncio
+    async def test_broken_child_keeps_siblings(self, monkeypatch):
+        """Um filho com erro não deve descartar os URLs dos outros."""
+        index = (
+            '<sitemapindex xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">'
+            '<sitemap><loc>https://loja.com/filho-0.xml</loc></sitemap>'
+            '<sitemap><loc>https://loja.com/quebrado.xml</loc></sitemap>'
+            '<sitemap><loc>https://loja.com/filho-1.xml</loc></sitemap>'
+            '</sitemapindex>'
+        ).encode()
+        client = _sitemap_client({
+            'https://loja.com/sitemap.xml': index,
+            'https://loja.com/filho-0.xml': _urlset(2),
+            'https://loja.com/filho-1.xml': _urlset(2, start=2),
+        })
+        iter_sitemap = scraper_module._iter_sitemap
+
+        async def failing_iter_sitemap(client, url):
+            if url.endswith('quebrado.xml'):
+                raise RuntimeError('falha inesperada')
+            async for entry in iter_sitemap(client, url):
+                yield entry
+
+        monkeypatch.setattr(
+            scraper_module, '_iter_sitemap', failing_iter_sitemap
+        )
+        filters = DiscoveryFilters(include_regex=None, exclude_regex=None)
+
+        async with client:
+            urls = await scraper_module._discover_from_sitemap(
+                client, 'https://loja.com', 100, filters
+            )
+
+        assert sorted(urls) == [
+            f'https://loja.com/produto/{i}' for i in range(4)
+        ]
+
+    @pytest.mark.asyncio
+    async def test_invalid_child_url_is_skipped(self):
+        """Um <loc> que nem o urlparse aceita só perde o próprio filho."""
+        index = (
+            b'<sitemapindex xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">'
+            b'<sitemap><loc>http://[quebrado/filho.xml</loc></sitemap>'
+            b'<sitemap><loc>https://loja.com/filho-0.xml</loc></sitemap>'
+            b'</sitemapindex>'
+        )
+        client = _sitemap_client({
+            'https://loja.com/sitemap.xml': index,
+            'https://loja.com/filho-0.xml': _urlset(2),
+        })
+
+        async with client:
+            urls = await Scraper(client=client).discover_urls(
+                'https://loja.com'
+            )
+
+        assert urls == [f'https://loja.com/produto/{i}' for i in range(2)]
+
+    @pytest.mark.asyncio
+    async def test_early_stop_cancels_outstanding_fetches(self):
+        """Ao atingir max_urls, downloads pendentes devem ser cancelados."""
+        cancelled = []
+
+        async def handler(request):
+            url = str(request.url)
+            if url == 'https://loja.com/sitemap.xml':
+                return httpx.Response(200, content=self._index(2))
+            if url == 'https://loja.com/filho-0.xml':
+                return httpx.Response(200, content=_urlset(5))
+            if url == 'https://loja.com/filho-1.xml':
+                try:
+                    await asyncio.sleep(10)
+                except asyncio.CancelledError:
+                    cancelled.append(url)
+                    raise
+            return httpx.Response(404)
+
+        client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        filters = DiscoveryFilters(include_regex=None, exclude_regex=None)
+
+        async with client:
+            urls = await asyncio.wait_for(
+                scraper_module._discover_from_sitemap(
+                    client, 'https://loja.com', 3, filters
+                ),
+                timeout=2,
+            )
+
+        assert urls == [f'https://loja.com/produto/{i}' for i in range(3)]
+        assert cancelled == ['https://loja.com/filho-1.xml']
+
+    @pytest.mark.asyncio
+    async def test_discover_urls_keeps_discovery_order(self):
+        """URLs repetidas devem sair uma vez, na ordem em que apareceram."""
+        order = [5, 1, 5, 3, 1, 0, 4]
+        entries = ''.join(
+            f'<url><loc>https://loja.com/produto/{i}</loc></url>'
+            for i in order
+        )
+        client = _sitemap_client({
+            'https://loja.com/sitemap.xml': (
+                '<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">'
+                f'{entries}</urlset>'
+            ).encode()
+        })
+
+        async with client:
+            urls = await Scraper(client=client).discover_urls(
+                'https://loja.com', max_urls=4
+            )
+
+        assert urls == [f'https://loja.com/produto/{i}' for i in (5, 1, 3, 0)]
+
+
+def _link_site(pages, delay=0.0, hang=()):
+    """Cliente falso de um site cujas páginas só têm links."""
+    state = {'in_flight': 0, 'peak': 0, 'fetched': [], 'cancelled': []}
+
+    async def handler(request):
+        path = request.url.path
+        if path not in pages:
+            return httpx.Response(404)
+        state['fetched'].append(path)
+        state['in_flight'] += 1
+        state['peak'] = max(state['peak'], state['in_flight'])
+        try:
+            await asyncio.sleep(10 if path in hang else delay)
+        except asyncio.CancelledError:
+            state['cancelled'].append(path)
+            raise
+        finally:
+            state['in_flight'] -= 1
+        links = ''.join(f'<a href="{link}">x</a>' for link in pages[path])
+        return httpx.Response(200, text=f'<html><body>{links}</body></html>')
+
+    return httpx.AsyncClient(transport=httpx.MockTransport(handler)), state
+
+
+class TestConcurrentLinkCrawl:
+    """Testes para o crawler de links com pool de workers."""
+
+    @pytest.mark.asyncio
+    async def test_workers_fetch_frontier_concurrently(self):
+        """Os workers devem buscar as páginas da fronteira em paralelo."""
+        pages = {'/': [f'/c/{i}' for i in range(6)]}
+        pages.update({f'/c/{i}': [f'/produto/{i}'] for i in range(6)})
+        client, state = _link_site(pages, delay=0.01)
+        config = DiscoveryConfig(
+            base_url='https://loja.com', max_urls=100, max_depth=1
+        )
+        filters = DiscoveryFilters(include_regex=None, exclude_regex=None)
+
+        async with client:
+            urls = await scraper_module._discover_from_links(
+                client,
+                'https://loja.com',
+                'loja.com',
+                config,
+                filters,
+                workers=3,
+            )
+
+        assert set(urls) == {f'https://loja.com/c/{i}' for i in range(6)} | {
+            f'https://loja.com/produto/{i}' for i in range(6)
+        }
+        assert state['peak'] == 3
+
+    @pytest.mark.asyncio
+    async def test_respects_max_depth(self):
+        """Páginas além de max_depth não devem ser buscadas."""
+        pages = {'/': ['/n1'], '/n1': ['/n2'], '/n2': ['/n3'], '/n3': []}
+        client, state = _link_site(pages)
+        config = DiscoveryConfig(
+            base_url='https://loja.com', max_urls=100, max_depth=2
+        )
+        filters = DiscoveryFilters(include_regex=None, exclude_regex=None)
+
+        async with client:
+            urls = await scraper_module._discover_from_links(
+                client, 'https://loja.com', 'loja.com', config, filters
+            )
+
+        assert urls == [
+            'https://loja.com/n1',
+            'https://loja.com/n2',
+            'https://loja.com/n3',
+        ]
+        assert state['fetched'] == ['/', '/n1', '/n2']
+
+    @pytest.mark.asyncio
+    async def test_stops_at_max_urls_and_cancels_fetches(self):
+        """Ao atingir max_urls, buscas em andamento devem ser canceladas."""
+        pages = {
+            '/': ['/rapida', '/lenta'],
+            '/rapida': ['/produto/1', '/produto/2'],
+            '/lenta': [],
+        }
+        client, state = _link_site(pages, hang={'/lenta'})
+        config = DiscoveryConfig(
+            base_url='https://loja.com', max_urls=3, max_depth=1
+        )
+        filters = DiscoveryFilters(include_regex=None, exclude_regex=None)
+
+        async with client:
+            urls = await asyncio.wait_for(
+                scraper_module._discover_from_links(
+                    client, 'https://loja.com', 'loja.com', config, filters
+                ),
+                timeout=2,
+            )
+
+        assert urls == [
+            'https://loja.com/rapida',
+            'https://loja.com/lenta',
+            'https://loja.com/produto/1',
+        ]
+        assert state['cancelled'] == ['/lenta']
+
+    @pytest.mark.asyncio
+    async def test_scraper_limits_link_crawl(self):
+        """discover_urls deve limitar o crawl pelos slots do Scraper."""
+        pages = {'/': [f'/c/{i}' for i in range(6)]}
+        pages.update({f'/c/{i}': [] for i in range(6)})
+        client, state = _link_site(pages, delay=0.01)
+        scraper = Scraper(
+            max_concurrency=10, client=client, per_host_concurrency=2
+        )
+
+        async with client:
+            urls = await scraper.discover_urls(
+                'https://loja.com', use_sitemap=False, follow_links=True
+            )
+
+        assert len(urls) == 6
+        assert state['peak'] == 2
+
+
+def _search_site(last_page, links_for, delay=0.01):
+    """Cliente falso de uma busca paginada com ``?page=N``."""
+    state = {'in_flight': 0, 'peak': 0, 'fetched': []}
+
+    async def handler(request):
+        page = int(request.url.params.get('page', '1'))
+        state['fetched'].append(page)
+        state['in_flight'] += 1
+        state['peak'] = max(state['peak'], state['in_flight'])
+        await asyncio.sleep(delay)
+        state['in_flight'] -= 1
+        if page > last_page:
+            return httpx.Response(404)
+        links = ''.join(
+            f'<a href="/busca?q=gpu&page={n}">{n}</a>' for n in links_for(page)
+        )
+        html = f'<a href="/produto/{page}">P{page}</a>{links}'
+        return httpx.Response(200, text=html)
+
+    return httpx.AsyncClient(transport=httpx.MockTransport(handler)), state
+
+
+class TestConcurrentSearchPagination:
+    """Testes para a busca concorrente das páginas de resultado."""
+
+    @pytest.mark.asyncio
+    async def test_linked_pages_fetched_together(self):
+        """Páginas 2..N linkadas na primeira devem ser buscadas juntas."""
+        client, state = _search_site(5, lambda page: range(2, 6))
+
+        async with client:
+            urls = await Scraper(client=client).discover_search_urls(
+                'https://loja.com/busca?q=gpu', max_pages=5
+            )
+
+        assert urls == [f'https://loja.com/produto/{n}' for n in range(1, 6)]
+        assert sorted(state['fetched']) == [1, 2, 3, 4, 5]
+        assert state['peak'] == 4
+
+    @pytest.mark.asyncio
+    async def test_predicts_next_pages(self):
+        """Com link só para a próxima página, as seguintes são previstas."""
+        client, state = _search_site(6, lambda page: [page + 1])
+
+        async with client:
+            urls = await Scraper(client=client).discover_search_urls(
+                'https://loja.com/busca?q=gpu&page=1', max_pages=6
+            )
+
+        assert urls == [f'https://loja.com/produto/{n}' for n in range(1, 7)]
+        assert sorted(state['fetched']) == [1, 2, 3, 4, 5, 6]
+        assert state['peak'] > 1
+
+    @pytest.mark.asyncio
+    async def test_prediction_stops_after_last_page(self):
+        """A previsão deve parar quando uma página vem sem produtos."""
+        client, state = _search_site(2, lambda page: [page + 1])
+
+        async with client:
+            urls = await Scraper(client=client).discover_search_urls(
+                'https://loja.com/busca?q=gpu&page=1', max_pages=20
+            )
+
+        assert urls == [
+            'https://loja.com/produto/1',
+            'https://loja.com/produto/2',
+        ]
+        assert len(state['fetched']) <= 4
+
+    @pytest.mark.asyncio
+    async def test_respects_per_host_limit(self):
+        """As páginas devem respeitar o limite por host do Scraper."""
+        client, state = _search_site(8, lambda page: range(2, 9))
+        scraper = Scraper(client=client, per_host_concurrency=2)
+
+        async with client:
+            await scraper.discover_search_urls(
+                'https://loja.com/busca?q=gpu', max_pages=8
+            )
+
+        assert state['peak'] == 2
@@ -348,6 +348,18 @@ def test_fetch_text_handles_errors():
     assert text is None
 
 
+def _patch_sitemap_fetch(monkeypatch, fake_fetch):
+    async def fake_iter(client, url):
+        content = await fake_fetch(client, url)
+        if not content:
+            return
+        reader = s._SitemapReader()
+        for entry in reader.feed(content) + reader.close():
+            yield entry
+
+    monkeypatch.setattr(s, "_iter_sitemap", fake_iter)
+
+
 def test_discover_from_sitemap_simple(monkeypatch):
     async def fake_find(client, base_url):
         return ["https://example.com/sitemap.xml"]
@@ -362,7 +374,7 @@ def test_discover_from_sitemap_simple(monkeypatch):
         return None
 
     monkeypatch.setattr(s, "_find_sitemaps", fake_find)
-    monkeypatch.setattr(s, "_fetch_text", fake_fetch)
+    _patch_sitemap_fetch(monkeypatch, fake_fetch)
 
     filters = s.DiscoveryFilters(
         include_regex=s._compile_patterns([r"/produto/"]),
@@ -394,7 +406,7 @@ def test_discover_from_sitemap_with_index(monkeypatch):
         return None
 
     monkeypatch.setattr(s, "_find_sitemaps", fake_find)
-    monkeypatch.setattr(s, "_fetch_text", fake_fetch)
+    _patch_sitemap_fetch(monkeypatch, fake_fetch)
 
     filters = s.DiscoveryFilters(
         include_regex=s._compile_patterns([r"/produto/"]),
@@ -423,7 +435,7 @@ def test_discover_from_sitemap_filters_and_limits(monkeypatch):
         return None
 
     monkeypatch.setattr(s, "_find_sitemaps", fake_find)
-    monkeypatch.setattr(s, "_fetch_text", fake_fetch)
+    _patch_sitemap_fetch(monkeypatch, fake_fetch)
 
     filters = s.DiscoveryFilters(
         include_regex=s._compile_patterns([r"/produto/"]),
@@ -443,7 +455,7 @@ def test_discover_from_sitemap_skips_seen_and_empty(monkeypatch):
         return None
 
     monkeypatch.setattr(s, "_find_sitemaps", fake_find)
-    monkeypatch.setattr(s, "_fetch_text", fake_fetch)
+    _patch_sitemap_fetch(monkeypatch, fake_fetch)
 
     filters = s.DiscoveryFilters(include_regex=None, exclude_regex=None)
     urls = asyncio.run(
@@ -466,7 +478,7 @@ def test_discover_from_sitemap_invalid_and_filtered(monkeypatch):
         """
 
     monkeypatch.setattr(s, "_find_sitemaps", fake_find)
-    monkeypatch.setattr(s, "_fetch_text", fake_fetch)
+    _patch_sitemap_fetch(monkeypatch, fake_fetch)
 
     filters = s.DiscoveryFilters(
         include_regex=s._compile_patterns([r"/produto/"]),
@@ -677,10 +689,12 @@ def test_extract_from_next_skip_invalid_price():
 
 
 def test_discover_urls_impl_combines(monkeypatch):
-    async def fake_sitemap(client, base_url, max_urls, filters):
+    async def fake_sitemap(client, base_url, max_urls, filters, **kwargs):
         return ["https://example.com/produto/a"]
 
-    async def fake_links(client, base_url, allowed_host, config, filters):
+    async def fake_links(
+        client, base_url, allowed_host, config, filters, **kwargs
+    ):
         return ["https://example.com/produto/b"]
 
     monkeypatch.setattr(s, "_discover_from_sitemap", fake_sitemap)
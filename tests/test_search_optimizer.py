@@ -1,4 +1,12 @@
 # ruff: noqa: PLR6301, PLR2004, E501
+import random
+import re
+import timeit
+from difflib import SequenceMatcher
+
+import pytest
+
+from fastapi_zero.services import search_optimizer
 from fastapi_zero.services.search_optimizer import (
     SearchOptimizer,
     SearchResult,
@@ -173,6 +181,133 @@ class TestSearchOptimizer:
         assert deduplicated == []
 
 
+LEGACY_NAVIGATION_PATTERNS = [
+    r'^home$', r'^menu', r'^back', r'^voltar', r'^mais', r'^carrinho',
+    r'^conta', r'^sair', r'^entrar', r'^login', r'^registr',
+]
+
+
+def _legacy_is_navigation(title):
+    """Filtro antigo: uma lista de padrões não compilados por título."""
+    title_lower = title.lower().strip()
+    return any(
+        re.match(pattern, title_lower)
+        for pattern in LEGACY_NAVIGATION_PATTERNS
+    )
+
+
+class TestTitleFilterArtifacts:
+    """Testes para a regex de navegação e as stopwords pré-compiladas."""
+
+    def test_navigation_matches_legacy_patterns(self):
+        """A alternação única deve rejeitar os mesmos títulos de antes."""
+        titles = [
+            "Home", "Homepage", "  Menu Principal", "Back to top", "Voltar",
+            "Mais vendidos", "Carrinho (2)", "Conta", "Sair", "Entrar",
+            "Login", "Registre-se", "Gabinete Gamer", "Mouse Home Office",
+            "Monitor mais fino", "Console Back 4 Blood",
+        ]
+        for title in titles:
+            assert SearchOptimizer.is_likely_product(title, 10.0) is not (
+                _legacy_is_navigation(title)
+            ), title
+
+    def test_stopwords_are_shared_per_locale(self):
+        """O conjunto de stopwords é congelado e compartilhado."""
+        first = SearchOptimizer("gabinete")
+        second = SearchOptimizer("monitor")
+        assert first.stopwords is second.stopwords
+        assert isinstance(first.stopwords, frozenset)
+
+    def test_english_locale(self):
+        """Outro idioma troca as stopwords removidas da query."""
+        optimizer = SearchOptimizer("case for the pc", locale='en')
+        assert optimizer.meaningful_words == {"case", "pc"}
+        assert "for" in SearchOptimizer("case for pc").meaningful_words
+
+    def test_unknown_locale(self):
+        """Deve rejeitar idiomas sem stopwords configuradas."""
+        with pytest.raises(ValueError, match='unknown stopword locale'):
+            SearchOptimizer("gabinete", locale='xx')
+
+    def test_filter_cost_per_title(self):
+        """Microbenchmark: o filtro deve custar bem menos que o antigo."""
+        titles = [
+            f"Gabinete Gamer Corsair X{i} RGB Preto" for i in range(500)
+        ] + ["Menu Principal", "Voltar", "Home"]
+
+        def current():
+            for title in titles:
+                SearchOptimizer.is_likely_product(title, 10.0)
+
+        def legacy():
+            for title in titles:
+                _legacy_is_navigation(title)
+
+        current_cost = min(timeit.repeat(current, number=3, repeat=5))
+        legacy_cost = min(timeit.repeat(legacy, number=3, repeat=5))
+
+        assert current_cost < legacy_cost / 3
+
+
+class TestScoreTitles:
+    """Testes para o cálculo de relevância em lote."""
+
+    def test_matches_single_title(self):
+        """O lote deve dar o mesmo score que calculate_relevance."""
+        optimizer = SearchOptimizer("gabinete gamer rgb")
+        titles = [
+            "Gabinete Gamer RGB 12V",
+            "Gabinete Preto",
+            "Monitor LG 24 polegadas",
+            "",
+        ]
+
+        scores = optimizer.score_titles(titles)
+
+        assert scores == [optimizer.calculate_relevance(t) for t in titles]
+        assert scores[0] > scores[1] > scores[2] == scores[3] == 0.0
+
+    def test_scores_are_bounded(self):
+        """Scores devem ficar entre 0 e 100; o título igual à query é o máximo."""
+        optimizer = SearchOptimizer("gabinete gamer")
+        scores = optimizer.score_titles(
+            ["gabinete gamer", "GABINETE GAMER", "g", "x" * 200]
+        )
+        assert all(0.0 <= score <= 100.0 for score in scores)
+        assert scores[0] == scores[1] == max(scores) == 92.0
+
+    def test_longer_titles_score_lower(self):
+        """Títulos com mais ruído em volta da query devem pontuar menos."""
+        optimizer = SearchOptimizer("gabinete gamer")
+        short, long = optimizer.score_titles([
+            "Gabinete Gamer Preto",
+            "Gabinete Gamer Preto com Lateral de Vidro e 3 Fans ARGB",
+        ])
+        assert short > long
+
+    def test_filter_and_rank_scores_in_one_batch(self, monkeypatch):
+        """filter_and_rank deve pontuar só os produtos válidos, de uma vez."""
+        optimizer = SearchOptimizer("gabinete")
+        batches = []
+        score_titles = optimizer.score_titles
+
+        def recording(titles):
+            batches.append(list(titles))
+            return score_titles(titles)
+
+        monkeypatch.setattr(optimizer, 'score_titles', recording)
+
+        optimizer.filter_and_rank([
+            ("url1", "Gabinete Gamer", 199.99, "USD"),
+            ("url2", "Gabinete Preto", None, "USD"),
+            ("url3", "Menu", 10.0, "USD"),
+            ("url4", "Gabinete Branco", 179.99, "USD"),
+        ])
+
+        assert batches == [["Gabinete Gamer", "Gabinete Branco"]]
+
+
 class TestOptimizeSearchResults:
     """Testes para função de otimização de busca."""
 
@@ -253,6 +388,68 @@ class TestOptimizeSearchResults:
         assert optimized[0].title == "Gabinete Gamer RGB 2024"
 
 
+class TestTopResults:
+    """Testes para a seleção dos melhores resultados com heap."""
+
+    @staticmethod
+    def _raw_results(size):
+        return [
+            (result.url, result.title, result.price, result.currency)
+            for result in _title_corpus(size)
+        ]
+
+    @pytest.mark.parametrize('max_results', [1, 5, 40, 500])
+    def test_matches_full_sort(self, max_results):
+        """Deve dar o mesmo que ordenar, deduplicar tudo e cortar."""
+        results = self._raw_results(180)
+        optimizer = SearchOptimizer("gabinete gamer corsair rgb")
+        expected = optimizer.deduplicate(optimizer.filter_and_rank(results))
+
+        optimized = optimize_search_results(
+            "gabinete gamer corsair rgb", results, max_results=max_results
+        )
+
+        assert optimized == expected[:max_results]
+
+    @pytest.mark.parametrize('max_results', [1, 7, 500])
+    def test_matches_full_sort_without_deduplication(self, max_results):
+        """Sem deduplicação, deve manter a ordem estável dos empates."""
+        results = self._raw_results(180)
+        optimizer = SearchOptimizer("gabinete")
+        expected = optimizer.filter_and_rank(results)
+
+        optimized = optimize_search_results(
+            "gabinete",
+            results,
+            max_results=max_results,
+            remove_duplicates=False,
+        )
+
+        assert optimized == expected[:max_results]
+
+    def test_stops_deduplicating_at_limit(self, monkeypatch):
+        """Resultados abaixo do corte não devem passar pela deduplicação."""
+        indexed = []
+        add = search_optimizer._NearDuplicateIndex.add_unless_duplicate
+
+        def recording(self, title):
+            indexed.append(title)
+            return add(self, title)
+
+        monkeypatch.setattr(
+            search_optimizer._NearDuplicateIndex,
+            'add_unless_duplicate',
+            recording,
+        )
+
+        optimized = optimize_search_results(
+            "gabinete gamer", self._raw_results(180), max_results=5
+        )
+
+        assert len(optimized) == 5
+        assert len(indexed) < 20
+
+
 class TestSearchResultModel:
     """Testes para o modelo SearchResult."""
 
@@ -282,3 +479,150 @@ class TestSearchResultModel:
         )
 
         assert result.relevance_score == 0.0
+
+
+BRANDS = ['Corsair', 'Gigabyte', 'Asus', 'MSI', 'Redragon', 'Pichau', 'NZXT']
+KINDS = ['Gabinete Gamer', 'Gabinete Mid Tower', 'Gabinete Mini ITX']
+FEATURES = ['RGB', 'Lateral de Vidro', 'Preto', 'Branco', '3 Fans', 'ATX']
+
+
+def _title_corpus(size, seed=7):
+    """Títulos de produtos com variações (caixa, sufixos, erros de digitação)."""
+    rng = random.Random(seed)
+    bases = [
+        ' '.join([
+            rng.choice(KINDS),
+            rng.choice(BRANDS),
+            f'X{rng.randint(100, 9999)}',
+            *rng.sample(FEATURES, rng.randint(1, 3)),
+        ])
+        for _ in range(size * 2 // 3)
+    ]
+    titles = list(bases)
+    while len(titles) < size:
+        title = rng.choice(bases)
+        position = rng.randrange(len(title))
+        titles.append(
+            rng.choice([
+                title.upper(),
+                f'{title} - Original',
+                title[:position] + title[position + 1 :],
+                title.replace(' ', '  ', 1),
+            ])
+        )
+    rng.shuffle(titles)
+    return [
+        SearchResult(f'url{i}', title, 199.99, 'BRL', 50.0)
+        for i, title in enumerate(titles)
+    ]
+
+
+def _pairwise_deduplicate(results, similarity_threshold):
+    """Referência: compara cada resultado com todos os já mantidos."""
+
+    def similar(a, b):
+        matcher = SequenceMatcher(None, a.lower(), b.lower())
+        return (
+            matcher.real_quick_ratio() >= similarity_threshold
+            and matcher.quick_ratio() >= similarity_threshold
+            and matcher.ratio() >= similarity_threshold
+        )
+
+    kept = []
+    for current in results:
+        if not any(
+            existing.title
+            and current.title
+            and similar(existing.title, current.title)
+            for existing in kept
+        ):
+            kept.append(current)
+    return kept
+
+
+class TestNearDuplicateIndex:
+    """Testes para a deduplicação com MinHash/LSH."""
+
+    @pytest.mark.parametrize('threshold', [0.9, 0.85, 0.7])
+    def test_matches_pairwise_on_labeled_corpus(self, threshold):
+        """Deve manter os mesmos resultados que a comparação par a par."""
+        results = _title_corpus(180)
+
+        deduplicated = SearchOptimizer.deduplicate(results, threshold)
+
+        assert deduplicated == _pairwise_deduplicate(results, threshold)
+
+    @pytest.mark.parametrize('threshold', [0.85, 0.7])
+    def test_matches_pairwise_on_short_titles(self, threshold):
+        """Títulos curtos também devem seguir a comparação par a par."""
+        rng = random.Random(3)
+        results = []
+        for i in range(300):
+            title = f'{rng.choice(["RTX", "SSD", "Mouse"])} {rng.randint(10, 999)}'
+            if rng.random() < 0.4:
+                position = rng.randrange(len(title))
+                title = title[:position] + 'x' + title[position + 1 :]
+            results.append(SearchResult(f'url{i}', title, 10.0, 'BRL'))
+
+        deduplicated = SearchOptimizer.deduplicate(results, threshold)
+
+        assert deduplicated == _pairwise_deduplicate(results, threshold)
+
+    def test_compares_only_candidates(self, monkeypatch):
+        """Só pares que dividem um bucket LSH devem ser comparados."""
+        ratios = []
+
+        class CountingMatcher(SequenceMatcher):
+            def ratio(self):
+                ratios.append(1)
+                return super().ratio()
+
+        monkeypatch.setattr(
+            search_optimizer, 'SequenceMatcher', CountingMatcher
+        )
+        results = _title_corpus(240)
+
+        deduplicated = SearchOptimizer.deduplicate(results)
+
+        pairs = len(results) * len(deduplicated) // 2
+        assert len(ratios) < pairs // 10
+
+    def test_keeps_untitled_results(self):
+        """Resultados sem título nunca são removidos nem comparados."""
+        results = [
+            SearchResult('url1', None, 10.0, 'BRL'),
+            SearchResult('url2', 'Gabinete Gamer', 10.0, 'BRL'),
+            SearchResult('url3', None, 10.0, 'BRL'),
+            SearchResult('url4', 'GABINETE GAMER', 10.0, 'BRL'),
+        ]
+
+        deduplicated = SearchOptimizer.deduplicate(results)
+
+        assert [r.url for r in deduplicated] == ['url1', 'url2', 'url3']
+
+    def test_short_titles(self):
+        """Títulos menores que um trigrama também devem ser comparados."""
+        results = [
+            SearchResult('url1', 'PC', 10.0, 'BRL'),
+            SearchResult('url2', 'pc', 10.0, 'BRL'),
+            SearchResult('url3', 'TV', 10.0, 'BRL'),
+        ]
+
+        deduplicated = SearchOptimizer.deduplicate(results)
+
+        assert [r.url for r in deduplicated] == ['url1', 'url3']
+
+    def test_shingle_hashes_stay_small(self):
+        """Os hashes ficam por índice, com um cache global pequeno."""
+        search_optimizer._shingle_hashes.cache_clear()
+        index = search_optimizer._NearDuplicateIndex(0.85)
+        title = 'Placa de Vídeo RTX 4070 Super 12GB GDDR6X'
+
+        index.add_unless_duplicate(title)
+
+        hashes = index.shingle_hashes['Pla']
+        assert hashes.typecode == 'I'
+        assert len(hashes) == search_optimizer.MINHASH_PERMUTATIONS
+        assert set(index.shingle_hashes) == search_optimizer._shingles(title)
+        info = search_optimizer._shingle_hashes.cache_info()
+        assert info.maxsize <= 4096
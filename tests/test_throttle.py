@@ -0,0 +1,305 @@
+# ruff: noqa: PLR6301, PLR2004, E501
+import asyncio
+
+import httpx
+import pytest
+
+from fastapi_zero.app import app
+from fastapi_zero.services.scraper import Scraper
+from fastapi_zero.services.throttle import (
+    AdaptiveHostLimiter,
+    HostLimiter,
+    LayeredHostLimiter,
+    TokenBucket,
+)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestTokenBucket:
+    """Testes para o token bucket."""
+
+    def test_burst_then_wait(self):
+        clock = FakeClock()
+        bucket = TokenBucket(rate=2.0, clock=clock)
+        assert bucket.reserve() == 0.0
+        assert bucket.reserve() == 0.0
+        assert bucket.reserve() == pytest.approx(0.5)
+        assert bucket.reserve() == pytest.approx(1.0)
+
+    def test_refills_over_time(self):
+        clock = FakeClock()
+        bucket = TokenBucket(rate=1.0, clock=clock)
+        assert bucket.reserve() == 0.0
+        clock.now = 1.0
+        assert bucket.reserve() == 0.0
+        clock.now = 10.0
+        # Capacidade limita o acúmulo de tokens
+        assert bucket.reserve() == 0.0
+        assert bucket.reserve() == pytest.approx(1.0)
+
+
+async def _track_peak(limiter, hosts, hold=0.01):
+    peaks: dict[str, int] = {}
+
+    async def worker(host):
+        async with limiter.slot(host):
+            peaks[host] = max(peaks.get(host, 0), limiter.in_flight(host))
+            await asyncio.sleep(hold)
+
+    await asyncio.gather(*(worker(host) for host in hosts))
+    return peaks
+
+
+class TestHostLimiter:
+    """Testes para o limitador por host."""
+
+    @pytest.mark.asyncio
+    async def test_caps_in_flight_per_host(self):
+        limiter = HostLimiter(max_per_host=2)
+        peaks = await _track_peak(limiter, ['a.com'] * 8 + ['b.com'] * 8)
+        assert peaks == {'a.com': 2, 'b.com': 2}
+        assert limiter.in_flight('a.com') == 0
+
+    @pytest.mark.asyncio
+    async def test_unlimited_by_default(self):
+        limiter = HostLimiter()
+        peaks = await _track_peak(limiter, ['a.com'] * 6)
+        assert peaks == {'a.com': 6}
+
+    @pytest.mark.asyncio
+    async def test_cancelled_waiter_releases_nothing(self):
+        limiter = HostLimiter(max_per_host=1)
+        entered = asyncio.Event()
+        release = asyncio.Event()
+
+        async def holder():
+            async with limiter.slot('a.com'):
+                entered.set()
+                await release.wait()
+
+        async def waiter():
+            async with limiter.slot('a.com'):
+                pass
+
+        holder_task = asyncio.create_task(holder())
+        await entered.wait()
+        waiter_task = asyncio.create_task(waiter())
+        await asyncio.sleep(0)
+        waiter_task.cancel()
+        release.set()
+        await holder_task
+        with pytest.raises(asyncio.CancelledError):
+            await waiter_task
+        assert limiter.in_flight('a.com') == 0
+
+        async with limiter.slot('a.com'):
+            assert limiter.in_flight('a.com') == 1
+
+    @pytest.mark.asyncio
+    async def test_rate_limit_sleeps(self, monkeypatch):
+        delays = []
+        real_sleep = asyncio.sleep
+
+        async def fake_sleep(delay, *args, **kwargs):
+            delays.append(delay)
+            await real_sleep(0)
+
+        monkeypatch.setattr(asyncio, 'sleep', fake_sleep)
+        limiter = HostLimiter(rate_per_host=1.0)
+        for _ in range(3):
+            async with limiter.slot('a.com'):
+                pass
+        assert len(delays) == 2
+        assert all(delay > 0 for delay in delays)
+
+
+class TestAdaptiveHostLimiter:
+    """Testes para o controlador AIMD por host."""
+
+    def test_additive_increase_on_healthy_responses(self):
+        limiter = AdaptiveHostLimiter(initial_per_host=2, max_per_host=10)
+        for _ in range(2):
+            limiter.record('a.com', 0.1, 200)
+        # +1/limite por resposta: duas respostas com limite 2 somam ~1 slot
+        assert limiter.limits()['a.com'] == pytest.approx(2 + 1 / 2 + 1 / 2.5)
+        assert limiter.limits()['a.com'] < 4
+
+    def test_multiplicative_decrease_on_throttle(self):
+        clock = FakeClock()
+        limiter = AdaptiveHostLimiter(initial_per_host=8, clock=clock)
+        limiter.record('a.com', 0.1, 429)
+        assert limiter.limits()['a.com'] == 4
+        # Mesma janela: não corta de novo
+        limiter.record('a.com', 0.1, 503)
+        assert limiter.limits()['a.com'] == 4
+        clock.now = 1.0
+        limiter.record('a.com', 0.1, None)
+        assert limiter.limits()['a.com'] == 2
+
+    def test_floor_and_ceiling(self):
+        clock = FakeClock()
+        limiter = AdaptiveHostLimiter(
+            initial_per_host=2, min_per_host=1, max_per_host=3, clock=clock
+        )
+        for step in range(5):
+            clock.now = float(step)
+            limiter.record('a.com', 0.1, 429)
+        assert limiter.limits()['a.com'] == 1
+        for _ in range(50):
+            limiter.record('a.com', 0.1, 200)
+        assert limiter.limits()['a.com'] == 3
+
+    def test_slow_responses_hold_limit(self):
+        limiter = AdaptiveHostLimiter(initial_per_host=4)
+        limiter.record('a.com', 0.1, 200)
+        before = limiter.limits()['a.com']
+        limiter.record('a.com', 1.0, 200)
+        limiter.record('a.com', 0.5, 500)
+        assert limiter.limits()['a.com'] == before
+
+    def test_hosts_are_independent(self):
+        limiter = AdaptiveHostLimiter(initial_per_host=4)
+        limiter.record('a.com', 0.1, 429)
+        limiter.record('b.com', 0.1, 200)
+        assert limiter.limits()['a.com'] == 2
+        assert limiter.limits()['b.com'] > 4
+
+    @pytest.mark.asyncio
+    async def test_growth_wakes_waiters(self):
+        limiter = AdaptiveHostLimiter(initial_per_host=1)
+        release = asyncio.Event()
+        entered = []
+
+        async def worker(index):
+            async with limiter.slot('a.com'):
+                entered.append(index)
+                await release.wait()
+
+        tasks = [asyncio.create_task(worker(i)) for i in range(2)]
+        await asyncio.sleep(0)
+        assert entered == [0]
+        limiter.record('a.com', 0.1, 200)
+        await asyncio.sleep(0)
+        assert entered == [0, 1]
+        release.set()
+        await asyncio.gather(*tasks)
+
+
+class TestScraperPerHostLimits:
+    """Testes para limites por host no Scraper."""
+
+    @pytest.mark.asyncio
+    async def test_single_host_is_capped_globally_shared(self):
+        active: dict[str, int] = {}
+        peaks: dict[str, int] = {}
+
+        async def handler(request):
+            host = request.url.host
+            active[host] = active.get(host, 0) + 1
+            peaks[host] = max(peaks.get(host, 0), active[host])
+            await asyncio.sleep(0.01)
+            active[host] -= 1
+            return httpx.Response(200, text='<h1>Produto</h1>R$ 10,00')
+
+        client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        scraper = Scraper(
+            max_concurrency=10, client=client, per_host_concurrency=3
+        )
+        urls = [f'https://a.com/{i}' for i in range(12)]
+        urls += [f'https://b.com/{i}' for i in range(12)]
+
+        items = await scraper.scrape_urls(urls)
+        await client.aclose()
+
+        assert len(items) == 24
+        assert peaks == {'a.com': 3, 'b.com': 3}
+
+    @pytest.mark.asyncio
+    async def test_request_caps_apply_on_shared_limiter(self):
+        """Com limitador compartilhado, os limites do pedido continuam valendo."""
+        peak = 0
+        active = 0
+
+        async def handler(request):
+            nonlocal active, peak
+            active += 1
+            peak = max(peak, active)
+            await asyncio.sleep(0.01)
+            active -= 1
+            return httpx.Response(200, text='<h1>Produto</h1>R$ 10,00')
+
+        shared = AdaptiveHostLimiter(initial_per_host=4, max_per_host=8)
+        client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        scraper = Scraper(
+            max_concurrency=10,
+            client=client,
+            per_host_concurrency=2,
+            adaptive=True,
+            host_limiter=shared,
+        )
+
+        items = await scraper.scrape_urls(
+            [f'https://a.com/{i}' for i in range(8)]
+        )
+        await client.aclose()
+
+        assert len(items) == 8
+        assert peak == 2
+        # O estado compartilhado segue aprendendo com as respostas
+        assert shared.limits()['a.com'] > 4
+        assert scraper.host_limits() == {'a.com': 2}
+
+    @pytest.mark.asyncio
+    async def test_layered_rate_waits_outside_shared_slot(self, monkeypatch):
+        """A espera pelo rps do pedido não ocupa vaga do limitador global."""
+        sleeps = []
+
+        async def fake_sleep(delay):
+            sleeps.append(shared.in_flight('a.com'))
+
+        shared = HostLimiter(max_per_host=1)
+        limiter = LayeredHostLimiter(shared, rate_per_host=1.0)
+        monkeypatch.setattr(asyncio, 'sleep', fake_sleep)
+        for _ in range(2):
+            async with limiter.slot('a.com'):
+                assert shared.in_flight('a.com') == 1
+
+        assert sleeps == [0]
+
+    @pytest.mark.asyncio
+    async def test_adaptive_scraper_backs_off(self, monkeypatch):
+        async def fast_sleep(*args, **kwargs):
+            return None
+
+        def handler(request):
+            if request.url.host == 'slow.com':
+                return httpx.Response(429)
+            return httpx.Response(200, text='<h1>Produto</h1>R$ 10,00')
+
+        client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        scraper = Scraper(max_concurrency=8, client=client, adaptive=True)
+        monkeypatch.setattr(asyncio, 'sleep', fast_sleep)
+        await scraper.scrape_urls(
+            ['https://slow.com/1', 'https://ok.com/1', 'https://ok.com/2']
+        )
+        await client.aclose()
+
+        limits = scraper.host_limits()
+        assert limits['slow.com'] < 4
+        assert limits['ok.com'] > 4
+
+
+def test_host_limits_endpoint(client):
+    assert client.get('/scrape/host-limits').json() == {'hosts': []}
+    app.state.host_limiter.record('a.com', 0.1, 429)
+    response = client.get('/scrape/host-limits')
+    assert response.json() == {
+        'hosts': [{'host': 'a.com', 'limit': 2.0, 'in_flight': 0}]
+    }
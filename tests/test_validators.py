@@ -0,0 +1,215 @@
+# ruff: noqa: PLR6301, PLR2004, E501
+import httpx
+import pytest
+
+from fastapi_zero.services import scraper as scraper_module
+from fastapi_zero.services.scraper import ScrapedItem, Scraper
+from fastapi_zero.services.validators import (
+    CachedPage,
+    SqlValidatorStore,
+    ValidatorStore,
+)
+
+URL = 'https://loja.com/produto/1'
+PAGE = '<html><head><title>GPU</title></head><body>R$ 1.299,90</body></html>'
+
+
+def _item(price=1299.90):
+    return ScrapedItem(
+        url=URL,
+        title='GPU',
+        price=price,
+        currency='BRL',
+        raw_price='R$ 1.299,90',
+    )
+
+
+class ConditionalServer:
+    """Servidor falso que responde 304 quando o validador confere."""
+
+    def __init__(self, headers):
+        self.headers = headers
+        self.requests = []
+
+    def __call__(self, request):
+        self.requests.append(request)
+        etag = self.headers.get('ETag')
+        if etag and request.headers.get('If-None-Match') == etag:
+            return httpx.Response(304, headers=self.headers)
+        return httpx.Response(200, text=PAGE, headers=self.headers)
+
+
+async def _scrape_twice(server, store):
+    client = httpx.AsyncClient(transport=httpx.MockTransport(server))
+    scraper = Scraper(client=client, validator_store=store)
+    try:
+        first = await scraper.scrape_urls([URL])
+        second = await scraper.scrape_urls([URL])
+    finally:
+        await client.aclose()
+    return first, second
+
+
+class TestCachedPage:
+    """Testes para os cabeçalhos condicionais."""
+
+    def test_request_headers(self):
+        """Deve enviar os dois validadores e trocar o no-cache padrão."""
+        page = CachedPage('"v1"', 'Wed, 01 Oct 2026 10:00:00 GMT', _item())
+        assert page.request_headers() == {
+            'If-None-Match': '"v1"',
+            'If-Modified-Since': 'Wed, 01 Oct 2026 10:00:00 GMT',
+            'Cache-Control': 'max-age=0',
+        }
+
+    def test_no_validators(self):
+        """Sem validadores, a requisição não deve ser condicional."""
+        assert CachedPage(None, None, _item()).request_headers() == {}
+
+
+class TestConditionalScrape:
+    """Testes para a revalidação de páginas já raspadas."""
+
+    @pytest.mark.asyncio
+    async def test_not_modified_reuses_item(self, monkeypatch):
+        """Um 304 deve devolver o item salvo sem reprocessar o HTML."""
+        parsed = []
+        original = scraper_module.parse_html
+
+        def counting_parse(url, html):
+            parsed.append(url)
+            return original(url, html)
+
+        monkeypatch.setattr(scraper_module, 'parse_html', counting_parse)
+        server = ConditionalServer({'ETag': '"v1"'})
+
+        [first], [second] = await _scrape_twice(server, ValidatorStore())
+
+        assert second == first
+        assert first.price == 1299.90
+        assert parsed == [URL]
+        assert 'If-None-Match' not in server.requests[0].headers
+        assert server.requests[1].headers['If-None-Match'] == '"v1"'
+        assert server.requests[1].headers['Cache-Control'] == 'max-age=0'
+
+    @pytest.mark.asyncio
+    async def test_page_without_validators_is_forgotten(self):
+        """Páginas que deixam de enviar validadores saem do cache."""
+        store = ValidatorStore()
+        await store.put(URL, CachedPage('"velho"', None, _item(1.0)))
+        server = ConditionalServer({})
+
+        [first], [second] = await _scrape_twice(server, store)
+
+        assert first.price == second.price == 1299.90
+        assert 'If-None-Match' not in server.requests[1].headers
+        assert await store.get(URL) is None
+
+    @pytest.mark.asyncio
+    async def test_last_modified_only(self):
+        """Last-Modified sozinho também deve virar requisição condicional."""
+        store = ValidatorStore()
+        modified = 'Wed, 01 Oct 2026 10:00:00 GMT'
+        server = ConditionalServer({'Last-Modified': modified})
+
+        await _scrape_twice(server, store)
+
+        assert server.requests[1].headers['If-Modified-Since'] == modified
+
+    @pytest.mark.asyncio
+    async def test_batches_store_round_trips(self):
+        """Consultas e gravações devem ir ao armazenamento em lote."""
+        calls = []
+
+        class CountingStore(ValidatorStore):
+            async def get_many(self, urls):
+                calls.append(('get_many', len(urls)))
+                return await super().get_many(urls)
+
+            async def update(self, changes):
+                calls.append(('update', len(changes)))
+                await super().update(changes)
+
+        urls = [f'{URL}?v={index}' for index in range(10)]
+        server = ConditionalServer({'ETag': '"v1"'})
+        client = httpx.AsyncClient(transport=httpx.MockTransport(server))
+        scraper = Scraper(client=client, validator_store=CountingStore())
+        try:
+            await scraper.scrape_urls(urls)
+        finally:
+            await client.aclose()
+
+        assert calls == [('get_many', 10), ('update', 10)]
+
+
+class BrokenStore(ValidatorStore):
+    """Armazenamento que falha em toda operação."""
+
+    async def get_many(self, urls):
+        raise RuntimeError('banco fora do ar')
+
+    async def update(self, changes):
+        raise RuntimeError('banco fora do ar')
+
+
+class TestBestEffortStore:
+    """Falhas no armazenamento não devem derrubar a raspagem."""
+
+    @pytest.mark.asyncio
+    async def test_failed_lookup_fetches_unconditionally(self, caplog):
+        """Sem validadores, a URL deve ser buscada normalmente."""
+        server = ConditionalServer({'ETag': '"v1"'})
+
+        first, second = await _scrape_twice(server, BrokenStore())
+
+        assert first == second == [_item()]
+        assert all('If-None-Match' not in r.headers for r in server.requests)
+        assert 'Validator lookup failed' in caplog.text
+        assert 'Could not store validators' in caplog.text
+
+
+class TestSqlValidatorStore:
+    """Testes para o armazenamento persistente dos validadores."""
+
+    @pytest.mark.asyncio
+    async def test_round_trip_and_update(self, async_session_factory):
+        """Deve gravar, sobrescrever e remover validadores por URL."""
+        store = SqlValidatorStore(async_session_factory)
+        assert await store.get(URL) is None
+
+        await store.put(URL, CachedPage('"v1"', None, _item()))
+        await store.put(URL, CachedPage('"v2"', 'ontem', _item(999.0)))
+
+        cached = await store.get(URL)
+        assert cached == CachedPage('"v2"', 'ontem', _item(999.0))
+
+        await store.discard(URL)
+        assert await store.get(URL) is None
+
+    @pytest.mark.asyncio
+    async def test_survives_new_store(self, async_session_factory):
+        """Outra instância deve enxergar os validadores já gravados."""
+        await SqlValidatorStore(async_session_factory).put(
+            URL, CachedPage('"v1"', None, _item())
+        )
+
+        cached = await SqlValidatorStore(async_session_factory).get(URL)
+
+        assert cached.etag == '"v1"'
+        assert cached.item == _item()
+
+    @pytest.mark.asyncio
+    async def test_batch_update(self, async_session_factory):
+        """Deve gravar e remover várias URLs em uma única atualização."""
+        store = SqlValidatorStore(async_session_factory)
+        await store.put('a', CachedPage('"a"', None, _item()))
+
+        await store.update({
+            'a': None,
+            'b': CachedPage('"b"', None, _item()),
+            'c': CachedPage(None, 'ontem', _item()),
+        })
+
+        cached = await store.get_many(['a', 'b', 'c', 'd'])
+        assert sorted(cached) == ['b', 'c']
+        assert cached['c'].last_modified == 'ontem'